@@ -1,16 +1,51 @@
 from datetime import datetime, timedelta
 import calendar
-import pandas as pd # pandas 라이브러리 임포트
+from functools import lru_cache # 달력/일할 계산 결과 캐시를 위해 임포트
+import numpy as np # 배열 단위 연산을 위해 임포트
 import math # math.floor() 함수를 위해 임포트
 from decimal import Decimal, getcontext # decimal 모듈 임포트
 import sys # PyInstaller 번들링을 위해 임포트
 import os # 파일 경로 조작을 위해 임포트
-from tkinter import filedialog # 파일 대화상자를 위해 임포트
-from tkinter import Tk # Tkinter 루트 윈도우를 위해 임포트
+from adjustment_schedule import Schedule # 배열 기반 결제 스케줄 컨테이너
+from adjustment_money import overdue_won, prorated_won, to_won, won # 원 단위 정수 금액 계산
+# pandas와 tkinter는 DataFrame/Excel/파일 대화상자 경로에서만 필요하므로 해당 함수 안에서 임포트합니다.
+# (연체/일할/스케줄 계산 함수만 사용하는 경우 모듈을 빠르게 불러올 수 있도록)
 
 # Decimal 연산의 정밀도 설정
 getcontext().prec = 10 # 필요에 따라 정밀도 조절
 
+# 금액 계산 방식 (실행 진입점에서 환경 변수 ADJUSTMENT_MONEY_MODE 또는 --money-mode로 지정)
+#   decimal: 월요금을 Decimal(정밀도 10자리)로 변환하여 일할/연체 금액을 계산 (기존 방식, 기본값)
+#   exact: 모든 금액을 원 단위 정수로 다루고 일할/연체 금액을 중간 반올림 없이 정수 연산으로 계산 (adjustment_money 참고)
+MONEY_MODES = ('decimal', 'exact')
+MONEY_MODE_ENV_VAR = 'ADJUSTMENT_MONEY_MODE'
+_money_mode = 'decimal'
+
+def set_money_mode(mode):
+    """
+    금액 계산 방식('decimal' 또는 'exact')을 설정합니다. Decimal 정밀도처럼 프로세스 전체에 적용됩니다.
+    """
+    global _money_mode
+    if mode not in MONEY_MODES:
+        raise ValueError(f"지원하지 않는 금액 계산 방식입니다: {mode} ({', '.join(MONEY_MODES)} 중 하나)")
+    _money_mode = mode
+
+def money_mode():
+    return _money_mode
+
+def money_mode_from_environment():
+    """
+    환경 변수 ADJUSTMENT_MONEY_MODE에 지정된 금액 계산 방식을 반환합니다 (지정하지 않았으면 'decimal').
+    대소문자와 앞뒤 공백은 무시하며, 지원하지 않는 값이면 ValueError를 발생시킵니다.
+    임포트만으로 실패하지 않도록 모듈을 불러올 때가 아니라 각 실행 진입점에서 호출합니다.
+    """
+    mode = os.environ.get(MONEY_MODE_ENV_VAR, '').strip().lower() or 'decimal'
+    if mode not in MONEY_MODES:
+        raise ValueError(
+            f"환경 변수 {MONEY_MODE_ENV_VAR}의 값이 올바르지 않습니다: {os.environ[MONEY_MODE_ENV_VAR]} ({', '.join(MONEY_MODES)} 중 하나)"
+        )
+    return mode
+
 def resource_path(relative_path):
     """
     PyInstaller로 번들링된 애플리케이션에서 리소스의 절대 경로를 가져옵니다.
@@ -41,8 +76,63 @@ def calculate_total_payment(monthly_fee, payment_period, advance_payment):
   total_payment = (monthly_fee * payment_period) + advance_payment
   return total_payment
 
+# 월 일수 테이블을 미리 계산해 두는 연도 범위 (범위 밖의 날짜는 calendar 모듈로 계산)
+# 시작 연도를 1970년으로 두어 datetime64[M]의 정수 값을 그대로 테이블 인덱스로 사용합니다.
+CALENDAR_FIRST_YEAR = 1970
+CALENDAR_LAST_YEAR = 2100
+# 월요금별 일일 요금, (월요금, 사용일수)별 일할 금액 캐시의 최대 항목 수
+DAILY_RATE_CACHE_SIZE = 1024
+PRORATED_AMOUNT_CACHE_SIZE = 65536
+
+# 월 인덱스((연도 - CALENDAR_FIRST_YEAR) * 12 + 월 - 1) → 해당 월의 일수
+_MONTH_LENGTH_TABLE = [
+    calendar.monthrange(year, month)[1]
+    for year in range(CALENDAR_FIRST_YEAR, CALENDAR_LAST_YEAR + 1)
+    for month in range(1, 13)
+]
+_MONTH_LENGTH_ARRAY = np.array(_MONTH_LENGTH_TABLE, dtype=np.int64)
+# [월 인덱스, 고정 결제일(0-31)] → 월말을 넘지 않도록 조정한 결제일
+_CLAMPED_DAY_ARRAY = np.minimum(np.arange(32, dtype=np.int64)[np.newaxis, :], _MONTH_LENGTH_ARRAY[:, np.newaxis])
+
+def month_length(year, month):
+    """
+    해당 월의 일수를 반환합니다. 미리 계산한 테이블 범위 밖이면 calendar 모듈로 계산합니다.
+    """
+    index = (year - CALENDAR_FIRST_YEAR) * 12 + month - 1
+    if 0 <= index < len(_MONTH_LENGTH_TABLE):
+        return _MONTH_LENGTH_TABLE[index]
+    return calendar.monthrange(year, month)[1]
+
+@lru_cache(maxsize=DAILY_RATE_CACHE_SIZE)
+def _daily_rate(fee_text, precision):
+    # precision은 캐시 키로만 사용 (Decimal 정밀도가 바뀌면 다시 계산)
+    return (Decimal(fee_text) * Decimal('12')) / Decimal('365')
+
+@lru_cache(maxsize=PRORATED_AMOUNT_CACHE_SIZE)
+def _prorated_amount(fee_text, days_used, precision):
+    return round(_daily_rate(fee_text, precision) * Decimal(str(days_used)))
+
+def calendar_cache_info():
+    """
+    일일 요금, 일할 금액 캐시의 적중/미스 통계를 반환합니다.
+
+    Returns:
+      'daily_rate', 'prorated_amount' 키에 hits, misses, maxsize, currsize를 담은 dict
+    """
+    return {
+        'daily_rate': _daily_rate.cache_info()._asdict(),
+        'prorated_amount': _prorated_amount.cache_info()._asdict(),
+    }
+
+def clear_calendar_cache():
+    """
+    일일 요금, 일할 금액 캐시와 통계를 초기화합니다.
+    """
+    _daily_rate.cache_clear()
+    _prorated_amount.cache_clear()
+
 def get_last_day_of_month(date_obj):
-    return date_obj.replace(day=calendar.monthrange(date_obj.year, date_obj.month)[1])
+    return date_obj.replace(day=month_length(date_obj.year, date_obj.month))
 
 def add_months_and_set_day(start_date, months_to_add, target_day):
     """
@@ -55,8 +145,7 @@ def add_months_and_set_day(start_date, months_to_add, target_day):
     year += (month - 1) // 12
     month = (month - 1) % 12 + 1
 
-    _, last_day = calendar.monthrange(year, month)
-    day = min(target_day, last_day)
+    day = min(target_day, month_length(year, month))
     
     return datetime(year, month, day)
 
@@ -69,11 +158,12 @@ def calculate_prorated_amount(monthly_fee, start_date, end_date):
         raise ValueError("Proration must be within the same month.")
 
     # 일일 요금 계산: (월요금 * 12) / 365
-    daily_rate = (Decimal(str(monthly_fee)) * Decimal('12')) / Decimal('365')
-    
+    # 같은 월요금/사용일수 조합은 캐시된 결과를 재사용 (Decimal 정밀도별로 구분)
     days_used = (end_date - start_date).days + 1 # +1 to include end_date
+    if _money_mode == 'exact':
+        return int(prorated_won(won(monthly_fee), days_used))
     
-    return round(daily_rate * Decimal(str(days_used))) # Round to nearest integer for currency
+    return _prorated_amount(str(monthly_fee), days_used, getcontext().prec) # Round to nearest integer for currency
 
 def generate_prepayment_schedule(monthly_fee, payment_period_months, fixed_payment_day, delivery_date):
     """
@@ -261,26 +351,39 @@ def generate_postpayment_schedule(monthly_fee, payment_period_months, fixed_paym
 
     return payment_schedule
 
+def normalize_collection_data(df_collection):
+    """
+    수금 내역 DataFrame의 컬럼을 검증하고 형식을 변환합니다.
+    '결제일', '결제금액' 컬럼이 없으면 KeyError를 발생시킵니다.
+    """
+    import pandas as pd # DataFrame을 다룰 때만 필요
+
+    # 필요한 컬럼이 있는지 확인
+    required_columns = ['결제일', '결제금액'] # '결제시간' 컬럼 제거
+    if not all(col in df_collection.columns for col in required_columns):
+        missing_cols = [col for col in required_columns if col not in df_collection.columns]
+        raise KeyError(f"필요한 컬럼이 누락되었습니다: {', '.join(missing_cols)}")
+
+    # '결제일' 컬럼을 datetime 형식으로 변환 (시간 정보 포함)
+    df_collection['결제일'] = pd.to_datetime(df_collection['결제일'])
+    # '결제 금액' 컬럼을 숫자로 변환 (오류 발생 시 NaN)
+    df_collection['결제금액'] = pd.to_numeric(df_collection['결제금액'], errors='coerce')
+    # 결제 금액이 NaN인 행 제거 (선택 사항, 필요에 따라)
+    df_collection.dropna(subset=['결제금액'], inplace=True)
+    if _money_mode == 'exact': # 원 단위 정수로 반올림
+        df_collection['결제금액'] = to_won(df_collection['결제금액'].to_numpy())
+    return df_collection
+
 def read_collection_data_from_excel(file_path):
     """
     Excel 파일에서 수금 내역을 읽어옵니다.
     가정: '결제일', '결제금액' 컬럼이 존재합니다.
     '결제일' 컬럼은 날짜 및 시간 형식이어야 합니다.
     """
+    import pandas as pd # DataFrame을 다룰 때만 필요
+
     try:
-        df_collection = pd.read_excel(file_path)
-        # 필요한 컬럼이 있는지 확인
-        required_columns = ['결제일', '결제금액'] # '결제시간' 컬럼 제거
-        if not all(col in df_collection.columns for col in required_columns):
-            missing_cols = [col for col in required_columns if col not in df_collection.columns]
-            raise KeyError(f"필요한 컬럼이 누락되었습니다: {', '.join(missing_cols)}")
-
-        # '결제일' 컬럼을 datetime 형식으로 변환 (시간 정보 포함)
-        df_collection['결제일'] = pd.to_datetime(df_collection['결제일'])
-        # '결제 금액' 컬럼을 숫자로 변환 (오류 발생 시 NaN)
-        df_collection['결제금액'] = pd.to_numeric(df_collection['결제금액'], errors='coerce')
-        # 결제 금액이 NaN인 행 제거 (선택 사항, 필요에 따라)
-        df_collection.dropna(subset=['결제금액'], inplace=True)
+        df_collection = normalize_collection_data(pd.read_excel(file_path))
 
         return df_collection
     except FileNotFoundError:
@@ -315,18 +418,696 @@ def calculate_overdue_for_installment(scheduled_date, base_monthly_fee, check_po
 
     if overdue_days < 0: # 혹시 모를 음수 방지
         return 0
+    if _money_mode == 'exact':
+        return int(overdue_won(won(base_monthly_fee), overdue_days))
 
+    return _decimal_overdue(base_monthly_fee, overdue_days)
+
+def _decimal_overdue(base_monthly_fee, overdue_days):
     # 총 연체 금액 (FLOOR 적용) - Decimal을 사용하여 정확한 계산 수행
-    total_overdue = math.floor(Decimal(str(base_monthly_fee)) * Decimal('0.0005479452') * Decimal(str(overdue_days)))
-    
-    return total_overdue
+    return math.floor(Decimal(str(base_monthly_fee)) * Decimal('0.0005479452') * Decimal(str(overdue_days)))
+
+# 연체 시작 기준 (결제일 + 4일 12시간 59분) 및 하루의 길이, 마이크로초 단위
+_OVERDUE_GRACE_US = (((4 * 24 + 12) * 60) + 59) * 60 * 1_000_000
+_MICROSECONDS_PER_DAY = 24 * 3600 * 1_000_000
+# 일일 연체율 0.0005479452 = 5479452 * 10^-10
+_OVERDUE_RATE_COEFFICIENT = 5479452
+_OVERDUE_RATE_EXPONENT = -10
+_POWERS_OF_TEN = 10 ** np.arange(19, dtype=np.int64)
+_INT64_MAX = np.iinfo(np.int64).max
+
+def _decimal_operands(values):
+    """
+    금액 배열을 Decimal(str(value))와 같은 값을 갖는 (정수 계수, 10의 지수) 배열 쌍으로 분해합니다.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values.astype(np.int64), np.zeros(values.shape, dtype=np.int64)
+    values = values.astype(np.float64)
+    if np.all((values == np.floor(values)) & (np.abs(values) < 2.0 ** 62)): # int64로 그대로 변환할 수 있는 정수 금액
+        return values.astype(np.int64), np.zeros(values.shape, dtype=np.int64)
+
+    # 소수 금액은 고유값마다 한 번만 Decimal로 분해
+    unique_values, inverse = np.unique(values, return_inverse=True)
+    coefficients = np.empty(len(unique_values), dtype=np.int64)
+    exponents = np.empty(len(unique_values), dtype=np.int64)
+    for k, value in enumerate(unique_values.tolist()):
+        _, digits, exponent = Decimal(str(value)).as_tuple()
+        coefficients[k] = int(''.join(map(str, digits)))
+        exponents[k] = exponent
+    return coefficients[inverse].reshape(values.shape), exponents[inverse].reshape(values.shape)
+
+def _round_significant(coefficients, exponents, precision):
+    """
+    Decimal 컨텍스트의 유효숫자 반올림(ROUND_HALF_EVEN)을 정수 배열 연산으로 재현합니다.
+    값은 coefficients * 10**exponents 로 표현되며 음수가 아니어야 합니다.
+    """
+    digits = np.searchsorted(_POWERS_OF_TEN, coefficients, side='right')
+    shift = np.maximum(digits - precision, 0)
+    divisor = _POWERS_OF_TEN[shift]
+    quotient, remainder = np.divmod(coefficients, divisor)
+    twice_remainder = remainder * 2
+    round_up = (twice_remainder > divisor) | ((twice_remainder == divisor) & (quotient % 2 == 1))
+    return quotient + round_up, exponents + shift
+
+def _floor_decimal(coefficients, exponents):
+    """
+    coefficients * 10**exponents 의 FLOOR 값을 int64 배열로 반환합니다.
+    """
+    scale = _POWERS_OF_TEN[np.abs(exponents)]
+    return np.where(exponents >= 0, coefficients * scale, coefficients // scale)
+
+def calculate_overdue_batch(scheduled_dates, base_fees, check_points):
+    """
+    여러 회차의 연체 금액을 한 번에 계산합니다.
+    calculate_overdue_for_installment()와 같은 규칙(결제일 + 4일 12시간 59분부터 연체, 연체 일수 올림,
+    FLOOR(기본 월요금 * 0.0005479452 * 연체일수))을 적용하며, Decimal 컨텍스트 정밀도에 따른
+    반올림까지 정수 연산으로 재현하므로 결과가 단일 회차 함수와 비트 단위로 일치합니다.
+    중간 계산이 int64 범위를 넘는 회차(유효숫자가 많은 월요금 등)는 단일 회차 함수와 같은 Decimal 연산으로 계산합니다.
+
+    Args:
+      scheduled_dates: 회차별 결제일 (datetime64 배열)
+      base_fees: 계약 시의 기본 월요금 (int64 배열 또는 스칼라)
+      check_points: 연체 계산 기준 시점 (datetime64 배열 또는 스칼라)
+
+    Returns:
+      회차별 연체 금액 (int64 배열, 결제일 또는 기준 시점이 NaT인 회차는 0)
+    """
+    scheduled = np.asarray(scheduled_dates, dtype='datetime64[us]')
+    checks = np.asarray(check_points, dtype='datetime64[us]')
+    scheduled, checks, fees = np.broadcast_arrays(scheduled, checks, np.asarray(base_fees))
+
+    # 연체 시작 기준 시점 이후 경과 시간 (마이크로초) 및 올림 처리한 연체 일수
+    elapsed = (checks - scheduled).astype(np.int64) - _OVERDUE_GRACE_US
+    valid = ~(np.isnat(scheduled) | np.isnat(checks)) & (elapsed >= 0)
+    overdue_days = np.where(valid, -(-elapsed // _MICROSECONDS_PER_DAY), 0)
+    if _money_mode == 'exact':
+        return np.where(valid, overdue_won(to_won(fees), overdue_days), 0)
+
+    # 월요금 * 0.0005479452 * 연체일수 (각 곱셈마다 컨텍스트 정밀도로 반올림)
+    # 유효숫자가 많은 월요금처럼 중간 계수가 int64 범위를 넘는 회차(unsafe)는 0으로 두고 마지막에 Decimal로 따로 계산
+    precision = getcontext().prec
+    fee_coefficients, fee_exponents = _decimal_operands(fees)
+    unsafe = (fee_coefficients < 0) | (fee_coefficients > _INT64_MAX // _OVERDUE_RATE_COEFFICIENT)
+    coefficients, exponents = _round_significant(
+        np.where(unsafe, 0, fee_coefficients) * _OVERDUE_RATE_COEFFICIENT, fee_exponents + _OVERDUE_RATE_EXPONENT, precision
+    )
+    unsafe |= coefficients > _INT64_MAX // np.maximum(overdue_days, 1)
+    coefficients, exponents = _round_significant(np.where(unsafe, 0, coefficients) * overdue_days, exponents, precision)
+    out_of_range = np.abs(exponents) >= len(_POWERS_OF_TEN)
+    scale = _POWERS_OF_TEN[np.where(out_of_range, 0, np.abs(exponents))]
+    unsafe |= out_of_range | ((exponents > 0) & (coefficients > _INT64_MAX // scale))
+    coefficients = np.where(unsafe, 0, coefficients)
+    exponents = np.where(unsafe, 0, exponents)
+
+    result = np.where(valid, _floor_decimal(coefficients, exponents), 0)
+    for position in zip(*np.nonzero(valid & unsafe)):
+        result[position] = _decimal_overdue(fees[position].item(), int(overdue_days[position]))
+    return result
+
+def _round_half_even_to_integer(coefficients, exponents):
+    """
+    coefficients * 10**exponents 를 정수로 반올림(ROUND_HALF_EVEN)한 int64 배열을 반환합니다.
+    """
+    scale = _POWERS_OF_TEN[np.abs(exponents)]
+    quotient, remainder = np.divmod(coefficients, scale)
+    twice_remainder = remainder * 2
+    round_up = (twice_remainder > scale) | ((twice_remainder == scale) & (quotient % 2 == 1))
+    return np.where(exponents >= 0, coefficients * scale, quotient + round_up)
+
+def _calculate_prorated_batch(monthly_fees, days_used):
+    """
+    calculate_prorated_amount()와 같은 일할 금액을 배열 단위로 계산합니다.
+    ROUND((월요금 * 12) / 365 * 사용일수)의 각 Decimal 연산 반올림을 정수 연산으로 재현합니다.
+    """
+    if _money_mode == 'exact':
+        return prorated_won(to_won(monthly_fees), days_used)
+    precision = getcontext().prec
+    coefficients, exponents = _decimal_operands(monthly_fees)
+    days_used = np.asarray(days_used, dtype=np.int64)
+
+    # 월요금 * 12
+    coefficients, exponents = _round_significant(coefficients * 12, exponents, precision)
+
+    # (월요금 * 12) / 365: 몫이 정확히 precision 자리가 되도록 10의 거듭제곱을 곱한 뒤 나눔
+    digits = np.searchsorted(_POWERS_OF_TEN, coefficients, side='right')
+    shift = precision + 3 - digits
+    quotient = coefficients * _POWERS_OF_TEN[shift] // 365
+    shift = np.where(quotient >= _POWERS_OF_TEN[precision], shift - 1, shift)
+    quotient, remainder = np.divmod(coefficients * _POWERS_OF_TEN[shift], 365)
+    daily_rate_coefficients = quotient + (remainder * 2 > 365)
+    daily_rate_exponents = exponents - shift
+
+    # 일일 요금 * 사용일수 후 원 단위로 반올림
+    coefficients, exponents = _round_significant(
+        daily_rate_coefficients * days_used, daily_rate_exponents, precision
+    )
+    return _round_half_even_to_integer(coefficients, exponents)
+
+def _month_lengths(months):
+    """
+    datetime64[M] 배열의 각 월의 일수를 반환합니다. 모든 월이 테이블 범위 안이면 테이블에서 읽습니다.
+    """
+    index = months.astype(np.int64)
+    if len(index) == 0 or (index.min() >= 0 and index.max() < len(_MONTH_LENGTH_ARRAY)):
+        return _MONTH_LENGTH_ARRAY[index]
+    return ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(np.int64)
+
+def _clamped_dates(months, target_days):
+    """
+    각 월의 target_day 날짜를 반환합니다. 월말을 넘는 날짜는 해당 월의 마지막 날로 조정합니다.
+    add_months_and_set_day()의 배열 버전입니다.
+    """
+    index = months.astype(np.int64)
+    target_days = np.broadcast_to(target_days, index.shape)
+    if len(index) and index.min() >= 0 and index.max() < len(_CLAMPED_DAY_ARRAY) \
+            and target_days.min() >= 0 and target_days.max() <= 31:
+        days = _CLAMPED_DAY_ARRAY[index, target_days]
+    else:
+        days = np.minimum(target_days, _month_lengths(months))
+    return months.astype('datetime64[D]') + (days - 1)
+
+# generate_schedules()의 회차 유형
+_ROW_DAY_BEFORE_DELIVERY = 0 # 선납: 출고 전일, 월요금
+_ROW_REGULAR = 1 # 고정 결제일, 월요금
+_ROW_FIRST_PRORATED = 2 # 익월 고정 결제일, 출고월 일할 금액
+_ROW_LAST_PRORATED = 3 # 선납: 마지막 달 고정 결제일, 마지막 달 1일 ~ 출고일자 일할 금액
+_ROW_FINAL_PRORATED = 4 # 후납: 계약 종료일, 종료월 1일 ~ 종료일 일할 금액
+
+def generate_schedules(contracts):
+    """
+    여러 계약의 결제 스케줄을 한 번에 생성합니다.
+    결과는 계약별로 generate_prepayment_schedule() / generate_postpayment_schedule()을
+    호출한 것과 동일하며, 월 계산, 월말 조정, 일할 계산을 모두 배열 연산으로 처리합니다.
+
+    Args:
+      contracts: 'monthly_fee', 'payment_period_months', 'fixed_payment_day',
+                 'delivery_date', 'payment_type' ('선납' 또는 '후납') 컬럼을 가진 DataFrame.
+                 'contract_id' 컬럼이 없으면 DataFrame의 인덱스를 계약 ID로 사용합니다.
+
+    Returns:
+      'contract_id', '회차', '결제일', '월요금' 컬럼을 가진 long format DataFrame
+      (계약 순서, 회차 순서로 정렬, 월요금은 원 단위 int64)
+    """
+    return generate_schedule_arrays(contracts).to_frame()
+
+def generate_schedule_arrays(contracts):
+    """
+    generate_schedules()와 같은 스케줄을 DataFrame 대신 배열 기반 Schedule로 반환합니다.
+    """
+    import pandas as pd # 계약 목록 DataFrame의 출고일 변환에 필요
+
+    if 'contract_id' in contracts.columns:
+        contract_ids = contracts['contract_id'].to_numpy()
+    else:
+        contract_ids = contracts.index.to_numpy()
+    monthly_fees = contracts['monthly_fee'].to_numpy()
+    if _money_mode == 'exact':
+        monthly_fees = to_won(monthly_fees)
+    periods = contracts['payment_period_months'].to_numpy(dtype=np.int64)
+    payment_days = contracts['fixed_payment_day'].to_numpy(dtype=np.int64)
+    delivery_dates = pd.to_datetime(contracts['delivery_date']).to_numpy().astype('datetime64[D]')
+    payment_types = contracts['payment_type'].to_numpy()
+
+    is_prepayment = payment_types == '선납'
+    invalid = ~(is_prepayment | (payment_types == '후납'))
+    if invalid.any():
+        raise ValueError(f"올바르지 않은 지불 방식이 포함되어 있습니다: {sorted(set(payment_types[invalid].tolist()))}")
+
+    delivery_months = delivery_dates.astype('datetime64[M]')
+    delivery_days = (delivery_dates - delivery_months.astype('datetime64[D]')).astype(np.int64) + 1
+    # 선납에서 출고일이 고정 결제일보다 늦은 경우 (일할 회차가 앞뒤로 붙는 시나리오)
+    is_split = delivery_days > payment_days
+
+    # 계약별 회차 수
+    row_counts = np.where(
+        is_prepayment,
+        np.where(is_split, np.maximum(periods - 2, 0) + 3, np.maximum(periods - 1, 0) + 1),
+        np.where(periods >= 2, periods + 1, 1),
+    )
+
+    # 회차 단위로 계약 속성을 펼침
+    row_contract = np.repeat(np.arange(len(contracts)), row_counts)
+    row_offsets = np.repeat(np.cumsum(row_counts) - row_counts, row_counts)
+    k = np.arange(len(row_contract)) - row_offsets # 계약 내 0부터 시작하는 회차 위치
+    is_last = k == row_counts[row_contract] - 1
+    n = periods[row_contract]
+    prepayment = is_prepayment[row_contract]
+    split = is_split[row_contract]
+
+    row_kind = np.select(
+        [
+            prepayment & (k == 0),
+            prepayment & split & (k == 1),
+            prepayment & split & is_last,
+            ~prepayment & (k == 0),
+            ~prepayment & (k == n),
+        ],
+        [_ROW_DAY_BEFORE_DELIVERY, _ROW_FIRST_PRORATED, _ROW_LAST_PRORATED, _ROW_FIRST_PRORATED, _ROW_FINAL_PRORATED],
+        default=_ROW_REGULAR,
+    )
+
+    # 출고월 기준 결제월 오프셋
+    # 선납은 k번째 회차가 k개월 뒤, 후납의 정기 회차는 k+1개월 뒤이며
+    # 후납의 마지막 정기 회차는 계약 종료월의 전월에 청구됩니다.
+    month_offsets = np.where(
+        prepayment,
+        np.where(row_kind == _ROW_LAST_PRORATED, n, k),
+        np.select([row_kind == _ROW_FINAL_PRORATED, (k == n - 1) & (k > 0)], [n, n - 1], default=k + 1),
+    )
+    base_months = delivery_months[row_contract]
+    payment_months = base_months + month_offsets
+    d = delivery_days[row_contract]
+
+    target_days = np.where(row_kind == _ROW_FINAL_PRORATED, d, payment_days[row_contract])
+    payment_dates = np.where(
+        row_kind == _ROW_DAY_BEFORE_DELIVERY,
+        delivery_dates[row_contract] - 1,
+        _clamped_dates(payment_months, target_days),
+    )
+
+    # 일할 금액 (일할 회차에 대해서만 계산)
+    amounts = monthly_fees[row_contract].copy()
+    prorated = np.flatnonzero(
+        (row_kind == _ROW_FIRST_PRORATED) | (row_kind == _ROW_LAST_PRORATED) | (row_kind == _ROW_FINAL_PRORATED)
+    )
+    if len(prorated):
+        kind = row_kind[prorated]
+        days_used = np.select(
+            [kind == _ROW_FIRST_PRORATED, kind == _ROW_LAST_PRORATED],
+            [
+                _month_lengths(base_months[prorated]) - d[prorated] + 1,
+                np.minimum(d[prorated], _month_lengths(payment_months[prorated] - 1)),
+            ],
+            default=np.minimum(d[prorated], _month_lengths(payment_months[prorated])),
+        )
+        prorated_amounts = _calculate_prorated_batch(amounts[prorated], days_used)
+        if amounts.dtype.kind in 'iuf':
+            amounts[prorated] = prorated_amounts
+        else:
+            amounts[prorated] = prorated_amounts.tolist()
+
+    return Schedule(
+        contract_ids, np.concatenate([[0], np.cumsum(row_counts)]), payment_dates, amounts,
+        np.isin(row_kind, [_ROW_FIRST_PRORATED, _ROW_LAST_PRORATED, _ROW_FINAL_PRORATED]),
+    )
+
+# 결제 스케줄 DataFrame의 컬럼 구성 (콘솔 출력 및 Excel 내보내기 순서)
+SCHEDULE_COLUMNS = ['결제일', '월요금', '납부월요금', '잔여월요금', '연체금액', '납부연체금액', '잔여연체금액', '최종납부일']
+
+def build_schedule_dataframe(schedule):
+    """
+    (payment_date, payment_amount) 튜플 리스트를 결제 스케줄 DataFrame으로 변환합니다.
+    회차는 1부터 시작하며, 수금/연체 관련 컬럼은 미납 상태로 초기화됩니다.
+    """
+    import pandas as pd # DataFrame을 다룰 때만 필요
+
+    df = pd.DataFrame(schedule, columns=['결제일', '월요금'])
+    df.index.name = '회차'
+    df.index = df.index + 1 # 회차를 1부터 시작하도록 조정
+    zero = 0.0
+    if _money_mode == 'exact': # 금액 컬럼을 원 단위 정수로
+        df['월요금'] = to_won(df['월요금'].to_numpy())
+        zero = 0
+
+    df['납부월요금'] = zero
+    df['잔여월요금'] = df['월요금'] # 초기 잔여월요금은 월요금과 동일
+    df['연체금액'] = zero # 계산된 연체금액 (미납된 경우)
+    df['납부연체금액'] = zero
+    df['잔여연체금액'] = zero # 초기 잔여연체금액은 0
+    df['최종납부일'] = pd.NaT # 각 회차에 대한 최종 납부일, NaT로 초기화
+    return df
+
+# 수금 반영으로 변경되는 회차별 상태 컬럼
+STATE_COLUMNS = ['납부월요금', '잔여월요금', '연체금액', '납부연체금액', '잔여연체금액', '최종납부일']
+
+def new_allocation_state(amounts):
+    """
+    회차별 청구 금액으로 미납 상태의 수금 반영 상태를 만듭니다.
+    '최종납부일'은 datetime64 배열, 나머지 STATE_COLUMNS는 리스트입니다.
+    """
+    count = len(amounts)
+    zero = 0.0
+    if _money_mode == 'exact': # 금액을 원 단위 정수로
+        amounts = to_won(amounts).tolist() if count else []
+        zero = 0
+    return {
+        '납부월요금': [zero] * count,
+        '잔여월요금': list(amounts), # 초기 잔여월요금은 월요금과 동일
+        '연체금액': [zero] * count,
+        '납부연체금액': [zero] * count,
+        '잔여연체금액': [zero] * count,
+        '최종납부일': np.full(count, np.datetime64('NaT'), dtype='datetime64[us]'),
+    }
+
+def allocate_payments(due_dates, state, collection_dates, collection_amounts, monthly_fee, timeline=None):
+    """
+    결제일 순으로 정렬된 수금 배열을 회차별 상태(state)에 반영합니다. state는 직접 변경됩니다.
+
+    회차 배열과 수금 배열을 한 번만 병합하며 순회합니다.
+    각 수금액은 회차 순서대로 잔여연체금액에 먼저, 그 다음 잔여월요금에 반영됩니다.
+    수금 시점의 연체금액은 회차별로 마지막 반영 수금 시점에 대해서만 계산합니다.
+
+    Args:
+      due_dates: 회차별 결제일 (datetime64 배열)
+      state: new_allocation_state() 형식의 회차별 상태
+      collection_dates: 수금 시점 (결제일 순으로 정렬된 datetime64 배열)
+      collection_amounts: 수금액 리스트
+      monthly_fee: 연체 계산에 사용할 계약 시의 기본 월요금
+      timeline: 리스트를 주면 수금이 회차에 반영될 때마다
+                (회차 위치, 수금 위치, 납부월요금, 잔여월요금, 납부연체금액, 잔여연체금액)을 추가합니다.
+    """
+    due_dates = np.asarray(due_dates, dtype='datetime64[us]')
+    collection_dates = np.asarray(collection_dates, dtype='datetime64[us]')
+    collection_amounts = list(collection_amounts)
+    if _money_mode == 'exact' and collection_amounts:
+        collection_amounts = to_won(collection_amounts).tolist()
+    paid_principal = state['납부월요금']
+    remaining_principal = state['잔여월요금']
+    overdue_amounts = state['연체금액']
+    paid_overdue = state['납부연체금액']
+    remaining_overdue = state['잔여연체금액']
+    last_paid_dates = state['최종납부일']
+
+    # 회차별로 마지막으로 반영된 수금의 위치 (수금 시점 연체금액 계산용)
+    last_collection_idx = [None] * len(due_dates)
+
+    # 수금 내역을 결제 스케줄에 반영 (연체금액 우선, 그 다음 월요금)
+    collection_idx = 0
+    collection_count = len(collection_amounts)
+    for inst_idx in range(len(due_dates)):
+        if collection_idx >= collection_count: # 모든 수금 내역을 소진했으면 중단
+            break
+
+        while collection_idx < collection_count and \
+              (remaining_overdue[inst_idx] > 0 or remaining_principal[inst_idx] > 0):
+            collected_amount = collection_amounts[collection_idx]
+            if collected_amount <= 0: # 이미 소진된 수금액은 건너뛰기
+                collection_idx += 1
+                continue
+
+            last_collection_idx[inst_idx] = collection_idx
+
+            # 1. 잔여연체금액에 먼저 반영
+            apply_to_overdue = min(collected_amount, remaining_overdue[inst_idx])
+            paid_overdue[inst_idx] += apply_to_overdue
+            remaining_overdue[inst_idx] -= apply_to_overdue
+            collected_amount -= apply_to_overdue
+
+            # 2. 잔여월요금에 반영
+            apply_to_principal = min(collected_amount, remaining_principal[inst_idx])
+            paid_principal[inst_idx] += apply_to_principal
+            remaining_principal[inst_idx] -= apply_to_principal
+            collected_amount -= apply_to_principal
+
+            if apply_to_overdue > 0 or apply_to_principal > 0:
+                last_paid_dates[inst_idx] = collection_dates[collection_idx]
+                if timeline is not None:
+                    timeline.append((
+                        inst_idx, collection_idx, paid_principal[inst_idx], remaining_principal[inst_idx],
+                        paid_overdue[inst_idx], remaining_overdue[inst_idx],
+                    ))
+
+            collection_amounts[collection_idx] = collected_amount
+
+            if collected_amount <= 0: # 해당 수금 건이 모두 소진되면 다음 수금 건으로
+                collection_idx += 1
+            else: # 수금 건이 남았지만 현재 회차 잔여금액/연체금액이 0이면 다음 회차로
+                break
+
+    # 수금 시점까지 발생한 연체금액 (회차별 마지막 수금 시점 기준, 한 번에 계산)
+    touched = [i for i, last_idx in enumerate(last_collection_idx) if last_idx is not None]
+    if touched:
+        touched_overdue = calculate_overdue_batch(
+            due_dates[touched],
+            monthly_fee,
+            collection_dates[[last_collection_idx[i] for i in touched]],
+        )
+        for i, overdue_amount in zip(touched, touched_overdue.tolist()):
+            overdue_amounts[i] = overdue_amount
+
+def settle_overdue(due_dates, state, monthly_fee, as_of, billed_installment_count=None):
+    """
+    수금 반영 후 청구된 회차의 연체 금액을 as_of 기준으로 재계산합니다. state는 직접 변경됩니다.
+
+    Args:
+      due_dates: 회차별 결제일 (datetime64 배열)
+      state: allocate_payments()로 수금을 반영한 회차별 상태
+      monthly_fee: 연체 계산에 사용할 계약 시의 기본 월요금
+      as_of: 최종 연체 금액을 재계산할 기준 시점
+      billed_installment_count: 현재 청구된 회차 수 (None이면 결제일이 as_of 이전인 회차 수)
+    """
+    due_dates = np.asarray(due_dates, dtype='datetime64[us]')
+    unpaid = reset_billed_overdue(due_dates, state, as_of, billed_installment_count)
+    if unpaid:
+        apply_final_overdue(state, unpaid, calculate_overdue_batch(due_dates[unpaid], monthly_fee, as_of))
+
+def reset_billed_overdue(due_dates, state, as_of, billed_installment_count=None):
+    """
+    settle_overdue()의 첫 단계로, 청구된 회차의 연체금액을 0으로 초기화하고 연체를 계산할 미납 회차 위치를 반환합니다.
+    여러 계약의 연체 금액을 한 번에 계산할 때는 이 함수와 apply_final_overdue() 사이에서
+    calculate_overdue_batch()를 모아서 호출합니다. state는 직접 변경됩니다.
+    """
+    remaining_principal = state['잔여월요금']
+    overdue_amounts = state['연체금액']
+    remaining_overdue = state['잔여연체금액']
+
+    # 최종 연체 금액 재계산 (수금 반영 후, as_of 기준)
+    if billed_installment_count is None:
+        billed_installment_count = int(np.count_nonzero(due_dates <= np.datetime64(as_of)))
+    billed_installment_count = min(billed_installment_count, len(due_dates))
+
+    # 완전히 납부된 회차는 연체금액 0, 미납된 회차만 연체 계산
+    unpaid = [i for i in range(billed_installment_count)
+              if remaining_principal[i] > 0 or remaining_overdue[i] > 0]
+    for i in range(billed_installment_count):
+        overdue_amounts[i] = 0
+        remaining_overdue[i] = 0
+    return unpaid
+
+def apply_final_overdue(state, unpaid, final_overdue):
+    """
+    reset_billed_overdue()가 반환한 미납 회차에 as_of 기준 연체 금액을 반영합니다. state는 직접 변경됩니다.
+    """
+    overdue_amounts = state['연체금액']
+    paid_overdue = state['납부연체금액']
+    remaining_overdue = state['잔여연체금액']
+    for i, final_overdue_amount in zip(unpaid, np.asarray(final_overdue).tolist()):
+        # 최종 연체금액은 계산된 연체금액에서 납부된 연체금액을 제외한 값
+        overdue_amounts[i] = final_overdue_amount
+        remaining_overdue[i] = max(0, final_overdue_amount - paid_overdue[i])
+
+def apply_collections(due_dates, state, collection_dates, collection_amounts, monthly_fee, as_of, billed_installment_count=None):
+    """
+    allocate_payments()로 수금을 반영한 뒤 settle_overdue()로 as_of 기준 연체 금액을 계산합니다.
+    """
+    allocate_payments(due_dates, state, collection_dates, collection_amounts, monthly_fee)
+    settle_overdue(due_dates, state, monthly_fee, as_of, billed_installment_count)
+
+def allocate_collections(schedule, collections, monthly_fee, as_of, billed_installment_count=None):
+    """
+    수금 내역을 결제 스케줄에 반영하고 연체 금액을 계산합니다.
+    계산은 apply_collections()에서 배열 단위로 수행합니다.
+
+    Args:
+      schedule: (payment_date, payment_amount) 튜플의 리스트 또는 build_schedule_dataframe()의 DataFrame
+      collections: '결제일', '결제금액' 컬럼을 가진 수금 내역 DataFrame
+      monthly_fee: 연체 계산에 사용할 계약 시의 기본 월요금
+      as_of: 최종 연체 금액을 재계산할 기준 시점 (datetime 객체)
+      billed_installment_count: 현재 청구된 회차 수 (None이면 결제일이 as_of 이전인 회차 수)
+
+    Returns:
+      SCHEDULE_COLUMNS 컬럼을 가진 결제 스케줄 DataFrame (입력 스케줄은 변경하지 않음)
+    """
+    import pandas as pd # DataFrame을 다룰 때만 필요
 
+    if isinstance(schedule, pd.DataFrame):
+        df = schedule.copy()
+    else:
+        df = build_schedule_dataframe(schedule)
+
+    # 수금 내역을 결제일 기준으로 정렬 (결제시간은 이미 결제일에 포함)
+    collections = collections.sort_values(by=['결제일']).reset_index(drop=True)
+
+    state = {column: df[column].tolist() for column in STATE_COLUMNS}
+    state['최종납부일'] = df['최종납부일'].to_numpy(dtype='datetime64[us]')
+    apply_collections(
+        df['결제일'].to_numpy(dtype='datetime64[us]'),
+        state,
+        collections['결제일'].to_numpy(dtype='datetime64[us]'),
+        collections['결제금액'].tolist(),
+        monthly_fee,
+        as_of,
+        billed_installment_count,
+    )
+
+    for column in STATE_COLUMNS:
+        df[column] = state[column]
+    return df[SCHEDULE_COLUMNS]
+
+def month_end_check_points(first_month, last_month):
+    """
+    first_month부터 last_month까지 각 월의 마지막 날 23:59:59 시점을 datetime64 배열로 반환합니다.
+    (예: month_end_check_points('2023-01', '2024-12')는 24개 시점)
+    """
+    months = np.arange(np.datetime64(first_month, 'M'), np.datetime64(last_month, 'M') + 1)
+    return (months + 1).astype('datetime64[us]') - np.timedelta64(1, 's')
+
+def settle_as_of(due_dates, amounts, collection_dates, collection_amounts, monthly_fee, check_points):
+    """
+    여러 기준 시점의 회차별 상태를 수금 내역을 한 번만 반영하여 계산합니다.
+    각 기준 시점의 결과는 그 시점까지의 수금 내역만으로 apply_collections()를 실행한 결과
+    (청구 회차는 결제일이 기준 시점 이전인 회차)와 같습니다.
+
+    수금은 결제일 순으로 앞 회차부터 반영되므로, 기준 시점 t의 상태는 전체 수금을 반영하는 과정에서
+    t 이전 수금까지 반영한 시점의 상태입니다. 전체 수금을 한 번 반영하면서 회차별 상태 변화를 기록하고,
+    기준 시점마다 회차별로 그 시점까지의 마지막 변화를 찾아 as_of 연체 계산만 배열 단위로 수행합니다.
+
+    Args:
+      due_dates: 회차별 결제일 (datetime64 배열)
+      amounts: 회차별 청구 금액
+      collection_dates: 수금 시점 (결제일 순으로 정렬된 datetime64 배열)
+      collection_amounts: 수금액 리스트
+      monthly_fee: 연체 계산에 사용할 계약 시의 기본 월요금
+      check_points: 기준 시점 배열 (datetime64로 변환 가능한 값)
+
+    Returns:
+      STATE_COLUMNS를 키로, (기준 시점 수, 회차 수) 배열을 값으로 가진 dict
+    """
+    due_dates = np.asarray(due_dates, dtype='datetime64[us]')
+    collection_dates = np.asarray(collection_dates, dtype='datetime64[us]')
+    check_points = np.asarray(check_points, dtype='datetime64[us]').reshape(-1)
+    count = len(due_dates)
+
+    timeline = []
+    allocate_payments(due_dates, new_allocation_state(amounts), collection_dates, collection_amounts, monthly_fee, timeline)
+
+    # 상태 변화는 회차 순, 같은 회차 안에서는 수금 순으로 기록되므로 회차별로 연속 구간이며,
+    # 수금 위치가 줄어들지 않으므로 기준 시점까지의 변화는 앞에서부터 n개입니다.
+    # 마지막 항목은 변화가 없는 경우의 초기값 자리입니다.
+    installment_positions = np.array([event[0] for event in timeline], dtype=np.int64)
+    event_dates = collection_dates[np.array([event[1] for event in timeline], dtype=np.int64)]
+    amount_dtype = np.int64 if _money_mode == 'exact' else np.float64
+    event_values = [np.array([event[column] for event in timeline] + [0], dtype=amount_dtype) for column in range(2, 6)]
+    event_dates = np.append(event_dates, np.datetime64('NaT'))
+
+    starts = np.searchsorted(installment_positions, np.arange(count), side='left')
+    ends = np.searchsorted(installment_positions, np.arange(count), side='right')
+    applied = np.searchsorted(event_dates[:-1], check_points, side='right')
+    last_event = np.minimum(applied[:, np.newaxis], ends[np.newaxis, :]) - 1
+    touched = last_event >= starts[np.newaxis, :]
+    last_event = np.where(touched, last_event, len(timeline))
+
+    paid_principal, remaining_principal, paid_overdue, remaining_overdue = (values[last_event] for values in event_values)
+    remaining_principal = np.where(touched, remaining_principal, np.asarray(amounts, dtype=amount_dtype)[np.newaxis, :])
+    last_paid_dates = event_dates[last_event]
+
+    # 수금 반영 시점의 연체금액 (마지막으로 반영된 수금 시점 기준, 반영된 수금이 없으면 0)
+    overdue_amounts = calculate_overdue_batch(due_dates[np.newaxis, :], monthly_fee, last_paid_dates)
+
+    # 청구된 회차는 기준 시점으로 연체 금액을 재계산 (완납 회차는 0)
+    billed_counts = np.count_nonzero(due_dates[np.newaxis, :] <= check_points[:, np.newaxis], axis=1)
+    billed = np.arange(count)[np.newaxis, :] < billed_counts[:, np.newaxis]
+    unpaid = billed & ((remaining_principal > 0) | (remaining_overdue > 0))
+    final_overdue = calculate_overdue_batch(due_dates[np.newaxis, :], monthly_fee, check_points[:, np.newaxis])
+    overdue_amounts = np.where(billed, np.where(unpaid, final_overdue, 0), overdue_amounts)
+    remaining_overdue = np.where(
+        billed, np.where(unpaid, np.maximum(0, final_overdue - paid_overdue), 0), remaining_overdue
+    )
+
+    return {
+        '납부월요금': paid_principal,
+        '잔여월요금': remaining_principal,
+        '연체금액': overdue_amounts,
+        '납부연체금액': paid_overdue,
+        '잔여연체금액': remaining_overdue,
+        '최종납부일': last_paid_dates,
+    }
+
+def allocate_collections_as_of(schedule, collections, monthly_fee, check_points):
+    """
+    여러 기준 시점에 대해 수금 및 연체 금액을 반영한 결제 스케줄을 한 번에 계산합니다.
+    각 기준 시점의 결과는 그 시점까지의 수금 내역으로 allocate_collections(as_of=기준 시점)를 실행한 결과와 같습니다.
+
+    Args:
+      schedule: (payment_date, payment_amount) 튜플의 리스트 또는 build_schedule_dataframe()의 DataFrame
+      collections: '결제일', '결제금액' 컬럼을 가진 수금 내역 DataFrame
+      monthly_fee: 연체 계산에 사용할 계약 시의 기본 월요금
+      check_points: 기준 시점 목록 (예: month_end_check_points('2023-01', '2024-12'))
+
+    Returns:
+      '기준시점', '회차' 및 SCHEDULE_COLUMNS 컬럼을 가진 long format DataFrame (기준 시점 순, 회차 순)
+    """
+    import pandas as pd # DataFrame을 다룰 때만 필요
+
+    if not isinstance(schedule, pd.DataFrame):
+        schedule = build_schedule_dataframe(schedule)
+    collections = collections.sort_values(by=['결제일'], kind='stable')
+    check_points = np.asarray(check_points, dtype='datetime64[us]').reshape(-1)
+
+    states = settle_as_of(
+        schedule['결제일'].to_numpy(dtype='datetime64[us]'),
+        schedule['월요금'].tolist(),
+        collections['결제일'].to_numpy(dtype='datetime64[us]'),
+        collections['결제금액'].tolist(),
+        monthly_fee,
+        check_points,
+    )
+    count = len(schedule)
+    df = pd.DataFrame({
+        '기준시점': np.repeat(check_points, count),
+        '회차': np.tile(np.arange(1, count + 1), len(check_points)),
+        '결제일': np.tile(schedule['결제일'].to_numpy(dtype='datetime64[us]'), len(check_points)),
+        '월요금': np.tile(schedule['월요금'].to_numpy(), len(check_points)),
+    })
+    for column in STATE_COLUMNS:
+        df[column] = states[column].reshape(-1)
+    return df[['기준시점', '회차'] + SCHEDULE_COLUMNS]
 
 if __name__ == "__main__":
+    # PyInstaller로 번들링된 실행 파일에서 프로세스 풀을 사용하기 위해 필요
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    # 환경 변수 ADJUSTMENT_PROFILE이 설정되어 있으면 단계별 소요 시간 측정 (종료 시 JSON 보고서 기록)
+    from adjustment_profile import enable_from_environment
+    enable_from_environment()
+
+    # 'batch' 하위 명령: 대화형 입력 없이 계약 목록 전체를 일괄 처리
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        from adjustment_batch import main as batch_main
+        sys.exit(batch_main(sys.argv[2:]))
+    # 'serve'/'loadgen' 하위 명령: 로컬 정산 서비스 실행 및 부하 측정
+    if len(sys.argv) > 1 and sys.argv[1] in ('serve', 'loadgen'):
+        from adjustment_service import main as service_main
+        sys.exit(service_main(sys.argv[1:]))
+    # 'scenario' 하위 명령: 기준 계약의 조건을 바꿔 가며 결제 스케줄과 연체 금액을 비교
+    if len(sys.argv) > 1 and sys.argv[1] == 'scenario':
+        from adjustment_scenario import main as scenario_main
+        sys.exit(scenario_main(sys.argv[2:]))
+
+    # 환경 변수 ADJUSTMENT_MONEY_MODE로 금액 계산 방식 지정 (하위 명령은 각자의 main()에서 처리)
+    try:
+        set_money_mode(money_mode_from_environment())
+    except ValueError as e:
+        print(f"오류: {e}")
+        sys.exit(2)
+
+    # 계약 정보를 입력하는 동안 DataFrame 출력과 Excel 내보내기에 필요한 모듈(pandas 포함)을 미리 불러옴
+    import threading
+    threading.Thread(target=__import__, args=('adjustment_export',), daemon=True).start()
+
     print("\n--- 자동차 렌트 요금 정산 스케줄 검증 및 Excel 내보내기 ---")
 
+    # Excel 내보내기는 백그라운드 스레드에서 처리하고 (파일 이름, Future)를 모아 두었다가 종료 전에 결과를 확인
+    from concurrent.futures import ThreadPoolExecutor
+    export_executor = ThreadPoolExecutor(max_workers=1)
+    pending_exports = []
+
     try:
-        monthly_fee = float(input("월요금을 입력하세요 (예: 500000): "))
+        monthly_fee_text = input("월요금을 입력하세요 (예: 500000): ")
+        # exact 방식은 float를 거치지 않고 원 단위 정수로 변환
+        monthly_fee = won(monthly_fee_text) if money_mode() == 'exact' else float(monthly_fee_text)
         payment_period_months = int(input("총 결제 기간을 입력하세요 (개월, 예: 36): "))
         fixed_payment_day = int(input("매월 고정 결제일을 입력하세요 (1-31, 예: 25): "))
         delivery_date_str = input("차량 출고일을 입력하세요 (YYYY-MM-DD, 예: 2023-09-15): ")
@@ -347,18 +1128,10 @@ if __name__ == "__main__":
 
         if schedule:
             print("\n--- 생성된 결제 스케줄 ---")
+            from adjustment_export import export_schedule # 미리 불러오는 중이면 완료될 때까지 대기
+
             # 스케줄을 DataFrame으로 변환
-            df = pd.DataFrame(schedule, columns=['결제일', '월요금']) # '결제금액' -> '월요금'
-            df.index.name = '회차'
-            df.index = df.index + 1 # 회차를 1부터 시작하도록 조정
-            
-            # 납부월요금, 잔여월요금, 연체금액, 납부연체금액, 잔여연체금액, 최종납부일 컬럼 추가 및 초기화
-            df['납부월요금'] = 0.0
-            df['잔여월요금'] = df['월요금'] # 초기 잔여월요금은 월요금과 동일
-            df['연체금액'] = 0.0 # 계산된 연체금액 (미납된 경우)
-            df['납부연체금액'] = 0.0
-            df['잔여연체금액'] = 0.0 # 초기 잔여연체금액은 0
-            df['최종납부일'] = pd.NaT # 각 회차에 대한 최종 납부일 (datetime 객체), NaT로 초기화
+            df = build_schedule_dataframe(schedule)
 
             print(df.to_string()) # 콘솔 출력
             print("------------------------")
@@ -368,33 +1141,55 @@ if __name__ == "__main__":
             if export_to_excel == '예':
                 excel_filename = "상환스케쥴표.xlsx" # 파일 이름을 고정
                 
-                df.to_excel(excel_filename, index=True) 
-                print(f"스케줄이 '{excel_filename}' 파일로 성공적으로 저장되었습니다.")
+                pending_exports.append((excel_filename, export_executor.submit(export_schedule, df, excel_filename)))
+                print(f"스케줄을 '{excel_filename}' 파일로 저장하는 중입니다 (백그라운드).")
             else:
                 print("Excel 파일 저장을 건너뛰었습니다.")
 
             # 수금 내역 Excel 파일 입력 여부 확인
             import_collection_data_choice = input("수금 내역 Excel 파일을 입력하시겠습니까? (예/아니오): ").lower()
             if import_collection_data_choice == '예':
+                from tkinter import Tk, filedialog # 파일 대화상자를 사용할 때만 임포트
+
                 # Tkinter 루트 윈도우 생성 (숨김 처리)
                 root = Tk()
                 root.withdraw()
                 
-                collection_file_path = filedialog.askopenfilename(
-                    title="수금 내역 Excel 파일 선택",
+                # 지점별 수금 내역 파일을 여러 개 선택할 수 있음
+                collection_file_paths = filedialog.askopenfilenames(
+                    title="수금 내역 Excel 파일 선택 (여러 개 선택 가능)",
                     filetypes=[("Excel files", "*.xlsx *.xls")]
                 )
                 
-                if collection_file_path:
-                    df_collection = read_collection_data_from_excel(collection_file_path)
+                if collection_file_paths:
+                    from adjustment_io import read_collection_files # 여러 파일을 프로세스 풀에서 동시에 읽어 결제일 순으로 합침
+
+                    df_collection, file_errors = read_collection_files(
+                        list(collection_file_paths), workers=min(len(collection_file_paths), os.cpu_count() or 1)
+                    )
+                    for file_error in file_errors:
+                        print(f"오류: '{file_error['file']}' 파일을 읽지 못했습니다. {file_error['error']}")
+                    if file_errors:
+                        print(f"수금 내역 파일 {len(collection_file_paths)}개 중 {len(file_errors)}개를 제외했습니다.")
+                    if len(file_errors) == len(collection_file_paths):
+                        df_collection = None
+                    if df_collection is not None and 'contract_id' in df_collection.columns:
+                        # 여러 계약이 섞인 수금 내역이면 입력한 계약의 수금 내역만 사용
+                        from adjustment_io import build_collection_index, collection_positions, unmatched_collections
+
+                        collection_index = build_collection_index(df_collection)
+                        contract_id = input("수금 내역에서 사용할 계약번호를 입력하세요: ").strip()
+                        if contract_id not in collection_index['groups'] and contract_id.isdigit():
+                            contract_id = int(contract_id) # Excel에서 숫자로 읽힌 계약번호
+                        df_collection = collection_index['collections'].iloc[collection_positions(collection_index, contract_id)]
+                        excluded = unmatched_collections(collection_index, [contract_id])
+                        print(f"다른 계약 또는 계약번호가 없는 수금 내역 {len(excluded)}건은 제외했습니다.")
+
                     if df_collection is not None:
                         print("\n--- 읽어온 수금 내역 ---")
                         print(df_collection.to_string())
                         print("------------------------")
                         
-                        # 수금 내역을 결제일 기준으로 정렬 (결제시간은 이미 결제일에 포함)
-                        df_collection = df_collection.sort_values(by=['결제일']).reset_index(drop=True)
-
                         # 현재 청구된 회차 입력받기 (수금 적용 및 연체 계산 전에 필요)
                         try:
                             billed_installment_count = int(input("현재 몇 회차까지 청구되었는지 입력하세요: "))
@@ -408,91 +1203,40 @@ if __name__ == "__main__":
                         if billed_installment_count > 0:
                             print(f"현재 {billed_installment_count}회차까지 청구되었습니다.")
 
-                            # 수금 내역을 결제 스케줄에 반영 (연체금액 우선, 그 다음 월요금)
-                            collection_idx = 0
-                            for inst_idx in range(len(df)): # 각 회차를 순회
-                                if collection_idx >= len(df_collection): # 모든 수금 내역을 소진했으면 중단
-                                    break
-
-                                # 해당 회차에 수금액 반영
-                                while collection_idx < len(df_collection) and \
-                                      (df.loc[df.index[inst_idx], '잔여연체금액'] > 0 or df.loc[df.index[inst_idx], '잔여월요금'] > 0):
-                                    
-                                    collected_amount = df_collection.loc[collection_idx, '결제금액']
-                                    collection_datetime_from_df = df_collection.loc[collection_idx, '결제일'] # 결제일 컬럼에서 직접 datetime 객체 가져옴
-
-                                    if collected_amount <= 0: # 이미 소진된 수금액은 건너뛰기
-                                        collection_idx += 1
-                                        continue
-
-                                    # 1. 잔여연체금액에 먼저 반영
-                                    # 수금 시점의 연체금액을 계산하여 반영
-                                    overdue_at_collection_time = calculate_overdue_for_installment(
-                                        df.loc[df.index[inst_idx], '결제일'],
-                                        monthly_fee, # 계약 시의 기본 월요금 사용
-                                        collection_datetime_from_df # 수금 시점의 날짜와 시간으로 연체 계산
-                                    )
-                                    
-                                    # 현재 회차의 총 연체금액을 업데이트 (수금 시점까지 발생한 연체)
-                                    df.loc[df.index[inst_idx], '연체금액'] = overdue_at_collection_time
-                                    
-                                    # 잔여연체금액에 반영
-                                    apply_to_overdue = min(collected_amount, df.loc[df.index[inst_idx], '잔여연체금액'])
-                                    df.loc[df.index[inst_idx], '납부연체금액'] += apply_to_overdue
-                                    df.loc[df.index[inst_idx], '잔여연체금액'] -= apply_to_overdue
-                                    collected_amount -= apply_to_overdue
-                                    
-                                    # 2. 잔여월요금에 반영
-                                    apply_to_principal = min(collected_amount, df.loc[df.index[inst_idx], '잔여월요금'])
-                                    df.loc[df.index[inst_idx], '납부월요금'] += apply_to_principal
-                                    df.loc[df.index[inst_idx], '잔여월요금'] -= apply_to_principal
-                                    collected_amount -= apply_to_principal
-
-                                    # 최종납부일 업데이트: 해당 회차에 금액이 반영될 때마다 업데이트
-                                    if apply_to_overdue > 0 or apply_to_principal > 0:
-                                        df.loc[df.index[inst_idx], '최종납부일'] = collection_datetime_from_df
-                                    
-                                    # df_collection의 해당 수금액 업데이트 (남은 금액이 있다면)
-                                    df_collection.loc[collection_idx, '결제금액'] = collected_amount
-                                    
-                                    if collected_amount <= 0: # 해당 수금 건이 모두 소진되면 다음 수금 건으로
-                                        collection_idx += 1
-                                    else: # 수금 건이 남았지만 현재 회차 잔여금액/연체금액이 0이면 다음 회차로
-                                        break
-                            
-                            # 최종 연체 금액 재계산 (수금 반영 후, current_datetime 기준)
-                            for i in range(billed_installment_count):
-                                # 해당 회차가 미납된 경우에만 연체 계산
-                                if df.loc[df.index[i], '잔여월요금'] > 0 or df.loc[df.index[i], '잔여연체금액'] > 0:
-                                    # 연체 계산 기준 날짜: 최종납부일이 있다면 그 날짜, 없으면 current_datetime
-                                    # 하지만 최종 연체는 항상 current_datetime 기준으로 다시 계산
-                                    final_overdue_amount = calculate_overdue_for_installment(
-                                        df.loc[df.index[i], '결제일'], 
-                                        monthly_fee, 
-                                        current_datetime
-                                    )
-                                    # 최종 연체금액은 계산된 연체금액에서 납부된 연체금액을 제외한 값
-                                    df.loc[df.index[i], '연체금액'] = final_overdue_amount
-                                    df.loc[df.index[i], '잔여연체금액'] = max(0, final_overdue_amount - df.loc[df.index[i], '납부연체금액'])
-                                else: # 완전히 납부된 회차는 연체금액 0
-                                    df.loc[df.index[i], '연체금액'] = 0
-                                    df.loc[df.index[i], '잔여연체금액'] = 0
+                            # 수금 내역을 결제 스케줄에 반영하고 current_datetime 기준으로 연체 재계산
+                            df = allocate_collections(df, df_collection, monthly_fee, current_datetime, billed_installment_count)
 
                             print("\n--- 최종 결제 스케줄 (수금 및 연체 반영) ---")
                             # 모든 관련 컬럼 출력
-                            print(df[['결제일', '월요금', '납부월요금', '잔여월요금', '연체금액', '납부연체금액', '잔여연체금액', '최종납부일']].to_string())
+                            print(df[SCHEDULE_COLUMNS].to_string())
                             print("----------------------------------------")
 
+                            from adjustment_report import aging_summary, delinquent_installments
+                            delinquent = delinquent_installments(df, current_datetime)
+                            if len(delinquent):
+                                print("\n--- 연체 구간별 현황 ---")
+                                print(aging_summary(delinquent).to_string())
+                                print("------------------------")
+
                             # 업데이트된 스케줄을 Excel 파일로 저장 여부 확인
                             export_updated_to_excel = input("업데이트된 스케줄을 Excel 파일로 저장하시겠습니까? (예/아니오): ").lower()
                             if export_updated_to_excel == '예':
                                 updated_excel_filename = "상환스케쥴표_업데이트.xlsx" # 업데이트된 파일 이름을 고정
-                                df.to_excel(updated_excel_filename, index=True) 
-                                print(f"업데이트된 스케줄이 '{updated_excel_filename}' 파일로 성공적으로 저장되었습니다.")
+                                pending_exports.append((updated_excel_filename, export_executor.submit(export_schedule, df, updated_excel_filename)))
+                                print(f"업데이트된 스케줄을 '{updated_excel_filename}' 파일로 저장하는 중입니다 (백그라운드).")
                             else:
                                 print("업데이트된 Excel 파일 저장을 건너뛰었습니다.")
 
     except ValueError as e:
         print(f"입력 오류: {e}. 올바른 형식으로 입력해주세요.")
     except Exception as e:
-        print(f"예상치 못한 오류가 발생했습니다: {e}")
\ No newline at end of file
+        print(f"예상치 못한 오류가 발생했습니다: {e}")
+    finally:
+        # 백그라운드에서 진행 중인 Excel 내보내기가 끝날 때까지 대기
+        for filename, future in pending_exports:
+            try:
+                future.result()
+                print(f"스케줄이 '{filename}' 파일로 성공적으로 저장되었습니다.")
+            except Exception as e:
+                print(f"'{filename}' 파일 저장 중 오류 발생: {e}")
+        export_executor.shutdown()
\ No newline at end of file
@@ -1,4 +1,21 @@
 # -*- mode: python ; coding: utf-8 -*-
+import os
+
+# 빌드 프로필 (환경 변수 ADJUSTMENT_BUILD_PROFILE)
+#   default: 단일 실행 파일(onefile). 실행할 때마다 임시 폴더에 압축을 풀기 때문에 시작이 느립니다.
+#   trimmed: Parquet 입출력(pyarrow)을 제외하고 폴더(onedir)로 배포하여 압축 해제 없이 바로 시작합니다.
+#            (pyinstaller adjustment.spec 실행 전 ADJUSTMENT_BUILD_PROFILE=trimmed 설정)
+BUILD_PROFILE = os.environ.get('ADJUSTMENT_BUILD_PROFILE', 'default')
+TRIMMED = BUILD_PROFILE == 'trimmed'
+
+# 정산 계산에서 사용하지 않는 대형 패키지 (pandas/numpy의 선택적 의존성 포함)
+excludes = [
+    'matplotlib', 'scipy', 'IPython', 'jupyter_client', 'notebook', 'PyQt5', 'PyQt6', 'PySide2', 'PySide6',
+    'sqlalchemy', 'pytest', 'numba', 'tables', 'lxml', 'bs4', 'html5lib', 'jinja2', 'fsspec', 'botocore',
+    'boto3', 'psycopg2', 'pymysql', 'xarray', 'dask', 'numexpr', 'bottleneck',
+]
+if TRIMMED:
+    excludes += ['pyarrow']
 
 
 a = Analysis(
@@ -10,7 +27,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excludes,
     noarchive=False,
     optimize=0,
 )
@@ -19,14 +36,14 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
+    *([] if TRIMMED else [a.binaries, a.datas]), # trimmed: 바이너리/데이터는 COLLECT로 폴더에 배치
     [],
+    exclude_binaries=TRIMMED,
     name='adjustment',
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
+    upx=not TRIMMED, # trimmed: 실행할 때마다 UPX 압축을 풀지 않도록
     upx_exclude=[],
     runtime_tmpdir=None,
     console=True,
@@ -36,3 +53,14 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+if TRIMMED:
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='adjustment',
+    )
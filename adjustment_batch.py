@@ -0,0 +1,382 @@
+"""
+대화형 입력 없이 여러 계약의 정산을 일괄 처리하는 배치 실행 모듈입니다.
+
+사용 예:
+  adjustment batch --contracts contracts.csv --collections collections.parquet --as-of 2026-10-31 --workers 8
+"""
+import argparse
+import os
+import sqlite3
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import adjustment_profile
+from adjustment import (
+    SCHEDULE_COLUMNS,
+    MONEY_MODES,
+    STATE_COLUMNS,
+    apply_collections,
+    generate_schedule_arrays,
+    money_mode,
+    money_mode_from_environment,
+    new_allocation_state,
+    set_money_mode,
+)
+from adjustment_export import BackgroundScheduleWriter
+from adjustment_report import delinquent_installments, export_portfolio_summary, portfolio_summary
+from adjustment_schedule import Schedule
+from adjustment_io import (
+    build_collection_index,
+    collection_positions,
+    is_collection_file_set,
+    read_collection_file,
+    read_collection_files,
+    select_collections,
+    unmatched_collections,
+)
+from adjustment_state import (
+    advance_settlement_state,
+    load_settlement_state,
+    new_settlement_state,
+    open_settlement_store,
+    save_settlement_states,
+    settled_allocation,
+)
+
+# 계약 목록 파일의 필수 컬럼
+CONTRACT_COLUMNS = ['contract_id', 'monthly_fee', 'payment_period_months', 'fixed_payment_day', 'delivery_date', 'payment_type']
+# 배치 결과 파일의 컬럼 구성
+RESULT_COLUMNS = ['contract_id', '회차'] + SCHEDULE_COLUMNS
+ERROR_COLUMNS = ['shard', 'contract_id', 'error']
+# 프로세스당 동시에 제출해 두는 샤드 수 (메모리에는 이만큼의 샤드 입력/결과만 남음)
+SHARDS_IN_FLIGHT_PER_WORKER = 2
+
+def read_table(file_path):
+    """
+    확장자에 따라 CSV, Parquet, Excel 파일을 DataFrame으로 읽어옵니다.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(file_path)
+    if extension == '.parquet':
+        return pd.read_parquet(file_path)
+    if extension in ('.xlsx', '.xls'):
+        return pd.read_excel(file_path)
+    raise ValueError(f"지원하지 않는 파일 형식입니다: {file_path}")
+
+def read_contracts(file_path):
+    """
+    계약 목록 파일을 읽고 필수 컬럼을 검증합니다.
+    """
+    contracts = read_table(file_path)
+    missing_cols = [col for col in CONTRACT_COLUMNS if col not in contracts.columns]
+    if missing_cols:
+        raise KeyError(f"필요한 컬럼이 누락되었습니다: {', '.join(missing_cols)}")
+    return contracts[CONTRACT_COLUMNS].reset_index(drop=True)
+
+def read_collections(file_path, workers=1, errors=None):
+    """
+    전체 계약의 수금 내역 파일을 청크 단위로 읽어옵니다. 'contract_id' 컬럼으로 계약을 구분합니다.
+    file_path가 디렉터리나 glob 패턴이면 여러 파일을 프로세스 풀에서 동시에 읽어 결제일 순으로 합칩니다.
+
+    Args:
+      file_path: 수금 내역 파일 경로, 디렉터리 또는 glob 패턴
+      workers: 여러 파일을 읽을 때의 프로세스 수
+      errors: 읽지 못한 파일을 기록할 오류 목록 (ERROR_COLUMNS 형식). None이면 첫 번째 파일 오류로 ValueError 발생
+    """
+    if is_collection_file_set(file_path):
+        collections, file_errors = read_collection_files(file_path, workers, required_columns=('결제일', '결제금액', 'contract_id'))
+        if file_errors and errors is None:
+            raise ValueError(f"{file_errors[0]['file']}: {file_errors[0]['error']}")
+        for file_error in file_errors:
+            errors.append({'shard': None, 'contract_id': None, 'error': f"{file_error['file']}: {file_error['error']}"})
+        return collections
+    collections = read_collection_file(file_path)
+    if 'contract_id' not in collections.columns:
+        raise KeyError("필요한 컬럼이 누락되었습니다: contract_id")
+    return collections
+
+def _generate_shard_schedules(contracts, shard_index, errors):
+    """
+    샤드의 스케줄을 한 번에 생성합니다. 실패하면 계약별로 다시 생성하여 문제 계약만 오류로 기록합니다.
+    """
+    try:
+        return generate_schedule_arrays(contracts)
+    except Exception:
+        pass
+
+    schedules = []
+    for position in range(len(contracts)):
+        contract = contracts.iloc[[position]]
+        try:
+            schedules.append(generate_schedule_arrays(contract))
+        except Exception as e:
+            errors.append({'shard': shard_index, 'contract_id': contract['contract_id'].iloc[0], 'error': str(e)})
+    return Schedule.concat(schedules)
+
+def _result_frame(schedule, state_columns):
+    """
+    스케줄과 회차별 상태 배열로 RESULT_COLUMNS 구성의 결과 DataFrame을 만듭니다.
+    """
+    result = schedule.to_frame()
+    for column in STATE_COLUMNS:
+        result[column] = np.concatenate(state_columns[column])
+    return result[RESULT_COLUMNS]
+
+def settle_shard(shard_index, contracts, collections, as_of):
+    """
+    한 샤드(계약 묶음)에 대해 스케줄 생성, 수금 반영, 연체 계산을 수행합니다.
+    계약 단위의 오류는 결과에서 제외하고 오류 목록에 기록합니다.
+
+    Returns:
+      (shard_index, 결과 DataFrame, 오류 목록) 튜플
+    """
+    errors = []
+    schedule = _generate_shard_schedules(contracts, shard_index, errors)
+
+    # 계약별 수금 내역을 결제일 순으로 정렬한 뒤 계약별 구간으로만 참조
+    index = build_collection_index(collections)
+    monthly_fees = dict(zip(contracts['contract_id'], contracts['monthly_fee']))
+
+    settled_groups = []
+    state_columns = {column: [] for column in STATE_COLUMNS}
+    for group, contract_id in enumerate(schedule.contract_ids.tolist()):
+        rows = schedule.rows(group)
+        try:
+            state = new_allocation_state(schedule.amounts[rows].tolist())
+            positions = collection_positions(index, contract_id)
+            apply_collections(
+                schedule.due_dates[rows],
+                state,
+                index['dates'][positions],
+                index['amounts'][positions].tolist(),
+                monthly_fees[contract_id],
+                as_of,
+            )
+        except Exception as e:
+            errors.append({'shard': shard_index, 'contract_id': contract_id, 'error': str(e)})
+            continue
+        settled_groups.append(group)
+        for column in STATE_COLUMNS:
+            state_columns[column].append(state[column])
+
+    if not settled_groups:
+        return shard_index, pd.DataFrame(columns=RESULT_COLUMNS), errors, []
+    return shard_index, _result_frame(schedule.take(settled_groups), state_columns), errors, []
+
+def settle_shard_incremental(shard_index, contracts, collections, as_of, state_path):
+    """
+    저장된 정산 상태에 새 수금 내역만 반영하여 샤드를 정산합니다.
+    저장된 상태가 없는 계약은 새로 생성한 스케줄로 시작합니다.
+
+    Returns:
+      (shard_index, 결과 DataFrame, 오류 목록, 갱신된 정산 상태 목록) 튜플
+    """
+    errors = []
+    schedule = _generate_shard_schedules(contracts, shard_index, errors)
+    schedule_groups = {contract_id: group for group, contract_id in enumerate(schedule.contract_ids.tolist())}
+    failed = {error['contract_id'] for error in errors}
+
+    index = build_collection_index(collections)
+
+    states = []
+    result_columns = {column: [] for column in RESULT_COLUMNS}
+    connection = sqlite3.connect(state_path)
+    try:
+        for contract_id, monthly_fee in zip(contracts['contract_id'], contracts['monthly_fee']):
+            if contract_id in failed:
+                continue
+            try:
+                state = load_settlement_state(connection, contract_id)
+                if state is None:
+                    state = new_settlement_state(contract_id, schedule.take([schedule_groups[contract_id]]), monthly_fee)
+                positions = collection_positions(index, contract_id)
+                advance_settlement_state(state, index['dates'][positions], index['amounts'][positions].tolist())
+                allocation = settled_allocation(state, as_of)
+            except Exception as e:
+                errors.append({'shard': shard_index, 'contract_id': contract_id, 'error': str(e)})
+                continue
+            states.append(state)
+            count = len(state['amounts'])
+            result_columns['contract_id'].append([contract_id] * count)
+            result_columns['회차'].append(np.arange(1, count + 1))
+            result_columns['결제일'].append(state['due_dates'])
+            result_columns['월요금'].append(state['amounts'])
+            for column in STATE_COLUMNS:
+                result_columns[column].append(allocation[column])
+    finally:
+        connection.close()
+
+    if not states:
+        return shard_index, pd.DataFrame(columns=RESULT_COLUMNS), errors, []
+    result = pd.DataFrame({column: np.concatenate(values) for column, values in result_columns.items()})
+    return shard_index, result[RESULT_COLUMNS], errors, states
+
+def _settle_shard_safely(shard_index, contracts, collections, as_of, state_path=None, profile=False, mode=None,
+                         profile_memory=False):
+    """
+    샤드 처리 중 예기치 않은 오류가 발생해도 배치 전체가 중단되지 않도록 오류로 기록합니다.
+    profile이 True이면 작업 프로세스에서 샤드 처리의 측정 결과를 수집하여 결과 튜플의 마지막 값으로 반환합니다
+    (profile_memory가 True이면 단계별 최대 메모리도 측정).
+    mode를 주면 작업 프로세스의 금액 계산 방식을 부모 프로세스와 같게 설정합니다.
+    """
+    if mode is not None:
+        set_money_mode(mode)
+    if profile:
+        adjustment_profile.enable(memory=profile_memory)
+        adjustment_profile.reset() # fork로 복사된 부모 프로세스의 측정 결과 제외
+    try:
+        if state_path:
+            result = settle_shard_incremental(shard_index, contracts, collections, as_of, state_path)
+        else:
+            result = settle_shard(shard_index, contracts, collections, as_of)
+    except Exception as e:
+        result = shard_index, pd.DataFrame(columns=RESULT_COLUMNS), [{'shard': shard_index, 'contract_id': None, 'error': str(e)}], []
+    return result + (adjustment_profile.collect() if profile else None,)
+
+def iter_shards(contracts, collection_index, shard_size):
+    """
+    계약 목록을 입력 순서대로 shard_size개씩 나누고, 각 샤드에 해당하는 수금 내역을 함께 반환합니다.
+    수금 내역은 build_collection_index()의 계약별 구간에서 가져오므로 샤드마다 전체를 검색하지 않습니다.
+    """
+    for shard_index, start in enumerate(range(0, len(contracts), shard_size)):
+        shard_contracts = contracts.iloc[start:start + shard_size]
+        shard_collections = select_collections(collection_index, shard_contracts['contract_id'])
+        yield shard_index, shard_contracts, shard_collections
+
+def _ordered_results(executor, shards, in_flight, *args):
+    """
+    샤드를 프로세스 풀에 제출하고 결과를 제출 순서대로 반환합니다.
+    한 번에 in_flight개까지만 제출해 두고, 가장 오래된 샤드의 결과를 꺼낼 때마다 다음 샤드를 제출합니다.
+    """
+    futures = deque()
+    for shard in shards:
+        futures.append(executor.submit(_settle_shard_safely, *shard, *args))
+        if len(futures) >= in_flight:
+            yield futures.popleft().result()
+    while futures:
+        yield futures.popleft().result()
+
+def run_batch(contracts, collections, as_of, output_path, workers=1, shard_size=1000, state_path=None, sheet_per_contract=False,
+              summary_path=None, top_delinquents=20):
+    """
+    계약을 샤드로 나누어 프로세스 풀에서 정산하고, 결과를 샤드 순서대로 출력 파일에 기록합니다.
+
+    Args:
+      contracts: CONTRACT_COLUMNS 컬럼을 가진 계약 목록 DataFrame
+      collections: 'contract_id', '결제일', '결제금액' 컬럼을 가진 수금 내역 DataFrame
+                   또는 build_collection_index()로 미리 만든 계약별 수금 내역 인덱스
+      as_of: 연체 계산 기준 시점 (datetime 객체)
+      output_path: 결과 파일 경로 (.csv, .xlsx, .parquet)
+      workers: 프로세스 수 (1이면 현재 프로세스에서 처리)
+      shard_size: 샤드당 계약 수
+      state_path: 정산 상태 저장소(SQLite) 경로. 지정하면 collections를 마지막 정산 이후의
+                  새 수금 내역으로 보고 저장된 상태에 반영한 뒤, 갱신된 상태를 저장합니다.
+      sheet_per_contract: xlsx 출력에서 계약마다 시트를 나눌지 여부
+      summary_path: 연체 구간 및 포트폴리오 요약 xlsx 파일 경로 (지정하지 않으면 만들지 않음)
+      top_delinquents: 요약에 포함할 연체 상위 계약 수
+
+    Returns:
+      오류 목록 (각 항목은 shard, contract_id, error 키를 가진 dict)
+    """
+    if isinstance(collections, pd.DataFrame):
+        collections = build_collection_index(collections)
+    shards = iter_shards(contracts, collections, shard_size)
+    store = open_settlement_store(state_path) if state_path else None
+    # 샤드 결과는 별도 스레드에서 기록하여 다음 샤드의 계산(workers=1) 또는 결과 수집과 겹치도록 함
+    writer = BackgroundScheduleWriter(output_path, RESULT_COLUMNS, sheet_per_contract)
+    errors = []
+    delinquent = [] # 요약용으로 샤드별 연체 회차만 모아 둠
+
+    def consume(results):
+        for _, result, shard_errors, states, profile in results:
+            writer.write(result)
+            if profile:
+                adjustment_profile.merge(profile)
+            if summary_path:
+                delinquent.append(delinquent_installments(result, as_of))
+            errors.extend(shard_errors)
+            # 샤드가 끝날 때마다 갱신된 정산 상태를 저장 (샤드 간 계약이 겹치지 않음)
+            if states:
+                save_settlement_states(store, states)
+
+    try:
+        if workers <= 1:
+            consume(_settle_shard_safely(*shard, as_of, state_path) for shard in shards)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # 측정 중이면 작업 프로세스에서도 측정하여 샤드별 결과를 합산
+                profile = adjustment_profile.is_enabled()
+                # 완료 순서와 관계없이 제출 순서대로 기록하므로 출력 순서가 항상 같습니다.
+                consume(_ordered_results(
+                    executor, shards, workers * SHARDS_IN_FLIGHT_PER_WORKER, as_of, state_path, profile, money_mode(),
+                    adjustment_profile.is_tracking_memory(),
+                ))
+    finally:
+        writer.close() # 남은 결과를 모두 기록 (처리할 계약이 없는 경우에도 헤더는 기록)
+        if store is not None:
+            store.close()
+    if summary_path:
+        delinquent = pd.concat(delinquent, ignore_index=True) if delinquent else delinquent_installments(
+            pd.DataFrame(columns=RESULT_COLUMNS), as_of
+        )
+        export_portfolio_summary(portfolio_summary(delinquent, contracts, top_delinquents), summary_path)
+    return errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='adjustment batch', description='계약 목록과 수금 내역으로 정산을 일괄 처리합니다.')
+    parser.add_argument('--contracts', required=True, help='계약 목록 파일 (csv, parquet, xlsx)')
+    parser.add_argument('--collections', required=True, help="수금 내역 파일 (csv, parquet, xlsx), 디렉터리 또는 glob 패턴 (예: 'branches/*.xlsx')")
+    parser.add_argument('--as-of', help='연체 계산 기준 시점 (YYYY-MM-DD 또는 YYYY-MM-DDTHH:MM:SS, 기본값: 현재 시각)')
+    parser.add_argument('--output', default='상환스케쥴표_배치.csv', help='결과 파일 경로 (csv, xlsx, parquet)')
+    parser.add_argument('--sheet-per-contract', action='store_true', help='xlsx 출력에서 계약마다 시트를 나눔')
+    parser.add_argument('--errors', help='오류 보고서 CSV 파일 경로 (기본값: <output>.errors.csv)')
+    parser.add_argument('--unmatched', help='계약에 매칭되지 않은 수금 내역 CSV 파일 경로 (기본값: <output>.unmatched.csv)')
+    parser.add_argument('--summary', help='연체 구간 및 포트폴리오 요약 xlsx 파일 경로')
+    parser.add_argument('--top', type=int, default=20, help='요약에 포함할 연체 상위 계약 수')
+    parser.add_argument('--money-mode', choices=MONEY_MODES, help='금액 계산 방식 (exact: 원 단위 정수 계산, 기본값: decimal 또는 환경 변수 ADJUSTMENT_MONEY_MODE)')
+    parser.add_argument('--profile', help=f'단계별 소요 시간 측정 보고서(JSON) 경로 (환경 변수 {adjustment_profile.PROFILE_ENV_VAR}로도 지정 가능)')
+    parser.add_argument('--profile-memory', action='store_true', help=f'측정 보고서에 단계별 최대 메모리도 기록 (느려짐, 환경 변수 {adjustment_profile.PROFILE_MEMORY_ENV_VAR}=1로도 지정 가능)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='프로세스 수')
+    parser.add_argument('--shard-size', type=int, default=1000, help='샤드당 계약 수')
+    parser.add_argument('--state-db', help='정산 상태 저장소(SQLite) 경로. 지정하면 --collections는 마지막 정산 이후의 새 수금 내역만 담고 있어야 합니다.')
+    args = parser.parse_args(argv)
+    try:
+        set_money_mode(args.money_mode or money_mode_from_environment())
+    except ValueError as e:
+        parser.error(str(e))
+    if args.profile:
+        adjustment_profile.enable(args.profile, args.profile_memory)
+    else:
+        adjustment_profile.enable_from_environment()
+
+    as_of = datetime.fromisoformat(args.as_of) if args.as_of else datetime.now()
+    contracts = read_contracts(args.contracts)
+    file_errors = [] # 여러 수금 내역 파일 중 읽지 못한 파일
+    collection_index = build_collection_index(read_collections(args.collections, args.workers, file_errors))
+
+    errors = file_errors + run_batch(
+        contracts, collection_index, as_of, args.output, args.workers, args.shard_size, args.state_db, args.sheet_per_contract,
+        args.summary, args.top
+    )
+
+    error_path = args.errors or f"{args.output}.errors.csv"
+    # 파일 오류처럼 shard/contract_id가 없는 행이 있어도 정수 값이 실수로 바뀌지 않도록 object로 기록
+    pd.DataFrame(errors, columns=ERROR_COLUMNS, dtype=object).to_csv(error_path, index=False, encoding='utf-8-sig')
+    unmatched_path = args.unmatched or f"{args.output}.unmatched.csv"
+    unmatched = unmatched_collections(collection_index, contracts['contract_id'])
+    unmatched.to_csv(unmatched_path, index=False, encoding='utf-8-sig')
+    print(f"{len(contracts)}건의 계약을 처리했습니다. 결과: '{args.output}', 오류 {len(errors)}건: '{error_path}'")
+    if len(unmatched):
+        print(f"계약에 매칭되지 않은 수금 내역 {len(unmatched)}건: '{unmatched_path}'")
+    if args.summary:
+        print(f"연체 요약: '{args.summary}'")
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,422 @@
+"""
+스케줄 생성, 연체 계산, 수금 반영, 수금 내역 읽기의 처리량과 최대 메모리를 측정하는 벤치마크 모듈입니다.
+
+선납/후납, 고정 결제일 전후 및 월말(29~31일) 출고, 부분/초과/지연/누락 납부가 섞인
+가상 계약 포트폴리오를 만들어 계약 수별로 측정하고, 이전 결과(JSON)와 비교해 성능 저하를 보고합니다.
+
+사용 예:
+  python adjustment_bench.py --sizes 1 1000 100000 --output bench.json
+  python adjustment_bench.py --sizes 1000 --baseline bench.json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from adjustment import (
+    allocate_payments,
+    calculate_overdue_batch,
+    calculate_overdue_for_installment,
+    clear_calendar_cache,
+    generate_postpayment_schedule,
+    generate_prepayment_schedule,
+    generate_schedule_arrays,
+    generate_schedules,
+    money_mode_from_environment,
+    new_allocation_state,
+    read_collection_data_from_excel,
+    set_money_mode,
+)
+from adjustment_export import EXCEL_MAX_ROWS
+from adjustment_io import build_collection_index, collection_positions
+
+# 가상 계약의 월요금 구간, 계약 기간, 고정 결제일
+FEE_TIERS = [350000, 480000, 550000, 690000, 820000, 1150000]
+PAYMENT_PERIODS = [12, 24, 36, 48, 60]
+PAYMENT_DAYS = [1, 5, 10, 15, 20, 25, 28, 29, 30, 31]
+# 회차별 납부 유형과 비율
+PAYMENT_BEHAVIORS = ['정상', '부분', '초과', '지연', '누락']
+PAYMENT_BEHAVIOR_WEIGHTS = [0.5, 0.15, 0.1, 0.15, 0.1]
+
+DEFAULT_SIZES = [1, 1000, 100000]
+DEFAULT_AS_OF = '2025-06-30T18:00:00'
+# 기준 결과 대비 처리량이 이 비율 이상 줄면 성능 저하로 보고
+DEFAULT_TOLERANCE = 0.2
+
+# 시작 시간 목표 (초)
+#   startup_import: 계산 함수만 사용하는 스크립트가 adjustment를 임포트하는 시간 (pandas/tkinter 미포함)
+#   startup_script: adjustment.py를 대화형으로 실행해 첫 입력을 기다릴 때까지의 시간
+#   startup_exe: 번들 실행 파일(trimmed 프로필)이 첫 입력을 기다릴 때까지의 시간
+STARTUP_TARGETS = {
+    'startup_import': 0.3,
+    'startup_script': 0.5,
+    'startup_exe': 1.5,
+}
+STARTUP_REPEAT = 5
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def synthetic_contracts(count, seed=0):
+    """
+    가상 계약 목록을 만듭니다. 출고일은 고정 결제일 이전, 이후, 월말(29~31일)에 고르게 분포합니다.
+
+    Returns:
+      adjustment_batch.CONTRACT_COLUMNS 컬럼을 가진 DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    payment_days = rng.choice(PAYMENT_DAYS, count)
+    delivery_months = np.datetime64('2022-01', 'M') + rng.integers(0, 36, count)
+
+    placement = rng.integers(0, 3, count)
+    delivery_days = np.select(
+        [placement == 0, placement == 1],
+        [rng.integers(1, payment_days + 1), rng.integers(np.minimum(payment_days + 1, 31), 32)],
+        default=rng.integers(29, 32, count),
+    )
+    month_lengths = ((delivery_months + 1).astype('datetime64[D]') - delivery_months.astype('datetime64[D]')).astype(np.int64)
+    delivery_dates = delivery_months.astype('datetime64[D]') + (np.minimum(delivery_days, month_lengths) - 1)
+
+    return pd.DataFrame({
+        'contract_id': np.arange(count),
+        'monthly_fee': rng.choice(FEE_TIERS, count),
+        'payment_period_months': rng.choice(PAYMENT_PERIODS, count),
+        'fixed_payment_day': payment_days,
+        'delivery_date': delivery_dates.astype('datetime64[us]'),
+        'payment_type': rng.choice(['선납', '후납'], count),
+    })
+
+def synthetic_collections(schedules, as_of, seed=0):
+    """
+    결제일이 as_of 이전인 회차에 대해 정상/부분/초과/지연/누락 납부가 섞인 수금 내역을 만듭니다.
+
+    Args:
+      schedules: generate_schedules()의 결과
+      as_of: 수금 내역을 만들 기준 시점
+
+    Returns:
+      'contract_id', '결제일', '결제금액' 컬럼을 가진 DataFrame (계약, 결제일 순으로 정렬)
+    """
+    rng = np.random.default_rng(seed)
+    billed = schedules[schedules['결제일'] <= pd.Timestamp(as_of)]
+    count = len(billed)
+    behavior = rng.choice(len(PAYMENT_BEHAVIORS), count, p=PAYMENT_BEHAVIOR_WEIGHTS)
+
+    due_dates = billed['결제일'].to_numpy(dtype='datetime64[us]')
+    fees = billed['월요금'].to_numpy(dtype=np.float64)
+    hours = rng.integers(0, 20, count).astype('timedelta64[h]')
+    late_days = np.where(behavior == 3, rng.integers(5, 90, count), 0).astype('timedelta64[D]')
+    ratios = np.select(
+        [behavior == 1, behavior == 2],
+        [rng.uniform(0.3, 0.9, count), rng.uniform(1.1, 2.0, count)],
+        default=1.0,
+    )
+
+    collections = pd.DataFrame({
+        'contract_id': billed['contract_id'].to_numpy(),
+        '결제일': due_dates + late_days + hours,
+        '결제금액': np.round(fees * ratios),
+    })
+    collections = collections[(behavior != 4) & (collections['결제일'] <= pd.Timestamp(as_of))]
+    return collections.sort_values(by=['contract_id', '결제일'], kind='stable').reset_index(drop=True)
+
+class Portfolio:
+    """
+    한 계약 수에 대한 벤치마크 입력 데이터입니다. 스케줄과 수금 내역은 처음 사용할 때 만듭니다.
+    """
+    def __init__(self, count, as_of, seed, work_dir):
+        self.count = count
+        self.as_of = as_of
+        self.seed = seed
+        self.work_dir = work_dir
+        self.contracts = synthetic_contracts(count, seed)
+        self._schedules = None
+        self._collections = None
+        self._excel_path = None
+
+    @property
+    def schedules(self):
+        if self._schedules is None:
+            self._schedules = generate_schedules(self.contracts)
+        return self._schedules
+
+    @property
+    def collections(self):
+        if self._collections is None:
+            self._collections = synthetic_collections(self.schedules, self.as_of, self.seed)
+        return self._collections
+
+    @property
+    def excel_path(self):
+        # Excel 시트의 최대 행 수를 넘는 수금 내역은 앞부분만 기록
+        if self._excel_path is None:
+            self._excel_path = os.path.join(self.work_dir, f"collections_{self.count}.xlsx")
+            rows = self.collections[['결제일', '결제금액']].head(EXCEL_MAX_ROWS - 1)
+            rows.to_excel(self._excel_path, index=False)
+        return self._excel_path
+
+def _bench_generate_schedule(portfolio):
+    contracts = portfolio.contracts.to_dict('records')
+    delivery_dates = portfolio.contracts['delivery_date'].to_numpy(dtype='datetime64[us]').tolist()
+
+    def run():
+        clear_calendar_cache()
+        for contract, delivery_date in zip(contracts, delivery_dates):
+            generate = generate_prepayment_schedule if contract['payment_type'] == '선납' else generate_postpayment_schedule
+            generate(contract['monthly_fee'], contract['payment_period_months'], contract['fixed_payment_day'], delivery_date)
+    return run, portfolio.count
+
+def _bench_generate_schedules(portfolio):
+    def run():
+        generate_schedules(portfolio.contracts)
+    return run, portfolio.count
+
+def _bench_calculate_overdue_for_installment(portfolio):
+    schedules = portfolio.schedules
+    fees = dict(zip(portfolio.contracts['contract_id'], portfolio.contracts['monthly_fee']))
+    installments = list(zip(
+        schedules['결제일'].to_numpy(dtype='datetime64[us]').tolist(), schedules['contract_id'].map(fees).tolist()
+    ))
+    as_of = portfolio.as_of
+
+    def run():
+        for scheduled_date, base_monthly_fee in installments:
+            calculate_overdue_for_installment(scheduled_date, base_monthly_fee, as_of)
+    return run, len(installments)
+
+def _bench_calculate_overdue_batch(portfolio):
+    schedules = portfolio.schedules
+    scheduled_dates = schedules['결제일'].to_numpy(dtype='datetime64[us]')
+    fees = schedules['contract_id'].map(dict(zip(portfolio.contracts['contract_id'], portfolio.contracts['monthly_fee']))).to_numpy()
+    as_of = np.datetime64(portfolio.as_of, 'us')
+
+    def run():
+        calculate_overdue_batch(scheduled_dates, fees, as_of)
+    return run, len(scheduled_dates)
+
+def _bench_allocate(portfolio):
+    # 스케줄 생성과 수금 내역 정렬은 측정에서 제외하고 수금 반영(allocate_payments)만 측정
+    contracts = portfolio.contracts
+    schedule = generate_schedule_arrays(contracts)
+    index = build_collection_index(portfolio.collections)
+    fees = dict(zip(contracts['contract_id'], contracts['monthly_fee']))
+    inputs = []
+    for group, contract_id in enumerate(schedule.contract_ids.tolist()):
+        rows = schedule.rows(group)
+        positions = collection_positions(index, contract_id)
+        inputs.append((
+            schedule.due_dates[rows], schedule.amounts[rows].tolist(),
+            index['dates'][positions], index['amounts'][positions].tolist(), fees[contract_id],
+        ))
+
+    def run():
+        for due_dates, amounts, collection_dates, collection_amounts, monthly_fee in inputs:
+            allocate_payments(due_dates, new_allocation_state(amounts), collection_dates, collection_amounts, monthly_fee)
+    return run, portfolio.count
+
+def _bench_read_collection_data_from_excel(portfolio):
+    path = portfolio.excel_path
+    rows = min(len(portfolio.collections), EXCEL_MAX_ROWS - 1)
+
+    def run():
+        read_collection_data_from_excel(path)
+    return run, rows
+
+# 벤치마크 이름 → 준비 함수. 준비 함수는 (측정할 함수, 처리 항목 수)를 반환합니다.
+BENCHMARKS = {
+    'generate_schedule': _bench_generate_schedule,
+    'generate_schedules': _bench_generate_schedules,
+    'calculate_overdue_for_installment': _bench_calculate_overdue_for_installment,
+    'calculate_overdue_batch': _bench_calculate_overdue_batch,
+    'allocate': _bench_allocate,
+    'read_collection_data_from_excel': _bench_read_collection_data_from_excel,
+}
+
+def measure(run, repeat=1, memory=True):
+    """
+    함수의 실행 시간(repeat회 중 최소값, 초)과 최대 메모리 사용량(바이트)을 측정합니다.
+    메모리는 추적 비용이 시간 측정에 섞이지 않도록 별도로 한 번 더 실행하여 측정합니다.
+    """
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return seconds, peak_memory
+
+def run_benchmarks(sizes=DEFAULT_SIZES, names=None, repeat=1, memory=True, as_of=None, seed=0):
+    """
+    계약 수별로 벤치마크를 실행합니다.
+
+    Args:
+      sizes: 계약 수 목록
+      names: 실행할 벤치마크 이름 목록 (None이면 전체)
+      repeat: 시간 측정 반복 횟수
+      memory: 최대 메모리 측정 여부
+      as_of: 연체/수금 기준 시점 (datetime 객체, None이면 DEFAULT_AS_OF)
+      seed: 가상 데이터 난수 시드
+
+    Returns:
+      benchmark, contracts, items, seconds, items_per_second, peak_memory_bytes 키를 가진 dict의 리스트
+    """
+    as_of = as_of or datetime.fromisoformat(DEFAULT_AS_OF)
+    names = names or list(BENCHMARKS)
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for count in sizes:
+            portfolio = Portfolio(count, as_of, seed, work_dir)
+            for name in names:
+                run, items = BENCHMARKS[name](portfolio)
+                seconds, peak_memory = measure(run, repeat, memory)
+                result = {
+                    'benchmark': name,
+                    'contracts': count,
+                    'items': items,
+                    'seconds': seconds,
+                    'items_per_second': items / seconds if seconds > 0 else None,
+                    'peak_memory_bytes': peak_memory,
+                }
+                print(format_result(result), flush=True)
+                results.append(result)
+    return results
+
+def measure_startup(command, repeat=STARTUP_REPEAT):
+    """
+    명령을 repeat회 실행하여 종료까지 걸린 가장 짧은 시간(초)을 반환합니다.
+    표준 입력은 비워 두므로 대화형 실행은 첫 입력에서 바로 종료됩니다.
+    """
+    seconds = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, cwd=PACKAGE_DIR)
+        elapsed = time.perf_counter() - start
+        seconds = elapsed if seconds is None else min(seconds, elapsed)
+    return seconds
+
+def run_startup_benchmarks(exe_path=None, repeat=STARTUP_REPEAT):
+    """
+    스크립트(및 exe_path가 주어지면 번들 실행 파일)의 시작 시간을 측정하고 목표와 함께 반환합니다.
+    """
+    commands = {
+        'startup_import': [sys.executable, '-c', 'import adjustment; adjustment.calculate_overdue_for_installment'],
+        'startup_script': [sys.executable, os.path.join(PACKAGE_DIR, 'adjustment.py')],
+    }
+    if exe_path:
+        commands['startup_exe'] = [os.path.abspath(exe_path)]
+
+    results = []
+    for name, command in commands.items():
+        seconds = measure_startup(command, repeat)
+        result = {
+            'benchmark': name,
+            'contracts': 0,
+            'items': 1,
+            'seconds': seconds,
+            'items_per_second': 1 / seconds if seconds > 0 else None,
+            'peak_memory_bytes': None,
+            'target_seconds': STARTUP_TARGETS[name],
+        }
+        print(format_result(result), f"(목표 {result['target_seconds']}초)", flush=True)
+        results.append(result)
+    return results
+
+def format_result(result):
+    throughput = result['items_per_second']
+    memory = result['peak_memory_bytes']
+    return (
+        f"{result['benchmark']:<36}{result['contracts']:>9,}계약 {result['items']:>11,}건 "
+        f"{result['seconds']:>10.4f}초 "
+        f"{(f'{throughput:,.0f}건/초' if throughput else '-'):>16} "
+        f"{(f'{memory / 2**20:,.1f}MiB' if memory is not None else '-'):>12}"
+    )
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    기준 결과와 처리량을 비교하여 tolerance 비율 이상 느려진 항목을 반환합니다.
+
+    Returns:
+      benchmark, contracts, baseline, current, change 키를 가진 dict의 리스트
+    """
+    baseline_throughput = {
+        (result['benchmark'], result['contracts']): result['items_per_second'] for result in baseline
+    }
+    regressions = []
+    for result in results:
+        previous = baseline_throughput.get((result['benchmark'], result['contracts']))
+        current = result['items_per_second']
+        if not previous or not current:
+            continue
+        change = current / previous - 1
+        if change < -tolerance:
+            regressions.append({
+                'benchmark': result['benchmark'],
+                'contracts': result['contracts'],
+                'baseline': previous,
+                'current': current,
+                'change': change,
+            })
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='adjustment_bench', description='정산 계산의 처리량과 최대 메모리를 측정합니다.')
+    parser.add_argument('--sizes', type=int, nargs='*', default=DEFAULT_SIZES, help='측정할 계약 수 목록 (값 없이 지정하면 건너뜀)')
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), help='실행할 벤치마크 (기본값: 전체)')
+    parser.add_argument('--repeat', type=int, default=1, help='시간 측정 반복 횟수 (최소값 사용)')
+    parser.add_argument('--no-memory', action='store_true', help='최대 메모리 측정을 건너뜀')
+    parser.add_argument('--as-of', default=DEFAULT_AS_OF, help='연체/수금 기준 시점')
+    parser.add_argument('--seed', type=int, default=0, help='가상 데이터 난수 시드')
+    parser.add_argument('--output', help='결과 JSON 파일 경로')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON 파일 경로')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='성능 저하로 보고할 처리량 감소 비율')
+    parser.add_argument('--startup', action='store_true', help='스크립트 시작 시간을 측정하고 목표와 비교')
+    parser.add_argument('--exe', help='시작 시간을 함께 측정할 번들 실행 파일 경로 (--startup과 함께 사용)')
+    args = parser.parse_args(argv)
+    try:
+        set_money_mode(money_mode_from_environment())
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = run_benchmarks(
+        args.sizes, args.benchmarks, args.repeat, not args.no_memory, datetime.fromisoformat(args.as_of), args.seed
+    )
+    slow_startups = []
+    if args.startup:
+        startup_results = run_startup_benchmarks(args.exe)
+        results.extend(startup_results)
+        slow_startups = [result for result in startup_results if result['seconds'] > result['target_seconds']]
+        for result in slow_startups:
+            print(f"시작 시간 목표 초과: {result['benchmark']} {result['seconds']:.3f}초 (목표 {result['target_seconds']}초)")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            regressions = compare_results(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(
+                f"성능 저하: {regression['benchmark']} ({regression['contracts']:,}계약) "
+                f"{regression['baseline']:,.0f} → {regression['current']:,.0f}건/초 ({regression['change']:+.1%})"
+            )
+        if regressions:
+            return 1
+    return 1 if slow_startups else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
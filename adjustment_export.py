@@ -0,0 +1,289 @@
+"""
+상환스케쥴표를 파일로 내보내는 모듈입니다.
+
+xlsx는 xlsxwriter의 constant_memory 모드로 행을 기록하는 즉시 디스크에 내보내므로,
+여러 계약의 스케줄을 내보내도 전체 워크북을 메모리에 유지하지 않습니다.
+CSV와 Parquet(pyarrow 필요)도 같은 컬럼 구성으로 이어서 기록할 수 있습니다.
+BackgroundScheduleWriter는 기록을 별도 스레드에서 처리하여 다음 샤드의 계산과 파일 기록이 겹치도록 합니다.
+"""
+import os
+import queue
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Excel 시트 하나에 기록할 수 있는 최대 행 수 (헤더 포함)
+EXCEL_MAX_ROWS = 1_048_576
+# pandas.DataFrame.to_excel()과 같은 날짜 형식
+EXCEL_DATETIME_FORMAT = 'YYYY-MM-DD HH:MM:SS'
+# Excel 시트 이름의 최대 길이
+EXCEL_MAX_SHEET_NAME = 31
+# Excel 시트 이름에 사용할 수 없는 문자
+_INVALID_SHEET_CHARS = str.maketrans({char: '_' for char in '[]:*?/\\'})
+
+def _column_values(series):
+    """
+    컬럼 값을 셀에 기록할 파이썬 값 리스트로 변환합니다. NaN/NaT는 None(빈 셀)이 됩니다.
+    """
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.to_numpy(dtype='datetime64[us]').tolist()
+    values = series.tolist()
+    if series.dtype.kind in 'fO':
+        values = [None if pd.isna(value) else value for value in values]
+    return values
+
+class _XlsxScheduleWriter:
+    def __init__(self, path, columns, sheet_per_contract, contract_column):
+        import xlsxwriter
+
+        self.workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'default_date_format': EXCEL_DATETIME_FORMAT,
+        })
+        # pandas의 to_excel()과 같이 헤더와 회차 컬럼을 굵게 표시
+        self.header_format = self.workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        self.index_format = self.workbook.add_format({'bold': True, 'border': 1, 'valign': 'top'})
+        self.sheet_per_contract = sheet_per_contract
+        self.contract_column = contract_column
+        self.columns = [column for column in columns if not (sheet_per_contract and column == contract_column)]
+        self.index_position = self.columns.index('회차') if '회차' in self.columns else None
+        self.sheet_names = set()
+        self.worksheet = None
+        self.row = 0
+
+    def _unique_sheet_name(self, name):
+        """
+        시트 이름에서 사용할 수 없는 문자를 바꾸고 31자로 자릅니다.
+        자른 이름이 이미 있으면 31자 안에서 '_2', '_3', ... 을 붙여 고유하게 만듭니다 (Excel은 대소문자를 구분하지 않음).
+        """
+        base = name.translate(_INVALID_SHEET_CHARS)[:EXCEL_MAX_SHEET_NAME]
+        name = base
+        number = 1
+        while name.lower() in self.sheet_names:
+            number += 1
+            suffix = f"_{number}"
+            name = base[:EXCEL_MAX_SHEET_NAME - len(suffix)] + suffix
+        return name
+
+    def _add_sheet(self, name):
+        name = self._unique_sheet_name(name)
+        self.sheet_names.add(name.lower())
+        self.worksheet = self.workbook.add_worksheet(name)
+        self.worksheet.write_row(0, 0, self.columns, self.header_format)
+        self.row = 1
+
+    def _write_rows(self, df, sheet_name):
+        if self.worksheet is None:
+            self._add_sheet(sheet_name)
+        columns = [_column_values(df[column]) for column in self.columns]
+        for values in zip(*columns):
+            if self.row >= EXCEL_MAX_ROWS: # 시트의 최대 행 수를 넘으면 이어지는 시트에 기록
+                self._add_sheet(f"{sheet_name}_{len(self.sheet_names) + 1}")
+            self.worksheet.write_row(self.row, 0, values)
+            if self.index_position is not None:
+                self.worksheet.write(self.row, self.index_position, values[self.index_position], self.index_format)
+            self.row += 1
+
+    def write(self, df):
+        if not self.sheet_per_contract:
+            self._write_rows(df, 'Sheet1')
+            return
+        for contract_id, group in df.groupby(self.contract_column, sort=False):
+            self.worksheet = None
+            self._write_rows(group, str(contract_id))
+
+    def close(self):
+        if not self.sheet_names: # 내보낼 행이 없어도 헤더만 있는 시트를 만듦
+            self._add_sheet('Sheet1')
+        self.workbook.close()
+
+class _CsvScheduleWriter:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.header = True
+
+    def write(self, df):
+        df[self.columns].to_csv(
+            self.path, mode='w' if self.header else 'a', header=self.header, index=False, encoding='utf-8-sig'
+        )
+        self.header = False
+
+    def close(self):
+        if self.header:
+            self.write(pd.DataFrame(columns=self.columns))
+
+class _ParquetScheduleWriter:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.writer = None
+
+    def write(self, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = df[self.columns].copy()
+        # 계약마다 정수/실수가 섞이지 않도록 금액은 float64, 날짜는 마이크로초 단위로 고정
+        for column in self.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[column]) or column in ('결제일', '최종납부일'):
+                df[column] = pd.to_datetime(df[column]).astype('datetime64[us]')
+            elif column not in ('contract_id', '회차'):
+                df[column] = df[column].astype(np.float64)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.writer is None:
+            self.writer = pq.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table.cast(self.writer.schema))
+
+    def close(self):
+        if self.writer is None:
+            self.write(pd.DataFrame(columns=self.columns))
+        self.writer.close()
+
+class _BufferedExcelScheduleWriter:
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.frames = []
+
+    def write(self, df):
+        self.frames.append(df[self.columns])
+
+    def close(self):
+        frames = self.frames or [pd.DataFrame(columns=self.columns)]
+        pd.concat(frames, ignore_index=True).to_excel(self.path, index=False)
+
+class ScheduleWriter:
+    """
+    상환 스케줄을 파일 확장자(.xlsx, .csv, .parquet)에 맞는 스트리밍 방식으로 기록합니다.
+
+    Args:
+      path: 출력 파일 경로
+      columns: 기록할 컬럼 순서
+      sheet_per_contract: xlsx에서 계약마다 시트를 나눌지 여부 (시트 이름은 계약 ID)
+      contract_column: 계약을 구분하는 컬럼 이름
+    """
+    def __init__(self, path, columns, sheet_per_contract=False, contract_column='contract_id'):
+        extension = os.path.splitext(path)[1].lower()
+        columns = list(columns)
+        if extension == '.xlsx':
+            try:
+                self._writer = _XlsxScheduleWriter(path, columns, sheet_per_contract, contract_column)
+            except ImportError: # xlsxwriter가 없으면 pandas의 기본 writer로 한 번에 기록
+                self._writer = _BufferedExcelScheduleWriter(path, columns)
+        elif extension == '.csv':
+            self._writer = _CsvScheduleWriter(path, columns)
+        elif extension == '.parquet':
+            self._writer = _ParquetScheduleWriter(path, columns)
+        else:
+            raise ValueError(f"지원하지 않는 파일 형식입니다: {path}")
+
+    def write(self, df):
+        """
+        스케줄 DataFrame(여러 계약의 long format 포함)을 이어서 기록합니다.
+        """
+        self._writer.write(df)
+
+    def close(self):
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# 백그라운드 기록 대기열에 쌓아 둘 수 있는 최대 DataFrame 수 (계산이 기록보다 빠를 때 메모리 사용량 제한)
+DEFAULT_BACKGROUND_QUEUE_SIZE = 4
+
+class BackgroundScheduleWriter:
+    """
+    ScheduleWriter와 같은 방식으로 기록하되, 기록은 별도 스레드에서 처리합니다.
+    write()는 DataFrame을 대기열에 넣고 바로 반환하므로 호출한 쪽은 다음 샤드를 계산할 수 있습니다.
+    write()에 넘긴 DataFrame은 기록이 끝날 때까지 변경하면 안 됩니다.
+    기록 중 발생한 오류는 다음 write() 또는 close()에서 다시 발생합니다.
+
+    Args:
+      path, columns, sheet_per_contract, contract_column: ScheduleWriter와 같음
+      queue_size: 기록을 기다리는 DataFrame의 최대 개수 (가득 차면 write()가 대기)
+    """
+    _CLOSE = object()
+
+    def __init__(self, path, columns, sheet_per_contract=False, contract_column='contract_id',
+                 queue_size=DEFAULT_BACKGROUND_QUEUE_SIZE):
+        self._writer = ScheduleWriter(path, columns, sheet_per_contract, contract_column)
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='schedule-writer', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            df = self._queue.get()
+            if df is self._CLOSE:
+                break
+            if self._error is None: # 오류가 발생한 뒤에는 대기열만 비움
+                try:
+                    self._writer.write(df)
+                except BaseException as e:
+                    self._error = e
+        try:
+            self._writer.close()
+        except BaseException as e:
+            if self._error is None:
+                self._error = e
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def write(self, df):
+        self._raise_error()
+        self._queue.put(df)
+
+    def close(self):
+        """
+        대기열의 DataFrame을 모두 기록하고 파일을 닫습니다.
+        """
+        if self._thread.is_alive():
+            self._queue.put(self._CLOSE)
+            self._thread.join()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def export_schedule(df, path):
+    """
+    단일 계약의 결제 스케줄 DataFrame(인덱스: 회차)을 DataFrame.to_excel(index=True)와 같은 컬럼 구성으로 내보냅니다.
+    """
+    df = df.reset_index()
+    with ScheduleWriter(path, df.columns) as writer:
+        writer.write(df)
+
+def export_schedules(schedules, path, sheet_per_contract=False, contract_column='contract_id'):
+    """
+    여러 계약의 결제 스케줄을 하나의 파일로 내보냅니다.
+
+    Args:
+      schedules: contract_column, '회차' 및 스케줄 컬럼을 가진 long format DataFrame,
+                 또는 그런 DataFrame을 차례로 생성하는 iterable (한 번에 하나씩만 메모리에 유지)
+      path: 출력 파일 경로 (.xlsx, .csv, .parquet)
+      sheet_per_contract: xlsx에서 계약마다 시트를 나눌지 여부
+      contract_column: 계약을 구분하는 컬럼 이름
+    """
+    if isinstance(schedules, pd.DataFrame):
+        schedules = [schedules]
+    writer = None
+    try:
+        for df in schedules:
+            if writer is None:
+                writer = ScheduleWriter(path, df.columns, sheet_per_contract, contract_column)
+            writer.write(df)
+    finally:
+        if writer is not None:
+            writer.close()
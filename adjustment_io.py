@@ -0,0 +1,307 @@
+"""
+수금 내역 파일을 청크 단위로 읽어오는 모듈입니다.
+
+CSV, Parquet(pyarrow 필요), Excel(xlsx: openpyxl 읽기 전용 모드) 파일을 지원하며,
+모든 청크에 read_collection_data_from_excel()과 같은 검증/변환 규칙을 적용합니다.
+지점별로 나뉜 여러 수금 내역 파일은 read_collection_files()로 프로세스 풀에서 동시에 읽어 하나로 합칩니다.
+"""
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from adjustment import normalize_collection_data
+
+# 한 번에 읽어올 기본 행 수
+DEFAULT_CHUNK_SIZE = 100_000
+
+def _iter_csv_chunks(file_path, chunk_size):
+    yield from pd.read_csv(file_path, chunksize=chunk_size)
+
+def _iter_parquet_chunks(file_path, chunk_size):
+    import pyarrow.parquet as pq # Parquet 파일을 읽을 때만 필요
+
+    parquet_file = pq.ParquetFile(file_path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield batch.to_pandas()
+
+def _iter_xlsx_chunks(file_path, chunk_size):
+    from openpyxl import load_workbook # pandas.read_excel과 같은 엔진을 읽기 전용 모드로 사용
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True) # pd.read_excel과 같이 첫 번째 시트
+        header = next(rows, None)
+        if header is None:
+            return
+        buffer = []
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame(buffer, columns=header)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame(buffer, columns=header)
+    finally:
+        workbook.close()
+
+def _iter_xls_chunks(file_path, chunk_size):
+    # 구형 xls 형식은 스트리밍 읽기를 지원하지 않으므로 전체를 읽은 뒤 나눔
+    df = pd.read_excel(file_path)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+# 확장자별 청크 reader (register_collection_reader()로 추가 가능)
+COLLECTION_READERS = {
+    '.csv': _iter_csv_chunks,
+    '.parquet': _iter_parquet_chunks,
+    '.xlsx': _iter_xlsx_chunks,
+    '.xls': _iter_xls_chunks,
+}
+
+def register_collection_reader(extension, reader):
+    """
+    새로운 파일 형식의 reader를 등록합니다.
+    reader는 (file_path, chunk_size)를 받아 DataFrame 청크를 생성하는 함수입니다.
+    """
+    COLLECTION_READERS[extension.lower()] = reader
+
+def iter_collection_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    수금 내역 파일을 chunk_size 행 단위로 읽어 검증/변환된 DataFrame을 차례로 반환합니다.
+    필요한 컬럼이 없으면 KeyError, 지원하지 않는 형식이면 ValueError를 발생시킵니다.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    reader = COLLECTION_READERS.get(extension)
+    if reader is None:
+        raise ValueError(f"지원하지 않는 파일 형식입니다: {file_path}")
+
+    for chunk in reader(file_path, chunk_size):
+        yield normalize_collection_data(chunk.reset_index(drop=True))
+
+def read_collection_file(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    수금 내역 파일 전체를 청크 단위로 읽어 하나의 DataFrame으로 반환합니다.
+    """
+    chunks = list(iter_collection_chunks(file_path, chunk_size))
+    if not chunks:
+        return normalize_collection_data(pd.DataFrame(columns=['결제일', '결제금액']))
+    return pd.concat(chunks, ignore_index=True)
+
+# 여러 파일을 합칠 때 행마다 기록하는 원본 파일 이름 컬럼
+SOURCE_COLUMN = '수금파일'
+# 파일별 오류 보고서의 컬럼 구성
+FILE_ERROR_COLUMNS = ['file', 'error']
+
+def collection_file_paths(source):
+    """
+    디렉터리, glob 패턴, 파일 경로 또는 그 리스트를 읽을 수금 내역 파일 경로 목록으로 펼칩니다.
+    디렉터리는 지원하는 확장자(COLLECTION_READERS)의 파일만 이름 순으로 포함하고, Excel 임시 파일(~$)은 제외합니다.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return [path for item in source for path in collection_file_paths(item)]
+    source = os.fspath(source)
+    if os.path.isdir(source):
+        paths = [
+            os.path.join(source, name) for name in os.listdir(source)
+            if os.path.splitext(name)[1].lower() in COLLECTION_READERS
+        ]
+    elif glob.has_magic(source):
+        paths = glob.glob(source)
+    else:
+        return [source]
+    return sorted(path for path in paths if os.path.isfile(path) and not os.path.basename(path).startswith('~$'))
+
+def is_collection_file_set(source):
+    """
+    수금 내역 원본이 여러 파일(디렉터리, glob 패턴 또는 경로 리스트)인지 여부를 반환합니다.
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        return True
+    return os.path.isdir(source) or glob.has_magic(os.fspath(source))
+
+def _read_collection_file_safely(file_path, chunk_size, required_columns):
+    """
+    수금 내역 파일 하나를 읽고 필수 컬럼을 검증합니다 (작업 프로세스에서 실행).
+    오류가 발생해도 다른 파일의 처리가 중단되지 않도록 (DataFrame 또는 None, 오류 메시지 또는 None)을 반환합니다.
+    """
+    try:
+        collections = read_collection_file(file_path, chunk_size)
+        missing_cols = [col for col in required_columns if col not in collections.columns]
+        if missing_cols:
+            raise KeyError(f"필요한 컬럼이 누락되었습니다: {', '.join(missing_cols)}")
+        return collections, None
+    except FileNotFoundError:
+        return None, f"파일을 찾을 수 없습니다: {file_path}"
+    except KeyError as e:
+        return None, str(e.args[0]) if e.args else str(e)
+    except Exception as e:
+        return None, f"수금 내역 파일을 읽는 중 오류 발생: {e}"
+
+def read_collection_files(source, workers=1, chunk_size=DEFAULT_CHUNK_SIZE, required_columns=('결제일', '결제금액')):
+    """
+    여러 수금 내역 파일을 프로세스 풀에서 동시에 읽어 결제일 순으로 정렬된 하나의 DataFrame으로 합칩니다.
+    읽지 못한 파일은 건너뛰고 파일별 오류로 보고합니다.
+
+    Args:
+      source: 디렉터리, glob 패턴(예: 'branches/*.xlsx'), 파일 경로 또는 그 리스트
+      workers: 프로세스 수 (1이면 현재 프로세스에서 처리)
+      chunk_size: 파일마다 한 번에 읽어올 행 수
+      required_columns: 파일마다 있어야 하는 컬럼 (예: 여러 계약이 섞인 파일이면 'contract_id' 추가)
+
+    Returns:
+      (수금 내역 DataFrame, 오류 목록) 튜플
+        수금 내역은 결제일 순(결제일이 같으면 파일 이름 순, 파일 내 순서)으로 정렬되며 SOURCE_COLUMN 컬럼에 원본 파일 이름을 기록
+        오류 목록의 각 항목은 FILE_ERROR_COLUMNS 키를 가진 dict
+    """
+    paths = collection_file_paths(source)
+    if workers <= 1 or len(paths) <= 1:
+        results = [_read_collection_file_safely(path, chunk_size, required_columns) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+            futures = [executor.submit(_read_collection_file_safely, path, chunk_size, required_columns) for path in paths]
+            results = [future.result() for future in futures]
+
+    frames = []
+    errors = []
+    for path, (collections, error) in zip(paths, results):
+        if error is not None:
+            errors.append({'file': path, 'error': error})
+        elif len(collections):
+            frames.append(collections.assign(**{SOURCE_COLUMN: os.path.basename(path)}))
+    if not paths:
+        errors.append({'file': str(source), 'error': "읽을 수금 내역 파일이 없습니다."})
+    if not frames:
+        empty = normalize_collection_data(pd.DataFrame(columns=list(dict.fromkeys(['결제일', '결제금액', *required_columns]))))
+        return empty.assign(**{SOURCE_COLUMN: pd.Series(dtype=object)}), errors
+    merged = pd.concat(frames, ignore_index=True)
+    return merged.sort_values(by=['결제일'], kind='stable').reset_index(drop=True), errors
+
+def iter_collections_by_contract(file_path, contract_column='contract_id', chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    계약번호 순으로 묶여 있는 수금 내역 파일을 계약 단위로 읽어옵니다.
+    한 번에 한 청크와 진행 중인 계약의 수금 내역만 메모리에 유지합니다.
+    계약번호가 비어 있는 행은 제외됩니다.
+
+    Args:
+      file_path: 수금 내역 파일 경로
+      contract_column: 계약을 구분하는 컬럼 이름
+      chunk_size: 한 번에 읽어올 행 수
+
+    Returns:
+      (계약번호, 해당 계약의 수금 내역 DataFrame) 튜플을 차례로 생성하는 iterator
+    """
+    seen_contracts = set()
+
+    def check_contiguous(contract_id):
+        if contract_id in seen_contracts:
+            raise ValueError(f"수금 내역이 계약번호 순으로 묶여 있지 않습니다: {contract_id}")
+        seen_contracts.add(contract_id)
+
+    pending = None # 다음 청크로 이어질 수 있는 마지막 계약의 수금 내역
+    for chunk in iter_collection_chunks(file_path, chunk_size):
+        if contract_column not in chunk.columns:
+            raise KeyError(f"필요한 컬럼이 누락되었습니다: {contract_column}")
+        chunk = chunk.dropna(subset=[contract_column])
+        if pending is not None:
+            chunk = pd.concat([pending, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+
+        # 계약번호가 바뀌는 위치로 계약 구간을 나눔
+        contract_ids = chunk[contract_column].to_numpy()
+        starts = np.flatnonzero(np.r_[True, contract_ids[1:] != contract_ids[:-1]])
+        ends = np.r_[starts[1:], len(contract_ids)]
+        for start, end in zip(starts[:-1], ends[:-1]):
+            check_contiguous(contract_ids[start])
+            yield contract_ids[start], chunk.iloc[start:end].reset_index(drop=True)
+        pending = chunk.iloc[starts[-1]:]
+
+    if pending is not None and not pending.empty:
+        contract_id = pending[contract_column].iloc[0]
+        check_contiguous(contract_id)
+        yield contract_id, pending.reset_index(drop=True)
+
+# 매칭되지 않은 수금 내역의 사유
+UNMATCHED_MISSING_CONTRACT = '계약번호 없음'
+UNMATCHED_UNKNOWN_CONTRACT = '등록되지 않은 계약'
+
+def build_collection_index(collections, contract_column='contract_id'):
+    """
+    여러 계약이 섞인 수금 내역을 계약, 결제일 순으로 한 번 정렬하고 계약별 구간(offset) 테이블을 만듭니다.
+    이후 계약 하나의 수금 내역은 전체를 다시 검색하지 않고 정렬된 배열의 구간으로 바로 참조합니다.
+
+    Args:
+      collections: contract_column, '결제일', '결제금액' 컬럼을 가진 수금 내역 DataFrame
+      contract_column: 계약을 구분하는 컬럼 이름
+
+    Returns:
+      다음 키를 가진 dict
+        'collections': 계약, 결제일 순으로 정렬된 수금 내역 DataFrame (계약번호가 있는 행만)
+        'dates', 'amounts': 정렬된 결제일(datetime64[us]), 결제금액 배열
+        'offsets': g번째 계약의 수금 내역 구간은 offsets[g]:offsets[g + 1]
+        'groups': 계약번호 → g
+        'missing': 계약번호가 비어 있는 수금 내역 DataFrame
+        'contract_column': 계약을 구분하는 컬럼 이름
+    """
+    if contract_column not in collections.columns:
+        raise KeyError(f"필요한 컬럼이 누락되었습니다: {contract_column}")
+
+    codes, contract_ids = pd.factorize(collections[contract_column])
+    has_contract = codes >= 0
+    # 같은 계약 안에서는 결제일 순, 결제일이 같으면 입력 순서를 유지 (계약 순서는 처음 등장한 순서)
+    order = pd.DataFrame({'code': codes, '결제일': collections['결제일'].to_numpy()})[has_contract] \
+        .sort_values(by=['code', '결제일'], kind='stable').index.to_numpy()
+    indexed = collections.iloc[order].reset_index(drop=True)
+
+    counts = np.bincount(codes[has_contract], minlength=len(contract_ids))
+    return {
+        'collections': indexed,
+        'dates': indexed['결제일'].to_numpy(dtype='datetime64[us]'),
+        'amounts': indexed['결제금액'].to_numpy(),
+        'offsets': np.concatenate([[0], np.cumsum(counts)]),
+        'groups': {contract_id: group for group, contract_id in enumerate(contract_ids.tolist())},
+        'missing': collections[~has_contract].reset_index(drop=True),
+        'contract_column': contract_column,
+    }
+
+def collection_positions(index, contract_id):
+    """
+    계약의 수금 내역이 정렬된 배열에서 차지하는 구간(slice)을 반환합니다. 수금 내역이 없으면 빈 구간입니다.
+    """
+    group = index['groups'].get(contract_id)
+    if group is None:
+        return slice(0, 0)
+    return slice(index['offsets'][group], index['offsets'][group + 1])
+
+def select_collections(index, contract_ids):
+    """
+    주어진 계약들의 수금 내역을 계약 순서대로 이어 붙인 DataFrame을 반환합니다.
+    처리 비용은 전체 수금 내역이 아니라 선택한 계약의 수금 건수에 비례합니다.
+    """
+    groups = [index['groups'].get(contract_id) for contract_id in contract_ids]
+    groups = np.array([group for group in groups if group is not None], dtype=np.int64)
+    starts = index['offsets'][groups]
+    counts = index['offsets'][groups + 1] - starts
+    # 각 구간의 위치를 한 번에 펼침: starts[i], starts[i] + 1, ..., starts[i] + counts[i] - 1
+    positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    return index['collections'].iloc[positions]
+
+def unmatched_collections(index, contract_ids):
+    """
+    계약 목록에 매칭되지 않는 수금 내역을 반환합니다.
+    계약번호가 비어 있는 행과 계약 목록에 없는 계약의 행을 '사유' 컬럼으로 구분합니다.
+    """
+    known = set(contract_ids)
+    orphan_groups = [group for contract_id, group in index['groups'].items() if contract_id not in known]
+    orphans = [
+        index['collections'].iloc[index['offsets'][group]:index['offsets'][group + 1]] for group in orphan_groups
+    ]
+    unmatched = pd.concat(
+        [index['missing'].assign(사유=UNMATCHED_MISSING_CONTRACT)]
+        + [rows.assign(사유=UNMATCHED_UNKNOWN_CONTRACT) for rows in orphans],
+        ignore_index=True,
+    )
+    return unmatched
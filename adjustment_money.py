@@ -0,0 +1,205 @@
+"""
+금액을 원 단위 정수(int64)로 계산하는 모듈입니다 (정산 금액 계산 방식 'exact').
+
+기존 방식('decimal')은 월요금을 float로 받아 Decimal(str(...))로 변환하고, 정밀도 10자리 컨텍스트에서
+곱셈/나눗셈마다 반올림합니다. 이 모듈은 모든 금액을 원 단위 정수로 두고, 반올림은 아래 지점에서만 한 번 적용합니다.
+
+  입력 금액: 원 미만 반올림 (0.5원은 올림, ROUND_HALF_UP)
+  일할 금액: 월요금 * 12 * 사용일수 / 365 를 원 단위로 반올림 (ROUND_HALF_EVEN, 365가 홀수이므로 동률 없음)
+  연체 금액: 월요금 * 연체일수 * 0.0005479452 를 원 단위로 내림 (FLOOR)
+
+중간 반올림이 없으므로 월요금이 커도 결과가 정확하며, 모든 계산이 정수 배열 연산으로 처리됩니다.
+cross_check_*() 함수로 기존 Decimal 방식과 결과를 비교할 수 있습니다.
+
+사용 예:
+  python adjustment_money.py --contracts contracts.csv --collections collections.parquet --as-of 2026-10-31
+"""
+import argparse
+import sys
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+import numpy as np
+
+# 연체 일일 요율 0.0005479452 = OVERDUE_RATE_NUMERATOR / OVERDUE_RATE_DENOMINATOR
+OVERDUE_RATE_NUMERATOR = 5479452
+OVERDUE_RATE_DENOMINATOR = 10 ** 10
+# 일할 계산의 연간 개월 수, 일수 (일일 요금 = 월요금 * 12 / 365)
+MONTHS_PER_YEAR = 12
+DAYS_PER_YEAR = 365
+
+def to_won(values):
+    """
+    금액(숫자, 문자열, Decimal 또는 그 배열)을 원 단위 int64 배열로 변환합니다. 원 미만은 반올림(0.5원은 올림)합니다.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        return values.astype(np.int64)
+    if values.dtype.kind == 'f':
+        # 음수도 절댓값 기준으로 0.5원을 올림하여 Decimal ROUND_HALF_UP과 같게 함
+        return (np.sign(values) * np.floor(np.abs(values) + 0.5)).astype(np.int64)
+    # 문자열/Decimal은 float를 거치지 않고 Decimal로 반올림
+    amounts = []
+    for value in values.ravel().tolist():
+        try:
+            amounts.append(int(Decimal(str(value).strip().replace(',', '')).quantize(Decimal(1), rounding=ROUND_HALF_UP)))
+        except (InvalidOperation, ValueError):
+            raise ValueError(f"금액 형식이 올바르지 않습니다: {value}")
+    return np.array(amounts, dtype=np.int64).reshape(values.shape)
+
+def won(value):
+    """
+    금액 하나를 원 단위 정수(int)로 변환합니다 (to_won()과 같은 반올림).
+    """
+    return int(to_won(value))
+
+def prorated_won(monthly_fees, days_used):
+    """
+    일할 금액 ROUND(월요금 * 12 * 사용일수 / 365)을 정수 연산으로 계산합니다.
+
+    Args:
+      monthly_fees: 원 단위 월요금 (int64 배열 또는 스칼라)
+      days_used: 사용일수 (int64 배열 또는 스칼라)
+
+    Returns:
+      원 단위 일할 금액 (int64 배열)
+    """
+    numerators = np.asarray(monthly_fees, dtype=np.int64) * MONTHS_PER_YEAR * np.asarray(days_used, dtype=np.int64)
+    quotients, remainders = np.divmod(numerators, DAYS_PER_YEAR)
+    return quotients + (2 * remainders > DAYS_PER_YEAR)
+
+def overdue_won(base_fees, overdue_days):
+    """
+    연체 금액 FLOOR(월요금 * 연체일수 * 0.0005479452)를 정수 연산으로 계산합니다.
+    int64 범위를 넘지 않도록 (월요금 * 연체일수)를 10^10 단위로 나누어 요율을 곱합니다.
+
+    Args:
+      base_fees: 원 단위 기본 월요금 (int64 배열 또는 스칼라)
+      overdue_days: 연체일수 (int64 배열 또는 스칼라)
+
+    Returns:
+      원 단위 연체 금액 (int64 배열)
+    """
+    base = np.asarray(base_fees, dtype=np.int64) * np.asarray(overdue_days, dtype=np.int64)
+    high, low = np.divmod(base, OVERDUE_RATE_DENOMINATOR)
+    return high * OVERDUE_RATE_NUMERATOR + low * OVERDUE_RATE_NUMERATOR // OVERDUE_RATE_DENOMINATOR
+
+def cross_check_kernels(monthly_fees, max_overdue_days=3650):
+    """
+    일할/연체 금액을 기존 Decimal 방식과 정수 방식으로 모두 계산하여 다른 결과를 반환합니다.
+    일할 금액은 사용일수 1~31일, 연체 금액은 연체일수 1~max_overdue_days일을 모든 월요금에 대해 비교합니다.
+
+    Returns:
+      'prorated', 'overdue' 키에 (월요금, 일수, decimal 결과, exact 결과) 튜플 리스트를 담은 dict
+    """
+    from adjustment import _calculate_prorated_batch, calculate_overdue_batch, money_mode, set_money_mode
+
+    fees = to_won(monthly_fees)
+    prorated_fees, prorated_days = (grid.ravel() for grid in np.meshgrid(fees, np.arange(1, 32), indexing='ij'))
+    overdue_fees, overdue_days = (grid.ravel() for grid in np.meshgrid(fees, np.arange(1, max_overdue_days + 1), indexing='ij'))
+    # 연체일수 d는 결제일 + 4일 12시간 59분 + (d - 1)일 초과 ~ d일 이하 시점
+    scheduled = np.full(len(overdue_days), np.datetime64('2024-01-01T00:00:00', 'us'))
+    check_points = scheduled + np.timedelta64(((4 * 24 + 12) * 60 + 59) * 60, 's') + overdue_days * np.timedelta64(1, 'D')
+
+    previous = money_mode()
+    try:
+        set_money_mode('decimal')
+        decimal_prorated = _calculate_prorated_batch(prorated_fees, prorated_days)
+        decimal_overdue = calculate_overdue_batch(scheduled, overdue_fees, check_points)
+    finally:
+        set_money_mode(previous)
+    exact_prorated = prorated_won(prorated_fees, prorated_days)
+    exact_overdue = overdue_won(overdue_fees, overdue_days)
+
+    def differences(fees, days, decimal_values, exact_values):
+        mismatch = np.flatnonzero(decimal_values != exact_values)
+        return list(zip(
+            fees[mismatch].tolist(), days[mismatch].tolist(), decimal_values[mismatch].tolist(), exact_values[mismatch].tolist()
+        ))
+
+    return {
+        'prorated': differences(prorated_fees, prorated_days, decimal_prorated, exact_prorated),
+        'overdue': differences(overdue_fees, overdue_days, decimal_overdue, exact_overdue),
+    }
+
+def cross_check_portfolio(contracts, collections, as_of):
+    """
+    계약 목록 전체를 기존 Decimal 방식과 정수 방식으로 정산하여 회차별 금액이 다른 행을 반환합니다.
+
+    Args:
+      contracts: adjustment_batch.CONTRACT_COLUMNS 컬럼을 가진 계약 목록 DataFrame
+      collections: 'contract_id', '결제일', '결제금액' 컬럼을 가진 수금 내역 DataFrame
+      as_of: 연체 계산 기준 시점
+
+    Returns:
+      (비교한 회차 수, 금액이 다른 회차의 'contract_id', '회차', 컬럼, 'decimal', 'exact' DataFrame) 튜플
+    """
+    import pandas as pd
+
+    from adjustment import money_mode, set_money_mode
+    from adjustment_batch import settle_shard
+
+    previous = money_mode()
+    results = {}
+    try:
+        for mode in ('decimal', 'exact'):
+            set_money_mode(mode)
+            _, results[mode], _, _ = settle_shard(0, contracts, collections, as_of)
+    finally:
+        set_money_mode(previous)
+
+    decimal_result, exact_result = results['decimal'], results['exact']
+    differences = []
+    for column in ['월요금', '납부월요금', '잔여월요금', '연체금액', '납부연체금액', '잔여연체금액']:
+        decimal_values = decimal_result[column].to_numpy(dtype=np.float64)
+        exact_values = exact_result[column].to_numpy(dtype=np.float64)
+        mismatch = np.flatnonzero(decimal_values != exact_values)
+        differences.append(pd.DataFrame({
+            'contract_id': decimal_result['contract_id'].to_numpy()[mismatch],
+            '회차': decimal_result['회차'].to_numpy()[mismatch],
+            '컬럼': column,
+            'decimal': decimal_values[mismatch],
+            'exact': exact_values[mismatch],
+        }))
+    return len(decimal_result), pd.concat(differences, ignore_index=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='정수(원 단위) 금액 계산 결과를 기존 Decimal 계산 결과와 비교합니다.')
+    parser.add_argument('--contracts', help='계약 목록 파일 (지정하지 않으면 합성 계약 사용)')
+    parser.add_argument('--collections', help='수금 내역 파일')
+    parser.add_argument('--as-of', help='연체 계산 기준 시점 (YYYY-MM-DD, 기본값: 현재 시각)')
+    parser.add_argument('--synthetic', type=int, default=2000, help='합성 계약 수')
+    parser.add_argument('--fees', type=int, nargs='*', default=[300000, 500000, 523457, 1150000, 1234567, 98765432],
+                        help='일할/연체 계산을 비교할 월요금 목록')
+    parser.add_argument('--output', help='금액이 다른 회차를 기록할 CSV 파일 경로')
+    args = parser.parse_args(argv)
+
+    from datetime import datetime
+
+    kernels = cross_check_kernels(args.fees)
+    for name, differences in kernels.items():
+        print(f"{name}: 다른 결과 {len(differences)}건")
+        for monthly_fee, days, decimal_value, exact_value in differences[:10]:
+            print(f"  월요금 {monthly_fee}, {days}일: decimal {decimal_value}, exact {exact_value}")
+
+    as_of = datetime.fromisoformat(args.as_of) if args.as_of else datetime.now()
+    if args.contracts:
+        from adjustment_batch import read_collections, read_contracts
+
+        contracts = read_contracts(args.contracts)
+        collections = read_collections(args.collections)
+    else:
+        from adjustment import generate_schedules
+        from adjustment_bench import synthetic_collections, synthetic_contracts
+
+        contracts = synthetic_contracts(args.synthetic)
+        collections = synthetic_collections(generate_schedules(contracts), as_of)
+    compared, differences = cross_check_portfolio(contracts, collections, as_of)
+    print(f"회차 {compared}건 중 금액이 다른 항목 {len(differences)}건")
+    if len(differences):
+        print(differences.head(20).to_string())
+    if args.output:
+        differences.to_csv(args.output, index=False, encoding='utf-8-sig')
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""
+정산 처리의 단계별 소요 시간, 호출 횟수, 처리 행 수, 최대 메모리, Decimal 연산 수를 측정하는 프로파일링 모듈입니다.
+
+측정을 켜면(enable) 주요 함수(파일 읽기, 스케줄 생성, 수금 반영, 연체/일할 계산, 파일 쓰기)를
+측정용 함수로 교체하고, 끄면(disable) 원래 함수로 되돌립니다. 측정하지 않을 때는 아무 함수도
+교체하지 않으므로 추가 비용이 없습니다.
+
+프로세스 전체의 최대 메모리(ru_maxrss)는 보고서 최상위에 한 번만 기록합니다. 단계별 최대 메모리는
+메모리 측정을 함께 켰을 때만 tracemalloc으로 추적한 메모리(numpy 배열 포함)가 그 단계 호출 중에 가장 컸던 값을 기록합니다.
+tracemalloc은 모든 메모리 할당을 추적하므로 메모리 측정 중에는 소요 시간이 몇 배 늘어납니다.
+
+사용 예:
+  ADJUSTMENT_PROFILE=profile.json adjustment            (환경 변수, 모든 실행 모드)
+  ADJUSTMENT_PROFILE_MEMORY=1                            (환경 변수, 단계별 최대 메모리도 측정)
+  adjustment batch ... --profile profile.json [--profile-memory]  (배치 CLI 옵션)
+"""
+import atexit
+import functools
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+# 프로파일 보고서 경로를 지정하는 환경 변수 ('1'이면 DEFAULT_REPORT_PATH)
+PROFILE_ENV_VAR = 'ADJUSTMENT_PROFILE'
+DEFAULT_REPORT_PATH = 'adjustment_profile.json'
+# 단계별 최대 메모리도 측정할지 지정하는 환경 변수 ('1'이면 측정)
+PROFILE_MEMORY_ENV_VAR = 'ADJUSTMENT_PROFILE_MEMORY'
+STAGE_FIELDS = ['calls', 'seconds', 'rows', 'decimal_ops', 'peak_memory_mb']
+
+_enabled = False
+_started = None
+_stats = {} # 단계 이름 → STAGE_FIELDS 값 dict
+_patched = [] # (소유 객체, 속성 이름, 원래 함수)
+_report_path = None
+_lock = threading.Lock()
+_started_tracing = False # enable()에서 tracemalloc을 시작했는지 여부
+_open_calls = [] # 측정 중인 호출별 [그 호출 중 추적 메모리 최대값(바이트)]
+_traced_peak = 0 # 단계별 측정을 위해 초기화하기 전까지의 추적 메모리 최대값(바이트)
+
+def _length(value):
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+def _single_row(args, kwargs, result):
+    return 1
+
+def _result_rows(args, kwargs, result):
+    return _length(result)
+
+def _first_result_rows(args, kwargs, result):
+    return _length(result[0])
+
+def _first_argument_rows(args, kwargs, result):
+    return _length(args[0]) if args else 0
+
+def _writer_rows(args, kwargs, result):
+    return _length(args[1]) if len(args) > 1 else 0
+
+def _shard_rows(args, kwargs, result):
+    return _length(result[1])
+
+def _array_size(args, kwargs, result):
+    return int(getattr(result, 'size', 0))
+
+def _collection_rows(args, kwargs, result):
+    return _length(args[3]) if len(args) > 3 else _length(kwargs.get('collection_amounts', ()))
+
+def _installment_overdue_ops(args, kwargs, result):
+    # 연체 기간이면 월요금 * 0.0005479452 * 연체일수 (곱셈 2회)
+    from datetime import timedelta
+    scheduled_date, _, check_point = args[:3]
+    return 2 if check_point >= scheduled_date + timedelta(days=4, hours=12, minutes=59) else 0
+
+def _batch_overdue_ops(args, kwargs, result):
+    # 정수 연산으로 재현한 Decimal 곱셈 2회 / 회차
+    return 2 * int(getattr(result, 'size', 0))
+
+def _prorated_batch_ops(args, kwargs, result):
+    # 월요금 * 12, / 365, * 사용일수, 원 단위 반올림
+    return 4 * int(getattr(result, 'size', 0))
+
+def _calendar_misses(cache_info):
+    info = cache_info()
+    return info['daily_rate']['misses'], info['prorated_amount']['misses']
+
+def _prorated_ops(before, after):
+    # 캐시에 없을 때만 Decimal로 계산: 일일 요금 (* 12, / 365), 일할 금액 (* 사용일수, 반올림)
+    return 2 * (after[0] - before[0]) + 2 * (after[1] - before[1])
+
+# (모듈 이름, 속성 경로, 처리 행 수 계산 함수, Decimal 연산 수 계산 함수)
+_TARGETS = [
+    ('pandas', 'read_excel', _result_rows, None),
+    ('adjustment', 'read_collection_data_from_excel', _result_rows, None),
+    ('adjustment', 'generate_prepayment_schedule', _result_rows, None),
+    ('adjustment', 'generate_postpayment_schedule', _result_rows, None),
+    ('adjustment', 'generate_schedule_arrays', _result_rows, None),
+    ('adjustment', 'calculate_prorated_amount', _single_row, None),
+    ('adjustment', '_calculate_prorated_batch', _array_size, _prorated_batch_ops),
+    ('adjustment', 'calculate_overdue_for_installment', _single_row, _installment_overdue_ops),
+    ('adjustment', 'calculate_overdue_batch', _array_size, _batch_overdue_ops),
+    ('adjustment', 'allocate_payments', _collection_rows, None),
+    ('adjustment', 'settle_overdue', _first_argument_rows, None),
+    ('adjustment', 'allocate_collections', _result_rows, None),
+    ('adjustment', 'settle_as_of', None, None),
+    ('adjustment_io', 'read_collection_file', _result_rows, None),
+    ('adjustment_io', 'read_collection_files', _first_result_rows, None),
+    ('adjustment_io', 'build_collection_index', _first_argument_rows, None),
+    ('adjustment_batch', 'read_contracts', _result_rows, None),
+    ('adjustment_batch', 'read_collections', _result_rows, None),
+    ('adjustment_batch', 'settle_shard', _shard_rows, None),
+    ('adjustment_batch', 'settle_shard_incremental', _shard_rows, None),
+    ('adjustment_state', 'save_settlement_states', None, None),
+    ('adjustment_export', 'ScheduleWriter.write', _writer_rows, None),
+    ('adjustment_export', 'export_schedule', _first_argument_rows, None),
+    ('adjustment_report', 'portfolio_summary', _first_argument_rows, None),
+]
+
+def _peak_memory_mb():
+    """
+    현재 프로세스의 최대 메모리 사용량(MB)을 반환합니다.
+    resource 모듈이 없는 환경(Windows)에서는 tracemalloc이 추적 중일 때 그 최대값을 사용합니다.
+    """
+    try:
+        import resource
+    except ImportError:
+        return max(_traced_peak, tracemalloc.get_traced_memory()[1]) / 2 ** 20 if tracemalloc.is_tracing() else None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10 # macOS는 바이트, Linux는 KB
+
+def _stage(name):
+    stage = _stats.get(name)
+    if stage is None:
+        stage = _stats[name] = {'calls': 0, 'seconds': 0.0, 'rows': 0, 'decimal_ops': 0, 'peak_memory_mb': None}
+    return stage
+
+def _start_call():
+    """
+    단계 호출 시작 시 추적 메모리 최대값을 초기화하고, 호출 중 최대값을 모을 항목을 반환합니다.
+    초기화하기 전의 최대값은 아직 끝나지 않은 모든 호출(상위 단계, 다른 스레드의 단계)에 먼저 반영합니다.
+    """
+    global _traced_peak
+    if not tracemalloc.is_tracing():
+        return None
+    with _lock:
+        current, peak = tracemalloc.get_traced_memory()
+        for call in _open_calls:
+            call[0] = max(call[0], peak)
+        _traced_peak = max(_traced_peak, peak)
+        tracemalloc.reset_peak()
+        call = [current]
+        _open_calls.append(call)
+    return call
+
+def _finish_call(call):
+    """
+    _start_call()로 시작한 호출 중의 추적 메모리 최대값(MB)을 반환합니다.
+    """
+    if call is None:
+        return None
+    with _lock:
+        _open_calls[:] = [other for other in _open_calls if other is not call]
+        peak = tracemalloc.get_traced_memory()[1] if tracemalloc.is_tracing() else 0
+    return max(call[0], peak) / 2 ** 20
+
+def _record(name, seconds, rows=0, decimal_ops=0, memory=None):
+    with _lock: # 백그라운드 기록 스레드(BackgroundScheduleWriter)에서도 기록
+        stage = _stage(name)
+        stage['calls'] += 1
+        stage['seconds'] += seconds
+        stage['rows'] += rows
+        stage['decimal_ops'] += decimal_ops
+        if memory is not None and (stage['peak_memory_mb'] is None or memory > stage['peak_memory_mb']):
+            stage['peak_memory_mb'] = memory
+
+def _instrument(name, function, rows, decimal_ops):
+    # 일할 계산은 캐시에 없을 때만 Decimal로 계산하므로, 함수가 속한 모듈의 캐시 통계로 연산 수를 셈
+    cache_info = function.__globals__['calendar_cache_info'] if function.__name__ == 'calculate_prorated_amount' else None
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        before = _calendar_misses(cache_info) if cache_info else None
+        call = _start_call()
+        start = time.perf_counter()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            memory = _finish_call(call)
+        _record(
+            name,
+            seconds,
+            rows(args, kwargs, result) if rows is not None else 0,
+            _prorated_ops(before, _calendar_misses(cache_info)) if cache_info else
+            decimal_ops(args, kwargs, result) if decimal_ops is not None else 0,
+            memory,
+        )
+        return result
+    wrapper.__wrapped_by_profile__ = True
+    return wrapper
+
+def _owners(module_name):
+    """
+    함수를 교체할 모듈 목록입니다. adjustment.py를 스크립트로 실행한 경우 __main__도 포함합니다.
+    """
+    __import__(module_name)
+    owners = [sys.modules[module_name]]
+    main = sys.modules.get('__main__')
+    if os.path.basename(getattr(main, '__file__', '') or '') == f'{module_name}.py':
+        owners.append(main)
+    return owners
+
+def _patch(owner, attribute, replacement):
+    _patched.append((owner, attribute, getattr(owner, attribute)))
+    setattr(owner, attribute, replacement)
+
+def enable(report_path=None, memory=False):
+    """
+    측정을 켭니다. report_path를 주면 프로세스 종료 시 보고서를 JSON 파일로 기록합니다.
+    memory가 True이면 tracemalloc으로 단계별 최대 메모리도 측정합니다.
+    """
+    global _enabled, _started, _report_path, _started_tracing
+    if report_path and _report_path is None:
+        _report_path = report_path
+        atexit.register(_write_report_at_exit)
+    if _enabled:
+        return
+    _enabled = True
+    _started = time.perf_counter()
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracing = True
+
+    for module_name, path, rows, decimal_ops in _TARGETS:
+        try:
+            owners = _owners(module_name)
+        except ImportError: # 설치되지 않은 선택적 의존성
+            continue
+        *parents, attribute = path.split('.')
+        for owner in owners:
+            for parent in parents:
+                owner = getattr(owner, parent, None)
+            original = getattr(owner, attribute, None) if owner is not None else None
+            if original is None or getattr(original, '__wrapped_by_profile__', False):
+                continue
+            wrapper = _instrument(attribute if not parents else path, original, rows, decimal_ops)
+            _patch(owner, attribute, wrapper)
+            # 다른 모듈에서 'from ... import'로 가져간 같은 함수도 교체
+            for module in list(sys.modules.values()):
+                if module is owner or not getattr(module, '__name__', '').startswith('adjustment'):
+                    continue
+                if getattr(module, attribute, None) is original:
+                    _patch(module, attribute, wrapper)
+
+def disable():
+    """
+    측정을 끄고 교체한 함수를 원래대로 되돌립니다. 측정 결과는 유지됩니다.
+    """
+    global _enabled, _started_tracing
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+    if _started_tracing:
+        tracemalloc.stop()
+        _started_tracing = False
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def is_tracking_memory():
+    return _enabled and tracemalloc.is_tracing()
+
+def enable_from_environment():
+    """
+    환경 변수 ADJUSTMENT_PROFILE이 설정되어 있으면 측정을 켭니다.
+    ADJUSTMENT_PROFILE_MEMORY가 '1'이면 단계별 최대 메모리도 측정합니다.
+
+    Returns:
+      측정을 켰으면 True
+    """
+    value = os.environ.get(PROFILE_ENV_VAR, '').strip()
+    if not value or value == '0':
+        return False
+    enable(DEFAULT_REPORT_PATH if value == '1' else value, os.environ.get(PROFILE_MEMORY_ENV_VAR, '').strip() == '1')
+    return True
+
+def reset():
+    """
+    측정 결과를 초기화합니다.
+    """
+    _stats.clear()
+
+def collect(reset_stats=True):
+    """
+    측정 결과 사본을 반환합니다. 배치 작업 프로세스에서 샤드별 결과를 부모 프로세스로 보낼 때 사용합니다.
+    """
+    snapshot = {name: dict(stage) for name, stage in _stats.items()}
+    if reset_stats:
+        reset()
+    return snapshot
+
+def merge(snapshot):
+    """
+    collect()로 받은 다른 프로세스의 측정 결과를 더합니다. 최대 메모리는 큰 값을 유지합니다.
+    """
+    for name, other in snapshot.items():
+        stage = _stage(name)
+        for field in ('calls', 'seconds', 'rows', 'decimal_ops'):
+            stage[field] += other[field]
+        if other['peak_memory_mb'] is not None and (
+            stage['peak_memory_mb'] is None or other['peak_memory_mb'] > stage['peak_memory_mb']
+        ):
+            stage['peak_memory_mb'] = other['peak_memory_mb']
+
+def report():
+    """
+    측정 결과를 보고서 dict로 만듭니다. 단계별 시간과 최대 메모리는 하위 단계를 포함하며, 소요 시간이 긴 순으로 정렬합니다.
+    """
+    stages = []
+    for name, stage in sorted(_stats.items(), key=lambda item: item[1]['seconds'], reverse=True):
+        stages.append({
+            'stage': name,
+            'calls': stage['calls'],
+            'seconds': round(stage['seconds'], 6),
+            'mean_ms': round(stage['seconds'] / stage['calls'] * 1000, 6) if stage['calls'] else 0,
+            'rows': stage['rows'],
+            'decimal_ops': stage['decimal_ops'],
+            'peak_memory_mb': round(stage['peak_memory_mb'], 1) if stage['peak_memory_mb'] is not None else None,
+        })
+    adjustment = sys.modules.get('adjustment')
+    peak_memory = _peak_memory_mb()
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'argv': sys.argv,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'wall_seconds': round(time.perf_counter() - _started, 6) if _started is not None else None,
+        'peak_memory_mb': round(peak_memory, 1) if peak_memory is not None else None,
+        'calendar_cache': adjustment.calendar_cache_info() if adjustment is not None else None,
+        'stages': stages,
+    }
+
+def write_report(path):
+    """
+    보고서를 JSON 파일로 기록합니다.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report(), f, ensure_ascii=False, indent=2)
+
+def _write_report_at_exit():
+    if _report_path:
+        write_report(_report_path)
@@ -0,0 +1,146 @@
+"""
+정산 결과(회차별 잔여월요금, 잔여연체금액, 결제일)로 연체 구간(aging)과 포트폴리오 요약을 집계하는 모듈입니다.
+
+집계는 연체 회차만 추린 뒤 그룹 단위 배열 연산으로 수행하므로 수십만 회차도 빠르게 처리합니다.
+배치 처리에서는 샤드마다 delinquent_installments()로 연체 회차만 모아 두었다가 마지막에 한 번 집계합니다.
+"""
+import numpy as np
+import pandas as pd
+
+# 연체 구간: 연체일수가 구간 상한 이하인 첫 번째 구간 (90일 초과는 '90+')
+AGING_BUCKET_LIMITS = [30, 60, 90]
+AGING_BUCKETS = ['1-30', '31-60', '61-90', '90+']
+# 연체 회차 DataFrame의 컬럼 구성
+DELINQUENT_COLUMNS = ['contract_id', '회차', '결제일', '잔여월요금', '잔여연체금액', '연체일수', '연체구간']
+# 집계 결과의 금액 컬럼
+AMOUNT_COLUMNS = ['잔여월요금', '잔여연체금액', '연체총액']
+
+def delinquent_installments(results, as_of):
+    """
+    정산 결과에서 as_of 기준으로 결제일이 지났는데 잔여 금액이 남은 회차만 추립니다.
+    연체일수는 결제일로부터 경과한 일수(1일 이상)입니다.
+
+    Args:
+      results: 'contract_id'(없으면 단일 계약으로 간주), '회차', '결제일', '잔여월요금', '잔여연체금액'
+               컬럼을 가진 정산 결과 DataFrame (배치 결과 또는 allocate_collections()의 결과)
+      as_of: 연체일수 계산 기준 시점
+
+    Returns:
+      DELINQUENT_COLUMNS 컬럼을 가진 DataFrame
+    """
+    if '회차' not in results.columns: # allocate_collections()의 결과는 회차가 인덱스
+        results = results.reset_index()
+    due_dates = results['결제일'].to_numpy(dtype='datetime64[us]')
+    remaining_principal = results['잔여월요금'].to_numpy(dtype=np.float64)
+    remaining_overdue = results['잔여연체금액'].to_numpy(dtype=np.float64)
+
+    days_past_due = (np.datetime64(as_of, 'us') - due_dates) // np.timedelta64(1, 'D')
+    delinquent = (days_past_due >= 1) & ((remaining_principal > 0) | (remaining_overdue > 0))
+    days_past_due = days_past_due[delinquent].astype(np.int64)
+
+    contract_ids = results['contract_id'].to_numpy()[delinquent] if 'contract_id' in results.columns else 0
+    return pd.DataFrame({
+        'contract_id': contract_ids,
+        '회차': results['회차'].to_numpy()[delinquent],
+        '결제일': due_dates[delinquent],
+        '잔여월요금': remaining_principal[delinquent],
+        '잔여연체금액': remaining_overdue[delinquent],
+        '연체일수': days_past_due,
+        '연체구간': pd.Categorical.from_codes(
+            np.searchsorted(AGING_BUCKET_LIMITS, days_past_due, side='left'), AGING_BUCKETS
+        ),
+    })[DELINQUENT_COLUMNS]
+
+def _with_totals(delinquent):
+    return delinquent.assign(연체총액=delinquent['잔여월요금'] + delinquent['잔여연체금액'])
+
+def aging_summary(delinquent):
+    """
+    연체 구간별 회차수, 계약수, 금액 합계를 집계합니다.
+    계약수는 계약의 가장 오래된 연체 회차가 속한 구간에만 셉니다.
+
+    Returns:
+      연체 구간을 인덱스로, '회차수', '계약수' 및 AMOUNT_COLUMNS 컬럼을 가진 DataFrame ('합계' 행 포함)
+    """
+    delinquent = _with_totals(delinquent)
+    grouped = delinquent.groupby('연체구간', observed=False)
+    summary = grouped[AMOUNT_COLUMNS].sum()
+    summary.insert(0, '회차수', grouped.size())
+
+    worst = delinquent.groupby('contract_id', sort=False)['연체일수'].max()
+    worst_buckets = np.searchsorted(AGING_BUCKET_LIMITS, worst.to_numpy(), side='left')
+    summary.insert(1, '계약수', np.bincount(worst_buckets, minlength=len(AGING_BUCKETS)))
+
+    summary.index = summary.index.astype(str)
+    summary.loc['합계'] = summary.sum()
+    summary.index.name = '연체구간'
+    return summary.astype({'회차수': np.int64, '계약수': np.int64})
+
+def arrears_by(delinquent, contracts, key):
+    """
+    계약 속성(예: 'payment_type', 'fixed_payment_day')별로 연체 현황을 집계합니다.
+
+    Returns:
+      key 값을 인덱스로, '계약수', '연체계약수', '연체회차수', 연체 구간별 잔여월요금 및 AMOUNT_COLUMNS 컬럼을 가진 DataFrame
+    """
+    keys = contracts.set_index('contract_id')[key]
+    delinquent = _with_totals(delinquent)
+    delinquent[key] = delinquent['contract_id'].map(keys).to_numpy()
+
+    grouped = delinquent.groupby(key)
+    summary = pd.DataFrame({
+        '계약수': contracts.groupby(key).size(),
+        '연체계약수': grouped['contract_id'].nunique(),
+        '연체회차수': grouped.size(),
+    })
+    buckets = delinquent.pivot_table(
+        index=key, columns='연체구간', values='잔여월요금', aggfunc='sum', observed=False
+    ).reindex(columns=AGING_BUCKETS)
+    summary = summary.join(buckets).join(grouped[AMOUNT_COLUMNS].sum())
+    return summary.fillna(0).sort_index()
+
+def top_delinquents(delinquent, contracts, count=20):
+    """
+    연체총액(잔여월요금 + 잔여연체금액)이 가장 큰 계약을 count개 반환합니다.
+
+    Returns:
+      'contract_id', 계약 정보, '연체회차수', '최장연체일수', '최초연체결제일' 및 AMOUNT_COLUMNS 컬럼을 가진 DataFrame
+    """
+    grouped = _with_totals(delinquent).groupby('contract_id')
+    by_contract = grouped[AMOUNT_COLUMNS].sum()
+    by_contract.insert(0, '연체회차수', grouped.size())
+    by_contract.insert(1, '최장연체일수', grouped['연체일수'].max())
+    by_contract.insert(2, '최초연체결제일', grouped['결제일'].min())
+
+    top = by_contract.nlargest(count, '연체총액').reset_index()
+    contract_columns = [column for column in ('payment_type', 'fixed_payment_day', 'monthly_fee') if column in contracts.columns]
+    return top.merge(contracts[['contract_id'] + contract_columns], on='contract_id', how='left')[
+        ['contract_id'] + contract_columns + list(by_contract.columns)
+    ]
+
+def portfolio_summary(delinquent, contracts, top=20):
+    """
+    연체 회차로 포트폴리오 요약 표를 만듭니다.
+
+    Args:
+      delinquent: delinquent_installments()의 결과 (여러 샤드의 결과를 이어 붙인 것도 가능)
+      contracts: 'contract_id', 'payment_type', 'fixed_payment_day' 컬럼을 가진 계약 목록 DataFrame
+      top: 연체 상위 계약 수
+
+    Returns:
+      표 이름 → DataFrame dict ('연체구간별', '지불방식별', '고정결제일별', '연체상위계약')
+    """
+    return {
+        '연체구간별': aging_summary(delinquent),
+        '지불방식별': arrears_by(delinquent, contracts, 'payment_type'),
+        '고정결제일별': arrears_by(delinquent, contracts, 'fixed_payment_day'),
+        '연체상위계약': top_delinquents(delinquent, contracts, top),
+    }
+
+def export_portfolio_summary(summary, path):
+    """
+    포트폴리오 요약 표를 표마다 시트를 나누어 Excel 파일로 저장합니다.
+    """
+    with pd.ExcelWriter(path) as writer:
+        for name, table in summary.items():
+            table.to_excel(writer, sheet_name=name, index=name != '연체상위계약')
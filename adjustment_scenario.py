@@ -0,0 +1,318 @@
+"""
+기준 계약의 조건(지불 방식, 고정 결제일, 결제 기간, 월요금 등)을 바꿔 가며 결제 스케줄과 연체 금액을 비교하는 모듈입니다.
+
+scenario_grid()로 변경할 값들의 모든 조합을 계약 목록으로 만들고, evaluate_scenarios()가 이를 묶음으로 나누어
+프로세스 풀에서 generate_schedule_arrays()와 calculate_overdue_batch()로 한 번에 계산합니다.
+시나리오 0은 항상 기준 계약이며, 비교표의 차이 컬럼은 기준 계약 대비 값입니다.
+
+사용 예:
+  adjustment scenario --monthly-fee 500000 --period 36 --payment-day 25 --delivery-date 2025-03-15 --payment-type 선납 \\
+    --vary payment_type=선납,후납 --vary fixed_payment_day=1..28 --vary payment_period_months=12,24,36,48 --output 시나리오.xlsx
+"""
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from adjustment import (
+    MONEY_MODES,
+    calculate_total_payment,
+    generate_schedule_arrays,
+    money_mode,
+    money_mode_from_environment,
+    normalize_collection_data,
+    set_money_mode,
+)
+from adjustment_money import won
+from adjustment_schedule import Schedule
+from adjustment_state import advance_settlement_state, new_settlement_state, settle_states
+
+# 시나리오로 바꿀 수 있는 계약 조건 (advance_payment는 총 결제금액에만 더해지는 선수금)
+SCENARIO_FIELDS = ['monthly_fee', 'payment_period_months', 'fixed_payment_day', 'delivery_date', 'payment_type', 'advance_payment']
+# 비교표의 컬럼 구성
+SCHEDULE_SUMMARY_COLUMNS = [
+    '회차수', '약정총액', '결제총액', '일할회차수', '일할금액합계',
+    '첫결제일', '첫결제금액', '마지막결제일', '마지막결제금액', '결제기간일수', '평균회수일수',
+]
+SETTLEMENT_SUMMARY_COLUMNS = ['청구회차수', '청구금액', '수금액', '잔여월요금', '잔여연체금액']
+DIFFERENCE_COLUMNS = ['결제총액', '일할금액합계', '평균회수일수', '잔여연체금액']
+DEFAULT_CHUNK_SIZE = 250
+
+def scenario_grid(base_contract, variations):
+    """
+    기준 계약과 조건별 변경 값 목록으로 모든 조합의 시나리오 계약 목록을 만듭니다.
+
+    Args:
+      base_contract: SCENARIO_FIELDS 키를 가진 기준 계약 dict (advance_payment는 생략하면 0)
+      variations: 조건 이름 → 변경 값 리스트 dict (조건 순서대로 조합)
+
+    Returns:
+      'contract_id'(시나리오 번호, 0은 기준 계약)와 SCENARIO_FIELDS 컬럼을 가진 DataFrame
+    """
+    base = {'advance_payment': 0, **base_contract}
+    missing = [field for field in SCENARIO_FIELDS if field not in base]
+    if missing:
+        raise ValueError(f"기준 계약에 필수 항목이 없습니다: {missing}")
+    unknown = [field for field in variations if field not in SCENARIO_FIELDS]
+    if unknown:
+        raise ValueError(f"변경할 수 없는 조건입니다: {unknown} (가능한 조건: {SCENARIO_FIELDS})")
+
+    fields = list(variations)
+    rows = [{field: base[field] for field in SCENARIO_FIELDS}]
+    for values in itertools.product(*(variations[field] for field in fields)):
+        rows.append({**rows[0], **dict(zip(fields, values))})
+    scenarios = pd.DataFrame(rows, columns=SCENARIO_FIELDS)
+    scenarios.insert(0, 'contract_id', np.arange(len(scenarios)))
+    return scenarios
+
+def _generate_scenario_schedules(scenarios, errors):
+    """
+    묶음의 스케줄을 한 번에 생성합니다. 실패하면 시나리오별로 다시 생성하여 문제 시나리오만 오류로 기록합니다.
+    """
+    try:
+        return generate_schedule_arrays(scenarios)
+    except Exception:
+        pass
+
+    schedules = []
+    for position in range(len(scenarios)):
+        scenario = scenarios.iloc[[position]]
+        try:
+            schedules.append(generate_schedule_arrays(scenario))
+        except Exception as e:
+            errors[scenario['contract_id'].iloc[0]] = str(e)
+    return Schedule.concat(schedules)
+
+def _group_sums(values, offsets):
+    """
+    계약별 회차 구간(offsets)마다 values의 합계를 구합니다. 정수 배열은 정수로 합산합니다.
+    """
+    totals = np.concatenate([np.zeros(1, dtype=values.dtype), np.cumsum(values)])
+    return totals[offsets[1:]] - totals[offsets[:-1]]
+
+def summarize_schedules(schedule, scenarios):
+    """
+    시나리오별 스케줄을 회차 구간 단위 배열 연산으로 요약합니다.
+
+    Args:
+      schedule: generate_schedule_arrays()로 만든 시나리오들의 Schedule
+      scenarios: schedule의 계약 ID(시나리오 번호)를 모두 포함하는 시나리오 계약 목록 DataFrame
+
+    Returns:
+      시나리오 번호를 인덱스로, SCHEDULE_SUMMARY_COLUMNS 컬럼을 가진 DataFrame
+    """
+    scenarios = scenarios.set_index('contract_id').loc[schedule.contract_ids]
+    offsets = schedule.offsets
+    counts = np.diff(offsets)
+    starts, ends = offsets[:-1], offsets[1:] - 1
+    row_scenario = np.repeat(np.arange(schedule.contract_count), counts)
+    amounts = schedule.amounts
+    monthly_fees = scenarios['monthly_fee'].to_numpy()
+    advance_payments = scenarios['advance_payment'].to_numpy()
+
+    # 일할 회차 여부는 금액 비교로 추정하지 않고 스케줄 생성 시 회차 종류로 정한 값 사용
+    prorated = schedule.prorated
+    if prorated is None:
+        raise ValueError("일할 회차 정보가 없는 스케줄입니다. generate_schedule_arrays()로 만든 스케줄이 필요합니다.")
+    delivery_dates = pd.to_datetime(scenarios['delivery_date']).to_numpy().astype('datetime64[D]')
+    # 출고일로부터 회차별 결제일까지의 일수를 금액으로 가중 평균 (현금 회수 시점 비교용)
+    days_from_delivery = (schedule.due_dates.astype('datetime64[D]') - delivery_dates[row_scenario]).astype(np.int64)
+    totals = _group_sums(amounts, offsets)
+    weighted_days = _group_sums(amounts * days_from_delivery.astype(np.float64), offsets)
+
+    return pd.DataFrame({
+        '회차수': counts,
+        '약정총액': calculate_total_payment(monthly_fees, scenarios['payment_period_months'].to_numpy(), advance_payments),
+        '결제총액': totals + advance_payments,
+        '일할회차수': _group_sums(prorated.astype(np.int64), offsets),
+        '일할금액합계': _group_sums(np.where(prorated, amounts, 0), offsets),
+        '첫결제일': schedule.due_dates[starts],
+        '첫결제금액': amounts[starts],
+        '마지막결제일': schedule.due_dates[ends],
+        '마지막결제금액': amounts[ends],
+        '결제기간일수': (schedule.due_dates[ends] - schedule.due_dates[starts]) // np.timedelta64(1, 'D'),
+        '평균회수일수': np.round(np.divide(weighted_days, totals, out=np.zeros(len(totals)), where=totals != 0), 2),
+    }, index=pd.Index(schedule.contract_ids, name='contract_id'))
+
+def settle_scenarios(schedule, scenarios, collection_dates, collection_amounts, as_of):
+    """
+    모든 시나리오에 같은 수금 내역을 반영하고 as_of 기준 청구/미납/연체 금액을 요약합니다.
+    수금 내역이 비어 있으면 한 번도 납부하지 않았을 때의 연체 금액이 됩니다.
+
+    Args:
+      schedule: 시나리오들의 Schedule
+      scenarios: 시나리오 계약 목록 DataFrame
+      collection_dates: 결제일 순으로 정렬된 수금 시점 배열
+      collection_amounts: 수금 금액 리스트
+      as_of: 연체 계산 기준 시점
+
+    Returns:
+      시나리오 번호를 인덱스로, SETTLEMENT_SUMMARY_COLUMNS 컬럼을 가진 DataFrame
+    """
+    monthly_fees = scenarios.set_index('contract_id')['monthly_fee']
+    states = []
+    for group, contract_id in enumerate(schedule.contract_ids.tolist()):
+        state = new_settlement_state(contract_id, schedule.take([group]), monthly_fees[contract_id])
+        advance_settlement_state(state, collection_dates, collection_amounts)
+        states.append(state)
+    allocations = settle_states(states, [as_of] * len(states))
+
+    as_of = np.datetime64(as_of, 'us')
+    rows = []
+    for state, allocation in zip(states, allocations):
+        billed = state['due_dates'] <= as_of
+        rows.append({
+            '청구회차수': int(billed.sum()),
+            '청구금액': sum(amount for amount, is_billed in zip(state['amounts'], billed) if is_billed),
+            '수금액': sum(state['collection_amounts']),
+            '잔여월요금': sum(remaining for remaining, is_billed in zip(allocation['잔여월요금'], billed) if is_billed),
+            '잔여연체금액': sum(allocation['잔여연체금액']),
+        })
+    return pd.DataFrame(rows, columns=SETTLEMENT_SUMMARY_COLUMNS, index=pd.Index(schedule.contract_ids, name='contract_id'))
+
+def evaluate_chunk(scenarios, collection_dates=None, collection_amounts=None, as_of=None, mode=None):
+    """
+    시나리오 묶음 하나를 계산합니다 (작업 프로세스에서 실행).
+    mode를 주면 작업 프로세스의 금액 계산 방식을 부모 프로세스와 같게 설정합니다.
+
+    Returns:
+      시나리오 번호를 인덱스로 한 요약 DataFrame과 시나리오 번호 → 오류 메시지 dict의 튜플
+    """
+    if mode is not None:
+        set_money_mode(mode)
+    errors = {}
+    schedule = _generate_scenario_schedules(scenarios, errors)
+    summary = summarize_schedules(schedule, scenarios)
+    if as_of is not None:
+        if collection_dates is None:
+            collection_dates, collection_amounts = np.empty(0, dtype='datetime64[us]'), []
+        summary = summary.join(settle_scenarios(schedule, scenarios, collection_dates, collection_amounts, as_of))
+    return summary, errors
+
+def evaluate_scenarios(scenarios, collections=None, as_of=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    시나리오 계약 목록을 묶음으로 나누어 프로세스 풀에서 계산하고 비교표를 만듭니다.
+
+    Args:
+      scenarios: scenario_grid()의 결과 (시나리오 0이 기준 계약)
+      collections: 모든 시나리오에 똑같이 반영할 '결제일', '결제금액' 컬럼의 수금 내역 DataFrame (선택)
+      as_of: 청구/연체 금액 계산 기준 시점 (지정하지 않으면 스케줄 요약만 계산)
+      workers: 프로세스 수 (1이면 현재 프로세스에서 처리)
+      chunk_size: 묶음당 시나리오 수
+
+    Returns:
+      시나리오 번호를 인덱스로, 시나리오 조건, 요약 컬럼, 기준 계약 대비 '<컬럼>차이' 컬럼과
+      '오류' 컬럼(계산하지 못한 시나리오의 오류 메시지)을 가진 DataFrame
+    """
+    collection_dates = collection_amounts = None
+    if collections is not None:
+        collections = collections.sort_values(by=['결제일'], kind='stable')
+        collection_dates = collections['결제일'].to_numpy(dtype='datetime64[us]')
+        collection_amounts = collections['결제금액'].tolist()
+
+    chunks = [scenarios.iloc[start:start + chunk_size] for start in range(0, len(scenarios), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        results = [evaluate_chunk(chunk, collection_dates, collection_amounts, as_of) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            futures = [
+                executor.submit(evaluate_chunk, chunk, collection_dates, collection_amounts, as_of, money_mode())
+                for chunk in chunks
+            ]
+            results = [future.result() for future in futures]
+
+    errors = {}
+    for _, chunk_errors in results:
+        errors.update(chunk_errors)
+    summary = pd.concat([chunk_summary for chunk_summary, _ in results])
+    table = scenarios.set_index('contract_id').join(summary)
+    table.index.name = '시나리오'
+
+    # 기준 계약(시나리오 0) 대비 차이
+    for column in DIFFERENCE_COLUMNS:
+        if column in table.columns and 0 in summary.index:
+            table[f'{column}차이'] = table[column] - table.loc[0, column]
+    table['오류'] = table.index.map(errors)
+    return table
+
+def run_scenarios(base_contract, variations, collections=None, as_of=None, workers=1, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    scenario_grid()로 시나리오를 만들어 evaluate_scenarios()로 비교표를 계산합니다.
+    """
+    return evaluate_scenarios(scenario_grid(base_contract, variations), collections, as_of, workers, chunk_size)
+
+def parse_variation(text):
+    """
+    '조건=값1,값2,...' 또는 '조건=시작..끝'(정수 범위, 끝 포함) 형식의 명령행 인자를 (조건, 값 리스트)로 변환합니다.
+    """
+    field, _, values = text.partition('=')
+    field = field.strip()
+    if field not in SCENARIO_FIELDS or not values:
+        raise argparse.ArgumentTypeError(f"'조건=값1,값2' 형식이 아니거나 변경할 수 없는 조건입니다: {text}")
+    if '..' in values:
+        start, _, stop = values.partition('..')
+        return field, list(range(int(start), int(stop) + 1))
+    values = [value.strip() for value in values.split(',')]
+    if field in ('payment_period_months', 'fixed_payment_day'):
+        return field, [int(value) for value in values]
+    if field in ('monthly_fee', 'advance_payment'):
+        return field, [won(value) if money_mode() == 'exact' else float(value) for value in values]
+    return field, values
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='adjustment scenario', description='기준 계약의 조건을 바꿔 가며 결제 스케줄과 연체 금액을 비교합니다.')
+    parser.add_argument('--monthly-fee', required=True, help='기준 월요금')
+    parser.add_argument('--period', type=int, required=True, help='기준 결제 기간 (개월)')
+    parser.add_argument('--payment-day', type=int, required=True, help='기준 고정 결제일 (1-31)')
+    parser.add_argument('--delivery-date', required=True, help='기준 출고일 (YYYY-MM-DD)')
+    parser.add_argument('--payment-type', required=True, choices=['선납', '후납'], help='기준 지불 방식')
+    parser.add_argument('--advance-payment', default='0', help='선수금')
+    parser.add_argument('--vary', action='append', default=[], help="변경할 조건 (예: payment_type=선납,후납, fixed_payment_day=1..28). 여러 번 지정 가능")
+    parser.add_argument('--collections', help='모든 시나리오에 반영할 수금 내역 파일 (결제일, 결제금액)')
+    parser.add_argument('--as-of', help='청구/연체 금액 계산 기준 시점 (YYYY-MM-DD). 지정하지 않으면 스케줄만 비교')
+    parser.add_argument('--output', help='비교표 파일 경로 (csv, xlsx)')
+    parser.add_argument('--money-mode', choices=MONEY_MODES, help='금액 계산 방식 (exact: 원 단위 정수 계산, 기본값: decimal 또는 환경 변수 ADJUSTMENT_MONEY_MODE)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='프로세스 수')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='묶음당 시나리오 수')
+    args = parser.parse_args(argv)
+
+    try:
+        set_money_mode(args.money_mode or money_mode_from_environment())
+        variations = dict(parse_variation(text) for text in args.vary)
+    except (argparse.ArgumentTypeError, ValueError) as e:
+        parser.error(str(e))
+    amount = won if money_mode() == 'exact' else float
+    base_contract = {
+        'monthly_fee': amount(args.monthly_fee),
+        'payment_period_months': args.period,
+        'fixed_payment_day': args.payment_day,
+        'delivery_date': args.delivery_date,
+        'payment_type': args.payment_type,
+        'advance_payment': amount(args.advance_payment),
+    }
+    collections = None
+    if args.collections:
+        from adjustment_batch import read_table
+
+        collections = normalize_collection_data(read_table(args.collections))
+    as_of = datetime.fromisoformat(args.as_of) if args.as_of else None
+
+    table = run_scenarios(base_contract, variations, collections, as_of, args.workers, args.chunk_size)
+    print(f"시나리오 {len(table)}건을 계산했습니다 (오류 {int(table['오류'].notna().sum())}건).")
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(table.head(20).to_string())
+    if args.output:
+        if args.output.lower().endswith('.xlsx'):
+            table.to_excel(args.output)
+        else:
+            table.to_csv(args.output, encoding='utf-8-sig')
+        print(f"비교표: '{args.output}'")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
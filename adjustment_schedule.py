@@ -0,0 +1,199 @@
+"""
+결제 스케줄을 타입이 고정된 배열로 보관하는 컨테이너 모듈입니다.
+
+(결제일, 금액) 튜플 리스트나 object 컬럼 DataFrame 대신 결제일은 datetime64[us],
+금액은 원 단위 int64 배열로 보관하여 계약 수가 많아도 메모리 사용량이 작고 배열 연산 경로를 유지합니다.
+pandas(DataFrame)와 pyarrow(Table)는 변환할 때만 임포트합니다.
+"""
+import numpy as np
+
+def _won_amounts(amounts):
+    """
+    금액 배열을 원 단위 int64로 변환합니다. 원 미만 금액이 있으면 값을 보존하도록 float64로 둡니다.
+    """
+    amounts = np.asarray(amounts)
+    if amounts.dtype.kind in 'iub':
+        return amounts.astype(np.int64)
+    values = amounts.astype(np.float64)
+    if np.all(np.isfinite(values) & (values == np.round(values))):
+        return values.astype(np.int64)
+    return values
+
+def _run_offsets(contract_ids):
+    """
+    계약 ID가 바뀌는 위치로 계약별 구간 경계와 계약 ID 목록을 구합니다.
+    같은 계약의 회차가 떨어져 있으면 ValueError를 발생시킵니다.
+    """
+    contract_ids = np.asarray(contract_ids)
+    if len(contract_ids) == 0:
+        return contract_ids[:0], np.zeros(1, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, contract_ids[1:] != contract_ids[:-1]])
+    unique_ids = contract_ids[starts]
+    if len(set(unique_ids.tolist())) != len(unique_ids):
+        raise ValueError("결제 스케줄이 계약 순으로 묶여 있지 않습니다.")
+    return unique_ids, np.append(starts, len(contract_ids)).astype(np.int64)
+
+class Schedule:
+    """
+    여러 계약의 결제 스케줄을 계약 순, 회차 순으로 이어 붙인 배열(struct-of-arrays)로 보관합니다.
+    g번째 계약의 회차는 offsets[g]:offsets[g + 1] 구간이며, 회차 번호는 구간 안의 위치로 계산합니다.
+
+    Attributes:
+      contract_ids: 계약 ID 배열 (계약 수)
+      offsets: 계약별 회차 구간 경계 (계약 수 + 1, int64)
+      due_dates: 회차별 결제일 (datetime64[us])
+      amounts: 회차별 청구 금액 (원 단위 int64, 원 미만 금액이 있으면 float64)
+      prorated: 회차별 일할 회차 여부 (bool, generate_schedule_arrays()로 만든 경우에만 있고 그 외에는 None)
+    """
+    __slots__ = ('contract_ids', 'offsets', 'due_dates', 'amounts', 'prorated')
+
+    def __init__(self, contract_ids, offsets, due_dates, amounts, prorated=None):
+        self.contract_ids = np.asarray(contract_ids)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.due_dates = np.asarray(due_dates, dtype='datetime64[us]')
+        self.amounts = _won_amounts(amounts)
+        self.prorated = None if prorated is None else np.asarray(prorated, dtype=bool)
+
+    def __len__(self):
+        return len(self.due_dates)
+
+    @property
+    def contract_count(self):
+        return len(self.contract_ids)
+
+    @property
+    def nbytes(self):
+        """
+        배열이 차지하는 메모리 크기(바이트)입니다.
+        """
+        arrays = (self.contract_ids, self.offsets, self.due_dates, self.amounts, self.prorated)
+        return sum(array.nbytes for array in arrays if array is not None)
+
+    def rows(self, group):
+        """
+        g번째 계약의 회차 구간(slice)을 반환합니다.
+        """
+        return slice(self.offsets[group], self.offsets[group + 1])
+
+    def row_contract_ids(self):
+        """
+        회차별 계약 ID 배열을 반환합니다.
+        """
+        return np.repeat(self.contract_ids, np.diff(self.offsets))
+
+    def installment_numbers(self):
+        """
+        회차별 회차 번호(계약마다 1부터 시작) 배열을 반환합니다.
+        """
+        counts = np.diff(self.offsets)
+        return np.arange(len(self)) - np.repeat(self.offsets[:-1], counts) + 1
+
+    def take(self, groups):
+        """
+        주어진 위치의 계약들만 담은 Schedule을 반환합니다.
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        starts = self.offsets[groups]
+        counts = self.offsets[groups + 1] - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        return Schedule(
+            self.contract_ids[groups],
+            np.concatenate([[0], np.cumsum(counts)]),
+            self.due_dates[positions],
+            self.amounts[positions],
+            None if self.prorated is None else self.prorated[positions],
+        )
+
+    def to_tuples(self, group=0):
+        """
+        g번째 계약의 스케줄을 generate_*_schedule()과 같은 (payment_date, payment_amount) 튜플 리스트로 반환합니다.
+        """
+        rows = self.rows(group)
+        return list(zip(self.due_dates[rows].tolist(), self.amounts[rows].tolist()))
+
+    @classmethod
+    def from_tuples(cls, schedule, contract_id=0):
+        """
+        generate_*_schedule()의 (payment_date, payment_amount) 튜플 리스트로 단일 계약 Schedule을 만듭니다.
+        """
+        return cls(
+            np.array([contract_id]),
+            [0, len(schedule)],
+            np.array([payment_date for payment_date, _ in schedule], dtype='datetime64[us]'),
+            [amount for _, amount in schedule],
+        )
+
+    @classmethod
+    def concat(cls, schedules):
+        """
+        여러 Schedule을 계약 순서대로 이어 붙입니다.
+        """
+        schedules = list(schedules)
+        if not schedules:
+            return cls(
+                np.empty(0, dtype=np.int64), [0], np.empty(0, dtype='datetime64[us]'), np.empty(0, dtype=np.int64),
+                np.empty(0, dtype=bool),
+            )
+        lengths = np.cumsum([0] + [len(schedule) for schedule in schedules[:-1]])
+        # 일할 회차 여부는 모든 Schedule에 있을 때만 이어 붙임
+        prorated = None
+        if all(schedule.prorated is not None for schedule in schedules):
+            prorated = np.concatenate([schedule.prorated for schedule in schedules])
+        return cls(
+            np.concatenate([schedule.contract_ids for schedule in schedules]),
+            np.concatenate([[0]] + [schedule.offsets[1:] + length for schedule, length in zip(schedules, lengths)]),
+            np.concatenate([schedule.due_dates for schedule in schedules]),
+            np.concatenate([schedule.amounts for schedule in schedules]),
+            prorated,
+        )
+
+    def to_frame(self):
+        """
+        generate_schedules()와 같은 'contract_id', '회차', '결제일', '월요금' 컬럼의 long format DataFrame으로 변환합니다.
+        """
+        import pandas as pd # DataFrame으로 변환할 때만 필요
+
+        return pd.DataFrame({
+            'contract_id': self.row_contract_ids(),
+            '회차': self.installment_numbers(),
+            '결제일': self.due_dates,
+            '월요금': self.amounts,
+        })
+
+    @classmethod
+    def from_frame(cls, df, contract_column='contract_id'):
+        """
+        결제 스케줄 DataFrame으로 Schedule을 만듭니다.
+        contract_column이 없으면 build_schedule_dataframe()처럼 단일 계약의 스케줄로 봅니다.
+        """
+        due_dates = df['결제일'].to_numpy(dtype='datetime64[us]')
+        if contract_column not in df.columns:
+            return cls(np.array([0]), [0, len(df)], due_dates, df['월요금'].to_numpy())
+        contract_ids, offsets = _run_offsets(df[contract_column].to_numpy())
+        return cls(contract_ids, offsets, due_dates, df['월요금'].to_numpy())
+
+    def to_arrow(self):
+        """
+        to_frame()과 같은 컬럼 구성의 pyarrow Table로 변환합니다.
+        """
+        import pyarrow as pa # Arrow로 변환할 때만 필요
+
+        return pa.table({
+            'contract_id': self.row_contract_ids(),
+            '회차': self.installment_numbers(),
+            '결제일': pa.array(self.due_dates, type=pa.timestamp('us')),
+            '월요금': self.amounts,
+        })
+
+    @classmethod
+    def from_arrow(cls, table, contract_column='contract_id'):
+        """
+        to_arrow()와 같은 컬럼 구성의 pyarrow Table로 Schedule을 만듭니다.
+        """
+        contract_ids, offsets = _run_offsets(table.column(contract_column).to_numpy())
+        return cls(
+            contract_ids,
+            offsets,
+            table.column('결제일').cast('timestamp[us]').to_numpy(),
+            table.column('월요금').to_numpy(),
+        )
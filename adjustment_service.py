@@ -0,0 +1,654 @@
+"""
+계약 목록과 수금 내역을 메모리에 올려 두고 정산 요청에 바로 응답하는 로컬 정산 서비스 모듈입니다.
+
+자주 조회되는 계약의 결제 스케줄과 수금 반영 상태는 LRU 캐시에 보관하며,
+짧은 시간 안에 들어온 요청은 하나의 묶음으로 모아 스케줄 생성과 연체 계산을 배열 단위로 한 번에 수행합니다.
+HTTP(JSON) 또는 Unix 소켓으로 제공하며, 지연 시간과 처리량을 측정하는 부하 생성기를 함께 제공합니다.
+
+사용 예:
+  adjustment serve --contracts contracts.csv --collections collections.parquet --port 8750
+  adjustment loadgen --port 8750 --contracts contracts.csv --requests 10000 --concurrency 64
+
+엔드포인트:
+  GET  /health, GET /stats
+  POST /schedule     {"contract_id": ...} 또는 계약 정보(CONTRACT_COLUMNS)로 결제 스케줄 생성
+  POST /settle       {"contract_id": ..., "as_of": "YYYY-MM-DDTHH:MM:SS"} 수금 및 연체를 반영한 결제 스케줄
+  POST /quote        {"contract_id": ..., "as_of": ...} 현재 납부해야 할 금액 (청구 회차의 잔여월요금 + 잔여연체금액)
+  POST /collections  {"contract_id": ..., "collections": [{"결제일": ..., "결제금액": ...}]} 새 수금 내역 반영
+"""
+import argparse
+import asyncio
+import copy
+import json
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import getcontext, setcontext
+
+import numpy as np
+import pandas as pd
+
+from adjustment import STATE_COLUMNS, generate_schedule_arrays, money_mode, money_mode_from_environment, set_money_mode
+from adjustment_batch import CONTRACT_COLUMNS, read_collections, read_contracts
+from adjustment_io import build_collection_index, collection_positions
+from adjustment_money import to_won
+from adjustment_schedule import Schedule
+from adjustment_state import advance_settlement_state, new_settlement_state, settle_states
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8750
+# 캐시에 보관할 계약 수
+DEFAULT_CACHE_SIZE = 10_000
+# 요청을 묶음으로 모으는 최대 대기 시간(초)과 묶음당 최대 요청 수
+DEFAULT_BATCH_WINDOW = 0.002
+DEFAULT_MAX_BATCH = 512
+
+class ServiceError(Exception):
+    """
+    요청을 처리할 수 없을 때 HTTP 상태 코드와 함께 발생시키는 예외입니다.
+    """
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def _parse_datetime(value, default=None):
+    if value is None:
+        if default is None:
+            raise ServiceError(400, "날짜가 필요합니다.")
+        return default
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ServiceError(400, f"날짜 형식이 올바르지 않습니다: {value}")
+
+def _parse_amounts(values):
+    """
+    요청의 결제금액들을 normalize_collection_data()와 같은 규칙으로 숫자로 변환합니다 ('exact' 방식은 원 단위 정수).
+    숫자가 아니거나 유한하지 않은 금액이 있으면 ServiceError(400)를 발생시킵니다.
+    """
+    amounts = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce')
+    invalid = [value for value, amount in zip(values, amounts) if isinstance(value, bool) or not np.isfinite(amount)]
+    if invalid:
+        raise ServiceError(400, f"결제금액 형식이 올바르지 않습니다: {invalid[0]!r}")
+    if money_mode() == 'exact':
+        return to_won(amounts.to_numpy()).tolist()
+    return amounts.tolist()
+
+def _to_json_value(value):
+    """
+    numpy 스칼라/datetime64 값을 JSON으로 직렬화할 수 있는 값으로 변환합니다. NaT는 None이 됩니다.
+    """
+    if isinstance(value, np.datetime64):
+        return None if np.isnat(value) else str(value.astype('datetime64[s]'))
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _schedule_rows(schedule, group=0):
+    rows = schedule.rows(group)
+    return [
+        {'회차': number, '결제일': _to_json_value(due_date), '월요금': _to_json_value(amount)}
+        for number, (due_date, amount) in enumerate(zip(schedule.due_dates[rows], schedule.amounts[rows]), start=1)
+    ]
+
+class SettlementService:
+    """
+    계약 목록과 수금 내역으로 정산 요청을 처리합니다.
+
+    계약별 정산 상태(결제 스케줄과 수금 반영 결과)는 처음 요청될 때 만들어 LRU 캐시에 보관하고,
+    캐시에서 밀려난 계약은 다음 요청 때 다시 만듭니다. /collections로 받은 수금 내역은 메모리에만 보관하며
+    캐시에서 밀려난 뒤에도 상태를 다시 만들 때 함께 반영됩니다.
+    execute()는 한 스레드에서만 호출해야 합니다 (비동기 서버는 전용 작업 스레드 하나에서 호출).
+    """
+    def __init__(self, contracts, collections=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.contracts = contracts.reset_index(drop=True)
+        self.collection_index = build_collection_index(
+            collections if collections is not None else pd.DataFrame(columns=['contract_id', '결제일', '결제금액'])
+        )
+        self.cache_size = cache_size
+        self._positions = {contract_id: i for i, contract_id in enumerate(self.contracts['contract_id'].tolist())}
+        self._states = OrderedDict()
+        self._posted = {} # 계약 ID → 서비스 실행 중 받은 수금 내역 (결제일 배열, 결제금액 리스트)
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'batches': 0, 'requests': 0, 'max_batch': 0}
+
+    def contract_key(self, value):
+        """
+        요청의 계약 ID(JSON 숫자 또는 문자열)를 계약 목록의 계약 ID로 변환합니다.
+        """
+        if isinstance(value, (list, dict)):
+            raise ServiceError(400, f"계약 ID는 숫자 또는 문자열이어야 합니다: {value}")
+        if value in self._positions:
+            return value
+        for convert in (int, str):
+            try:
+                converted = convert(value)
+            except (TypeError, ValueError):
+                continue
+            if converted in self._positions:
+                return converted
+        raise ServiceError(404, f"등록되지 않은 계약입니다: {value}")
+
+    def _generate(self, contracts):
+        """
+        계약들의 결제 스케줄을 한 번에 생성합니다. 실패하면 계약마다 생성하여 오류가 난 계약만 제외합니다.
+
+        Returns:
+          (Schedule, 계약 ID → 오류 메시지 dict) 튜플
+        """
+        try:
+            return generate_schedule_arrays(contracts), {}
+        except Exception:
+            schedules = []
+            errors = {}
+            for i in range(len(contracts)):
+                contract = contracts.iloc[i:i + 1]
+                try:
+                    schedules.append(generate_schedule_arrays(contract))
+                except Exception as e:
+                    errors[contract['contract_id'].iloc[0]] = str(e)
+            return Schedule.concat(schedules), errors
+
+    def states(self, contract_ids):
+        """
+        계약들의 정산 상태를 반환합니다. 캐시에 없는 계약은 스케줄을 한 번에 생성하여 상태를 만듭니다.
+
+        Returns:
+          계약 ID → 정산 상태 dict, 계약 ID → 오류 메시지 dict 튜플
+        """
+        states = {}
+        missing = []
+        for contract_id in dict.fromkeys(contract_ids):
+            state = self._states.get(contract_id)
+            if state is None:
+                missing.append(contract_id)
+                continue
+            self._states.move_to_end(contract_id)
+            states[contract_id] = state
+        self.stats['hits'] += len(states)
+        self.stats['misses'] += len(missing)
+        if not missing:
+            return states, {}
+
+        contracts = self.contracts.iloc[[self._positions[contract_id] for contract_id in missing]]
+        schedule, errors = self._generate(contracts)
+        monthly_fees = dict(zip(contracts['contract_id'], contracts['monthly_fee']))
+        for group, contract_id in enumerate(schedule.contract_ids.tolist()):
+            # 한 계약의 상태를 만들다 실패해도 같은 묶음의 다른 계약에는 영향을 주지 않음
+            try:
+                state = new_settlement_state(contract_id, schedule.take([group]), monthly_fees[contract_id])
+                positions = collection_positions(self.collection_index, contract_id)
+                advance_settlement_state(
+                    state, self.collection_index['dates'][positions], self.collection_index['amounts'][positions].tolist()
+                )
+                if contract_id in self._posted:
+                    advance_settlement_state(state, *self._posted[contract_id])
+            except Exception as e:
+                errors[contract_id] = str(e)
+                continue
+            states[contract_id] = state
+            self._cache(contract_id, state)
+        return states, errors
+
+    def _cache(self, contract_id, state):
+        self._states[contract_id] = state
+        self._states.move_to_end(contract_id)
+        while len(self._states) > self.cache_size:
+            self._states.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def warm(self, contract_ids):
+        """
+        계약들의 정산 상태를 미리 만들어 캐시에 올립니다 (캐시 크기를 넘는 만큼은 앞의 계약부터 밀려남).
+        """
+        contract_ids = list(contract_ids)
+        for start in range(0, len(contract_ids), DEFAULT_MAX_BATCH):
+            self.states(contract_ids[start:start + DEFAULT_MAX_BATCH])
+
+    def add_collections(self, contract_id, rows):
+        """
+        계약에 새 수금 내역을 반영합니다.
+
+        Args:
+          contract_id: 계약 ID
+          rows: '결제일', '결제금액' 키를 가진 dict 리스트
+
+        Returns:
+          반영한 수금 건수
+        """
+        try:
+            rows = sorted(((_parse_datetime(row['결제일']), row['결제금액']) for row in rows), key=lambda row: row[0])
+        except (KeyError, TypeError):
+            raise ServiceError(400, "수금 내역에는 '결제일', '결제금액'이 필요합니다.")
+        dates = np.array([collection_date for collection_date, _ in rows], dtype='datetime64[us]')
+        amounts = _parse_amounts([amount for _, amount in rows])
+
+        # 캐시된 상태는 복사본에 먼저 반영하고, 성공한 경우에만 캐시와 수금 내역을 바꿈
+        state = self._states.get(contract_id)
+        if state is not None:
+            state = copy.deepcopy(state)
+            advance_settlement_state(state, dates, amounts)
+
+        # 서비스 실행 중 받은 전체 수금 내역 보관 (캐시에서 밀려난 상태를 다시 만들 때 사용)
+        posted_dates, posted_amounts = self._posted.get(contract_id, (np.empty(0, dtype='datetime64[us]'), []))
+        combined_dates = np.concatenate([posted_dates, dates])
+        order = np.argsort(combined_dates, kind='stable')
+        combined_amounts = posted_amounts + amounts
+        self._posted[contract_id] = (combined_dates[order], [combined_amounts[i] for i in order])
+        if state is not None:
+            self._states[contract_id] = state
+        return len(rows)
+
+    def execute(self, requests):
+        """
+        요청 묶음을 처리합니다. 조회 요청(schedule/settle/quote)은 연속된 것끼리 모아 한 번에 계산하고,
+        수금 반영(collections)은 도착 순서대로 처리하므로 결과는 요청을 하나씩 처리한 것과 같습니다.
+
+        Args:
+          requests: (operation, payload) 튜플 리스트
+
+        Returns:
+          요청별 (HTTP 상태 코드, 응답 dict) 튜플 리스트
+        """
+        self.stats['batches'] += 1
+        self.stats['requests'] += len(requests)
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(requests))
+
+        responses = [None] * len(requests)
+        pending = []
+        for position, (operation, payload) in enumerate(requests):
+            if operation == 'collections':
+                self._execute_reads(requests, pending, responses)
+                pending = []
+                responses[position] = self._respond(self._execute_collections, payload)
+            else:
+                pending.append(position)
+        self._execute_reads(requests, pending, responses)
+        return responses
+
+    def _respond(self, handler, *args):
+        try:
+            return 200, handler(*args)
+        except ServiceError as e:
+            return e.status, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    def _execute_collections(self, payload):
+        contract_id = self.contract_key(payload.get('contract_id'))
+        count = self.add_collections(contract_id, payload.get('collections') or [])
+        return {'contract_id': _to_json_value(contract_id), 'collections': count}
+
+    def _execute_reads(self, requests, positions, responses):
+        if not positions:
+            return
+        now = datetime.now()
+        parsed = {} # 요청 위치 → (operation, 계약 ID 또는 계약 정보, as_of)
+        for position in positions:
+            operation, payload = requests[position]
+            try:
+                if operation not in ('schedule', 'settle', 'quote'):
+                    raise ServiceError(404, f"지원하지 않는 요청입니다: {operation}")
+                if operation == 'schedule' and 'contract_id' not in payload:
+                    parsed[position] = (operation, payload, None)
+                    continue
+                contract_id = self.contract_key(payload.get('contract_id'))
+                parsed[position] = (operation, contract_id, _parse_datetime(payload.get('as_of'), now))
+            except ServiceError as e:
+                responses[position] = (e.status, {'error': str(e)})
+            except Exception as e:
+                responses[position] = (500, {'error': str(e)})
+
+        adhoc = [position for position, (_, target, _) in parsed.items() if isinstance(target, dict)]
+        if adhoc:
+            self._execute_adhoc_schedules(requests, adhoc, responses)
+        registered = [position for position in parsed if position not in adhoc]
+        if not registered:
+            return
+
+        states, errors = self.states([parsed[position][1] for position in registered])
+        settle_positions = []
+        for position in registered:
+            operation, contract_id, _ = parsed[position]
+            if contract_id in errors:
+                responses[position] = (422, {'error': errors[contract_id]})
+            elif operation == 'schedule':
+                state = states[contract_id]
+                schedule = Schedule([contract_id], [0, len(state['amounts'])], state['due_dates'], state['amounts'])
+                responses[position] = (200, {'contract_id': _to_json_value(contract_id), 'schedule': _schedule_rows(schedule)})
+            else:
+                settle_positions.append(position)
+
+        # settle/quote 요청은 모든 계약의 연체 금액을 한 번에 계산
+        allocations = settle_states(
+            [states[parsed[position][1]] for position in settle_positions],
+            [parsed[position][2] for position in settle_positions],
+        )
+        for position, allocation in zip(settle_positions, allocations):
+            operation, contract_id, as_of = parsed[position]
+            state = states[contract_id]
+            if operation == 'settle':
+                responses[position] = (200, self._settlement_body(contract_id, state, allocation, as_of))
+            else:
+                responses[position] = (200, self._quote_body(contract_id, state, allocation, as_of))
+
+    def _execute_adhoc_schedules(self, requests, positions, responses):
+        """
+        계약 목록에 없는 계약 정보로 결제 스케줄을 생성합니다 (캐시하지 않음).
+        """
+        try:
+            contracts = pd.DataFrame([
+                {column: requests[position][1].get(column) for column in CONTRACT_COLUMNS} for position in positions
+            ])
+            contracts['contract_id'] = range(len(positions))
+            contracts['delivery_date'] = pd.to_datetime(contracts['delivery_date'])
+        except (TypeError, ValueError) as e:
+            for position in positions:
+                responses[position] = (400, {'error': str(e)})
+            return
+        schedule, errors = self._generate(contracts)
+        groups = {contract_id: group for group, contract_id in enumerate(schedule.contract_ids.tolist())}
+        for contract_id, position in enumerate(positions):
+            if contract_id in errors:
+                responses[position] = (422, {'error': errors[contract_id]})
+            else:
+                responses[position] = (200, {'contract_id': None, 'schedule': _schedule_rows(schedule, groups[contract_id])})
+
+    def _settlement_body(self, contract_id, state, allocation, as_of):
+        rows = []
+        for i, (due_date, amount) in enumerate(zip(state['due_dates'], state['amounts'])):
+            row = {'회차': i + 1, '결제일': _to_json_value(due_date), '월요금': _to_json_value(amount)}
+            for column in STATE_COLUMNS:
+                row[column] = _to_json_value(allocation[column][i])
+            rows.append(row)
+        return {'contract_id': _to_json_value(contract_id), 'as_of': as_of.isoformat(), 'schedule': rows}
+
+    def _quote_body(self, contract_id, state, allocation, as_of):
+        billed = int(np.count_nonzero(state['due_dates'] <= np.datetime64(as_of)))
+        remaining_principal = _to_json_value(sum(allocation['잔여월요금'][:billed]))
+        remaining_overdue = _to_json_value(sum(allocation['잔여연체금액'][:billed]))
+        return {
+            'contract_id': _to_json_value(contract_id),
+            'as_of': as_of.isoformat(),
+            '청구회차': billed,
+            '잔여월요금': remaining_principal,
+            '잔여연체금액': remaining_overdue,
+            '납부할금액': remaining_principal + remaining_overdue,
+        }
+
+class RequestBatcher:
+    """
+    동시에 들어온 요청을 batch_window 동안(최대 max_batch개) 모아 전용 작업 스레드에서 service.execute()로 처리합니다.
+    작업 스레드가 계산하는 동안 들어온 요청은 다음 묶음으로 모입니다.
+    """
+    def __init__(self, service, batch_window=DEFAULT_BATCH_WINDOW, max_batch=DEFAULT_MAX_BATCH):
+        self.service = service
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._queue = asyncio.Queue()
+        # Decimal 컨텍스트(정밀도)는 스레드마다 따로 있으므로 현재 스레드의 설정을 작업 스레드에 복사
+        self._executor = ThreadPoolExecutor(max_workers=1, initializer=setcontext, initargs=(getcontext().copy(),))
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, operation, payload):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, payload, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            requests = [(operation, payload) for operation, payload, _ in batch]
+            try:
+                responses = await loop.run_in_executor(self._executor, self.service.execute, requests)
+            except Exception as e:
+                responses = [(500, {'error': str(e)})] * len(batch)
+            for (_, _, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        self._executor.shutdown(wait=False)
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+async def _read_request(reader):
+    """
+    HTTP/1.1 요청 하나를 읽습니다. 연결이 닫혔으면 None을 반환합니다.
+
+    Returns:
+      (method, path, headers, body) 튜플
+    """
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get('content-length', 0))
+    body = await reader.readexactly(length) if length else b''
+    return method.upper(), path.split('?', 1)[0], headers, body
+
+def _encode_response(status, body, keep_alive):
+    content = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(content)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + content
+
+async def _dispatch(batcher, method, path, body):
+    operation = path.strip('/')
+    if method == 'GET' and operation == 'health':
+        return 200, {'status': 'ok'}
+    if method == 'GET' and operation == 'stats':
+        stats = dict(batcher.service.stats, cached=len(batcher.service._states), cache_size=batcher.service.cache_size)
+        return 200, stats
+    if operation not in ('schedule', 'settle', 'quote', 'collections'):
+        return 404, {'error': f"지원하지 않는 경로입니다: {path}"}
+    if method != 'POST':
+        return 405, {'error': "POST 요청만 지원합니다."}
+    try:
+        payload = json.loads(body or b'{}')
+    except ValueError:
+        return 400, {'error': "요청 본문이 올바른 JSON이 아닙니다."}
+    if not isinstance(payload, dict):
+        return 400, {'error': "요청 본문은 JSON 객체여야 합니다."}
+    return await batcher.submit(operation, payload)
+
+async def handle_connection(batcher, reader, writer):
+    """
+    연결 하나에서 keep-alive로 들어오는 요청을 차례로 처리합니다.
+    """
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get('connection', '').lower() != 'close'
+            status, response = await _dispatch(batcher, method, path, body)
+            writer.write(_encode_response(status, response, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    finally:
+        writer.close()
+
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None,
+                batch_window=DEFAULT_BATCH_WINDOW, max_batch=DEFAULT_MAX_BATCH, ready=None):
+    """
+    정산 서비스를 HTTP(host:port) 또는 Unix 소켓(socket_path)으로 실행합니다.
+
+    Args:
+      ready: 서버가 요청을 받을 준비가 되면 호출할 함수 (테스트나 부하 측정용)
+    """
+    batcher = RequestBatcher(service, batch_window, max_batch)
+    batcher.start()
+
+    async def handler(reader, writer):
+        await handle_connection(batcher, reader, writer)
+
+    if socket_path:
+        server = await asyncio.start_unix_server(handler, path=socket_path)
+    else:
+        server = await asyncio.start_server(handler, host, port)
+    if ready is not None:
+        ready()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await batcher.close()
+
+async def _load_client(host, port, socket_path, requests, latencies, errors):
+    if socket_path:
+        reader, writer = await asyncio.open_unix_connection(socket_path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for path, body in requests:
+            content = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            start = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(content)}\r\n\r\n".encode('latin-1') + content
+            )
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            if status_line.split()[1] != b'200':
+                errors.append(status_line.decode('latin-1').strip())
+    finally:
+        writer.close()
+
+async def run_load(contract_ids, requests=1000, concurrency=32, operation='quote', as_of=None,
+                   host=DEFAULT_HOST, port=DEFAULT_PORT, socket_path=None, seed=0):
+    """
+    무작위 계약에 대한 요청을 concurrency개의 연결(keep-alive)로 나누어 보내고 지연 시간과 처리량을 측정합니다.
+
+    Returns:
+      'requests', 'errors', 'seconds', 'throughput'(초당 요청 수), 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms' 키를 가진 dict
+    """
+    rng = np.random.default_rng(seed)
+    targets = rng.choice(np.asarray(contract_ids), size=requests)
+    body = {} if as_of is None else {'as_of': as_of.isoformat()}
+    planned = [(f'/{operation}', dict(body, contract_id=_to_json_value(contract_id))) for contract_id in targets]
+
+    latencies = []
+    errors = []
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _load_client(host, port, socket_path, planned[client::concurrency], latencies, errors)
+        for client in range(min(concurrency, requests))
+    ])
+    seconds = time.perf_counter() - start
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': round(seconds, 3),
+        'throughput': round(len(latencies) / seconds, 1),
+        'p50_ms': round(float(np.percentile(latencies_ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(latencies_ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(latencies_ms, 99)), 3),
+        'max_ms': round(float(latencies_ms.max()), 3),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='adjustment', description='로컬 정산 서비스와 부하 생성기')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    serve_parser = subparsers.add_parser('serve', help='정산 서비스 실행')
+    serve_parser.add_argument('--contracts', required=True, help='계약 목록 파일 (csv, parquet, xlsx)')
+    serve_parser.add_argument('--collections', help='수금 내역 파일 (csv, parquet, xlsx)')
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--socket', help='Unix 소켓 경로 (지정하면 TCP 대신 사용)')
+    serve_parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE, help='캐시에 보관할 계약 수')
+    serve_parser.add_argument('--warm', action='store_true', help='시작할 때 계약 목록 앞에서부터 캐시 크기만큼 상태를 미리 만듦')
+    serve_parser.add_argument('--batch-window', type=float, default=DEFAULT_BATCH_WINDOW, help='요청을 묶는 최대 대기 시간(초)')
+    serve_parser.add_argument('--max-batch', type=int, default=DEFAULT_MAX_BATCH, help='묶음당 최대 요청 수')
+
+    load_parser = subparsers.add_parser('loadgen', help='정산 서비스 부하 측정')
+    load_parser.add_argument('--contracts', required=True, help='요청할 계약 ID를 가져올 계약 목록 파일')
+    load_parser.add_argument('--host', default=DEFAULT_HOST)
+    load_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    load_parser.add_argument('--socket', help='Unix 소켓 경로')
+    load_parser.add_argument('--operation', default='quote', choices=['quote', 'settle', 'schedule'])
+    load_parser.add_argument('--requests', type=int, default=1000, help='총 요청 수')
+    load_parser.add_argument('--concurrency', type=int, default=32, help='동시 연결 수')
+    load_parser.add_argument('--as-of', help='연체 계산 기준 시점 (기본값: 서버의 현재 시각)')
+    load_parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    if args.command == 'loadgen':
+        contract_ids = read_contracts(args.contracts)['contract_id'].to_numpy()
+        as_of = datetime.fromisoformat(args.as_of) if args.as_of else None
+        result = asyncio.run(run_load(
+            contract_ids, args.requests, args.concurrency, args.operation, as_of, args.host, args.port, args.socket, args.seed
+        ))
+        print(json.dumps(result, ensure_ascii=False))
+        return 1 if result['errors'] else 0
+
+    # 금액 계산 방식은 환경 변수 ADJUSTMENT_MONEY_MODE로 지정
+    try:
+        set_money_mode(money_mode_from_environment())
+    except ValueError as e:
+        parser.error(str(e))
+    contracts = read_contracts(args.contracts)
+    collections = read_collections(args.collections) if args.collections else None
+    service = SettlementService(contracts, collections, args.cache_size)
+    if args.warm:
+        service.warm(contracts['contract_id'].head(args.cache_size))
+    address = args.socket or f"http://{args.host}:{args.port}"
+    print(f"정산 서비스를 시작합니다: {address} (계약 {len(contracts)}건, 캐시 {args.cache_size}건)")
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.socket, args.batch_window, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
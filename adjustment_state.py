@@ -0,0 +1,316 @@
+"""
+계약별 수금 반영 상태를 SQLite에 저장하고, 새로 들어온 수금 내역만 반영하는 증분 정산 모듈입니다.
+
+저장되는 상태는 as_of 기준 연체 재계산 이전의 수금 반영 결과(allocate_payments()의 결과)이므로,
+새 수금 내역만 반영한 결과가 전체 수금 내역을 처음부터 다시 반영한 결과와 같습니다.
+"""
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from adjustment import (
+    SCHEDULE_COLUMNS,
+    STATE_COLUMNS,
+    allocate_payments,
+    apply_final_overdue,
+    calculate_overdue_batch,
+    money_mode,
+    new_allocation_state,
+    reset_billed_overdue,
+    settle_overdue,
+)
+from adjustment_schedule import Schedule
+
+# 금액 컬럼은 타입을 지정하지 않아(BLOB affinity) 저장한 int/float 값이 그대로 보존됩니다.
+# NUMERIC으로 지정하면 0.0, 500000.0 같은 float가 INTEGER로 바뀌어 다시 읽은 결과의 형식이 달라집니다.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contracts (
+    contract_id PRIMARY KEY,
+    monthly_fee NOT NULL,
+    collection_cursor TEXT
+);
+CREATE TABLE IF NOT EXISTS installments (
+    contract_id NOT NULL,
+    회차 INTEGER NOT NULL,
+    결제일 TEXT NOT NULL,
+    월요금 NOT NULL,
+    납부월요금 NOT NULL,
+    잔여월요금 NOT NULL,
+    연체금액 NOT NULL,
+    납부연체금액 NOT NULL,
+    잔여연체금액 NOT NULL,
+    최종납부일 TEXT,
+    PRIMARY KEY (contract_id, 회차)
+);
+CREATE TABLE IF NOT EXISTS collections (
+    contract_id NOT NULL,
+    순번 INTEGER NOT NULL,
+    결제일 TEXT NOT NULL,
+    결제금액 NOT NULL,
+    PRIMARY KEY (contract_id, 순번)
+);
+"""
+
+# decimal 방식에서 new_allocation_state()가 0.0(float)으로 초기화하는 컬럼
+FLOAT_STATE_COLUMNS = ['납부월요금', '연체금액', '납부연체금액', '잔여연체금액']
+
+def new_settlement_state(contract_id, schedule, monthly_fee):
+    """
+    결제 스케줄로 수금 내역이 없는 초기 정산 상태를 만듭니다.
+
+    Args:
+      contract_id: 계약 ID
+      schedule: (payment_date, payment_amount) 튜플의 리스트, '결제일', '월요금' 컬럼을 가진 DataFrame
+                또는 단일 계약의 Schedule
+      monthly_fee: 연체 계산에 사용할 계약 시의 기본 월요금
+
+    Returns:
+      계약 정보, 회차별 상태, 반영된 수금 내역과 수금 커서(마지막 반영 수금 시점)를 담은 dict
+    """
+    if isinstance(schedule, Schedule):
+        due_dates = schedule.due_dates
+        amounts = schedule.amounts.tolist()
+    elif isinstance(schedule, pd.DataFrame):
+        due_dates = schedule['결제일'].to_numpy(dtype='datetime64[us]')
+        amounts = schedule['월요금'].tolist()
+    else:
+        due_dates = np.array([payment_date for payment_date, _ in schedule], dtype='datetime64[us]')
+        amounts = [amount for _, amount in schedule]
+
+    return {
+        'contract_id': contract_id,
+        'monthly_fee': monthly_fee,
+        'due_dates': due_dates,
+        'amounts': amounts,
+        'allocation': new_allocation_state(amounts),
+        'collection_dates': np.empty(0, dtype='datetime64[us]'),
+        'collection_amounts': [],
+        'cursor': np.datetime64('NaT', 'us'),
+        'persisted_collections': 0, # 저장소에 이미 기록된 수금 내역 수
+    }
+
+def settled_allocation(state, as_of, billed_installment_count=None):
+    """
+    정산 상태의 회차별 상태에 as_of 기준 연체 금액을 반영한 사본을 반환합니다. state는 변경되지 않습니다.
+    """
+    allocation = {column: list(values) for column, values in state['allocation'].items()}
+    allocation['최종납부일'] = state['allocation']['최종납부일'].copy()
+    settle_overdue(state['due_dates'], allocation, state['monthly_fee'], as_of, billed_installment_count)
+    return allocation
+
+def settle_states(states, as_ofs):
+    """
+    여러 계약의 정산 상태에 계약별 as_of 기준 연체 금액을 반영한 사본을 만듭니다. states는 변경되지 않습니다.
+    settled_allocation()과 결과가 같지만, 모든 계약의 미납 회차 연체 금액을 calculate_overdue_batch() 한 번으로 계산합니다.
+
+    Args:
+      states: new_settlement_state() 형식의 정산 상태 리스트
+      as_ofs: 계약별 연체 계산 기준 시점 리스트
+
+    Returns:
+      계약별 STATE_COLUMNS 회차별 상태 dict 리스트
+    """
+    allocations = []
+    unpaid_positions = []
+    due_dates = []
+    base_fees = []
+    check_points = []
+    for state, as_of in zip(states, as_ofs):
+        allocation = {column: list(values) for column, values in state['allocation'].items()}
+        allocation['최종납부일'] = state['allocation']['최종납부일'].copy()
+        unpaid = reset_billed_overdue(state['due_dates'], allocation, as_of)
+        allocations.append(allocation)
+        unpaid_positions.append(unpaid)
+        due_dates.append(state['due_dates'][unpaid])
+        base_fees.append(np.full(len(unpaid), state['monthly_fee']))
+        check_points.append(np.full(len(unpaid), np.datetime64(as_of, 'us')))
+
+    if not allocations:
+        return allocations
+    final_overdue = calculate_overdue_batch(
+        np.concatenate(due_dates), np.concatenate(base_fees), np.concatenate(check_points)
+    )
+    start = 0
+    for allocation, unpaid in zip(allocations, unpaid_positions):
+        apply_final_overdue(allocation, unpaid, final_overdue[start:start + len(unpaid)])
+        start += len(unpaid)
+    return allocations
+
+def settlement_dataframe(state, as_of, billed_installment_count=None):
+    """
+    정산 상태로부터 as_of 기준 연체 금액을 반영한 결제 스케줄 DataFrame을 만듭니다. state는 변경되지 않습니다.
+    """
+    allocation = settled_allocation(state, as_of, billed_installment_count)
+    df = pd.DataFrame({'결제일': state['due_dates'], '월요금': state['amounts']})
+    df.index.name = '회차'
+    df.index = df.index + 1
+    for column in STATE_COLUMNS:
+        df[column] = allocation[column]
+    return df[SCHEDULE_COLUMNS]
+
+def advance_settlement_state(state, new_dates, new_amounts):
+    """
+    새 수금 내역(결제일 순으로 정렬된 배열)을 정산 상태에 반영합니다. state는 직접 변경됩니다.
+
+    새 수금 내역이 모두 수금 커서 이후라면 새 내역만 반영하고,
+    커서 이전 시점의 수금(소급 입력)이 포함되어 있으면 저장된 전체 수금 내역으로 다시 정산합니다.
+    """
+    new_dates = np.asarray(new_dates, dtype='datetime64[us]')
+    new_amounts = list(new_amounts)
+
+    if len(new_dates):
+        collection_dates = np.concatenate([state['collection_dates'], new_dates])
+        collection_amounts = state['collection_amounts'] + new_amounts
+        cursor = state['cursor']
+        if np.isnat(cursor) or new_dates[0] >= cursor:
+            allocate_payments(state['due_dates'], state['allocation'], new_dates, new_amounts, state['monthly_fee'])
+        else:
+            # 소급 입력된 수금이 있으면 전체 수금 내역을 결제일 순으로 다시 반영
+            order = np.argsort(collection_dates, kind='stable')
+            collection_dates = collection_dates[order]
+            collection_amounts = [collection_amounts[i] for i in order]
+            state['allocation'] = new_allocation_state(state['amounts'])
+            allocate_payments(state['due_dates'], state['allocation'], collection_dates, collection_amounts, state['monthly_fee'])
+            state['persisted_collections'] = 0 # 순서가 바뀌었으므로 저장 시 전체를 다시 기록
+        state['collection_dates'] = collection_dates
+        state['collection_amounts'] = collection_amounts
+        state['cursor'] = collection_dates.max()
+
+def apply_new_collections(state, new_rows, as_of, billed_installment_count=None):
+    """
+    마지막 정산 이후 새로 들어온 수금 내역만 정산 상태에 반영합니다. state는 직접 변경됩니다.
+    처리 비용은 전체 수금 이력이 아니라 새 수금 건수에 비례합니다.
+
+    Args:
+      state: new_settlement_state() 또는 load_settlement_state()로 얻은 정산 상태
+      new_rows: '결제일', '결제금액' 컬럼을 가진 새 수금 내역 DataFrame
+      as_of: 최종 연체 금액을 계산할 기준 시점
+      billed_installment_count: 현재 청구된 회차 수 (None이면 결제일이 as_of 이전인 회차 수)
+
+    Returns:
+      as_of 기준 연체 금액을 반영한 결제 스케줄 DataFrame
+    """
+    new_rows = new_rows.sort_values(by=['결제일'], kind='stable')
+    advance_settlement_state(
+        state, new_rows['결제일'].to_numpy(dtype='datetime64[us]'), new_rows['결제금액'].tolist()
+    )
+    return settlement_dataframe(state, as_of, billed_installment_count)
+
+def _to_text(value):
+    """
+    datetime64 값을 SQLite에 저장할 ISO 문자열로 변환합니다. NaT는 None이 됩니다.
+    """
+    return None if np.isnat(value) else str(value.astype('datetime64[us]'))
+
+def _to_python(value):
+    """
+    numpy 스칼라를 SQLite에 저장할 수 있는 파이썬 값으로 변환합니다.
+    """
+    return value.item() if isinstance(value, np.generic) else value
+
+def _to_datetime64(values):
+    return np.array([np.datetime64(value) if value is not None else np.datetime64('NaT') for value in values], dtype='datetime64[us]')
+
+def open_settlement_store(path):
+    """
+    정산 상태 저장소(SQLite 파일)를 열고, 테이블이 없으면 생성합니다.
+    """
+    connection = sqlite3.connect(path)
+    connection.execute("PRAGMA journal_mode=WAL") # 배치 작업자들이 읽는 동안에도 저장 가능하도록
+    connection.executescript(_SCHEMA)
+    return connection
+
+def save_settlement_state(connection, state):
+    """
+    계약의 정산 상태를 저장소에 기록합니다. 같은 계약의 기존 상태는 대체되며,
+    수금 내역은 마지막 저장 이후 추가된 행만 기록합니다.
+    """
+    save_settlement_states(connection, [state])
+
+def save_settlement_states(connection, states):
+    """
+    여러 계약의 정산 상태를 하나의 트랜잭션으로 저장소에 기록합니다.
+    """
+    with connection:
+        for state in states:
+            _write_settlement_state(connection, state)
+
+def _write_settlement_state(connection, state):
+    contract_id = _to_python(state['contract_id'])
+    allocation = state['allocation']
+    connection.execute(
+        "INSERT OR REPLACE INTO contracts (contract_id, monthly_fee, collection_cursor) VALUES (?, ?, ?)",
+        (contract_id, _to_python(state['monthly_fee']), _to_text(state['cursor'])),
+    )
+    connection.execute("DELETE FROM installments WHERE contract_id = ?", (contract_id,))
+    connection.executemany(
+        "INSERT INTO installments VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            (
+                contract_id, i + 1, _to_text(state['due_dates'][i]), state['amounts'][i],
+                allocation['납부월요금'][i], allocation['잔여월요금'][i], allocation['연체금액'][i],
+                allocation['납부연체금액'][i], allocation['잔여연체금액'][i], _to_text(allocation['최종납부일'][i]),
+            )
+            for i in range(len(state['amounts']))
+        ],
+    )
+
+    # 수금 내역은 추가된 행만 기록 (소급 재정산으로 순서가 바뀐 경우에는 전체를 다시 기록)
+    persisted = state['persisted_collections']
+    if persisted == 0:
+        connection.execute("DELETE FROM collections WHERE contract_id = ?", (contract_id,))
+    connection.executemany(
+        "INSERT INTO collections VALUES (?, ?, ?, ?)",
+        [
+            (contract_id, sequence, _to_text(state['collection_dates'][sequence]), state['collection_amounts'][sequence])
+            for sequence in range(persisted, len(state['collection_amounts']))
+        ],
+    )
+    state['persisted_collections'] = len(state['collection_amounts'])
+
+def _has_numeric_amounts(connection):
+    """
+    금액 컬럼을 NUMERIC affinity로 만든 이전 형식의 저장소인지 여부를 반환합니다.
+    """
+    column_types = {name: declared for _, name, declared, *_ in connection.execute("PRAGMA table_info(installments)")}
+    return column_types.get('연체금액', '').upper() == 'NUMERIC'
+
+def load_settlement_state(connection, contract_id):
+    """
+    저장소에서 계약의 정산 상태를 읽어옵니다. 저장된 상태가 없으면 None을 반환합니다.
+    """
+    contract = connection.execute(
+        "SELECT monthly_fee, collection_cursor FROM contracts WHERE contract_id = ?", (_to_python(contract_id),)
+    ).fetchone()
+    if contract is None:
+        return None
+    monthly_fee, cursor = contract
+
+    installments = connection.execute(
+        "SELECT 결제일, 월요금, 납부월요금, 잔여월요금, 연체금액, 납부연체금액, 잔여연체금액, 최종납부일 "
+        "FROM installments WHERE contract_id = ? ORDER BY 회차",
+        (_to_python(contract_id),),
+    ).fetchall()
+    collections = connection.execute(
+        "SELECT 결제일, 결제금액 FROM collections WHERE contract_id = ? ORDER BY 순번", (_to_python(contract_id),)
+    ).fetchall()
+
+    columns = list(zip(*installments)) if installments else [()] * 8
+    allocation = {column: list(values) for column, values in zip(STATE_COLUMNS[:-1], columns[2:7])}
+    if money_mode() == 'decimal' and _has_numeric_amounts(connection):
+        # 금액 컬럼을 NUMERIC으로 만든 이전 저장소에서는 0.0으로 시작하는 컬럼이 정수로 읽히므로 float로 복원
+        for column in FLOAT_STATE_COLUMNS:
+            allocation[column] = [float(value) for value in allocation[column]]
+    allocation['최종납부일'] = _to_datetime64(columns[7])
+    return {
+        'contract_id': contract_id,
+        'monthly_fee': monthly_fee,
+        'due_dates': _to_datetime64(columns[0]),
+        'amounts': list(columns[1]),
+        'allocation': allocation,
+        'collection_dates': _to_datetime64([collection_date for collection_date, _ in collections]),
+        'collection_amounts': [amount for _, amount in collections],
+        'cursor': np.datetime64(cursor, 'us') if cursor is not None else np.datetime64('NaT', 'us'),
+        'persisted_collections': len(collections),
+    }
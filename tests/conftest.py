@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 저장소 최상위의 adjustment*.py 모듈을 테스트에서 임포트할 수 있도록 경로 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
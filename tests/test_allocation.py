@@ -0,0 +1,119 @@
+"""
+allocate_collections()가 기존 df.loc 회차 순회 방식과 같은 결과를 내는지 확인합니다.
+"""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from adjustment import (
+    SCHEDULE_COLUMNS,
+    allocate_collections,
+    build_schedule_dataframe,
+    calculate_overdue_for_installment,
+    generate_postpayment_schedule,
+    generate_prepayment_schedule,
+)
+
+def _baseline_allocate(df, df_collection, monthly_fee, current_datetime, billed_installment_count):
+    """
+    allocate_collections() 도입 이전 대화형 흐름의 df.loc 회차 순회 코드 (비교 기준).
+    """
+    df = df.copy()
+    df_collection = df_collection.sort_values(by=['결제일']).reset_index(drop=True)
+
+    collection_idx = 0
+    for inst_idx in range(len(df)):
+        if collection_idx >= len(df_collection):
+            break
+        while collection_idx < len(df_collection) and \
+              (df.loc[df.index[inst_idx], '잔여연체금액'] > 0 or df.loc[df.index[inst_idx], '잔여월요금'] > 0):
+            collected_amount = df_collection.loc[collection_idx, '결제금액']
+            collection_datetime_from_df = df_collection.loc[collection_idx, '결제일']
+            if collected_amount <= 0:
+                collection_idx += 1
+                continue
+
+            overdue_at_collection_time = calculate_overdue_for_installment(
+                df.loc[df.index[inst_idx], '결제일'], monthly_fee, collection_datetime_from_df
+            )
+            df.loc[df.index[inst_idx], '연체금액'] = overdue_at_collection_time
+
+            apply_to_overdue = min(collected_amount, df.loc[df.index[inst_idx], '잔여연체금액'])
+            df.loc[df.index[inst_idx], '납부연체금액'] += apply_to_overdue
+            df.loc[df.index[inst_idx], '잔여연체금액'] -= apply_to_overdue
+            collected_amount -= apply_to_overdue
+
+            apply_to_principal = min(collected_amount, df.loc[df.index[inst_idx], '잔여월요금'])
+            df.loc[df.index[inst_idx], '납부월요금'] += apply_to_principal
+            df.loc[df.index[inst_idx], '잔여월요금'] -= apply_to_principal
+            collected_amount -= apply_to_principal
+
+            if apply_to_overdue > 0 or apply_to_principal > 0:
+                df.loc[df.index[inst_idx], '최종납부일'] = collection_datetime_from_df
+            df_collection.loc[collection_idx, '결제금액'] = collected_amount
+            if collected_amount <= 0:
+                collection_idx += 1
+            else:
+                break
+
+    for i in range(billed_installment_count):
+        if df.loc[df.index[i], '잔여월요금'] > 0 or df.loc[df.index[i], '잔여연체금액'] > 0:
+            final_overdue_amount = calculate_overdue_for_installment(df.loc[df.index[i], '결제일'], monthly_fee, current_datetime)
+            df.loc[df.index[i], '연체금액'] = final_overdue_amount
+            df.loc[df.index[i], '잔여연체금액'] = max(0, final_overdue_amount - df.loc[df.index[i], '납부연체금액'])
+        else:
+            df.loc[df.index[i], '연체금액'] = 0
+            df.loc[df.index[i], '잔여연체금액'] = 0
+    return df[SCHEDULE_COLUMNS]
+
+def _random_case(rng):
+    monthly_fee = float(rng.choice([300000, 500000, 523457, 1150000, rng.randint(10000, 3000000)]))
+    period = rng.randint(1, 48)
+    day = rng.randint(1, 31)
+    delivery = datetime(2023, 1, 1) + timedelta(days=rng.randint(0, 900))
+    generate = generate_prepayment_schedule if rng.random() < 0.5 else generate_postpayment_schedule
+    schedule = generate(monthly_fee, period, day, delivery)
+
+    rows = []
+    for _ in range(rng.randint(0, 2 * len(schedule) + 3)):
+        due_date = rng.choice(schedule)[0]
+        paid_at = due_date + timedelta(days=rng.randint(-10, 60), hours=rng.randint(0, 23), minutes=rng.randint(0, 59))
+        kind = rng.random()
+        if kind < 0.1:
+            amount = 0.0
+        elif kind < 0.2:
+            amount = -float(rng.randint(1, int(monthly_fee)))
+        elif kind < 0.35:
+            amount = float(rng.randint(2, 4)) * monthly_fee # 초과 납부
+        else:
+            amount = float(rng.randint(1, int(monthly_fee * 1.2)))
+        rows.append((paid_at, amount))
+        if rng.random() < 0.2: # 같은 시점에 여러 건 수금
+            rows.append((paid_at, float(rng.randint(1, int(monthly_fee)))))
+    collections = pd.DataFrame(rows, columns=['결제일', '결제금액'])
+    collections['결제일'] = pd.to_datetime(collections['결제일'])
+
+    as_of = schedule[-1][0] + timedelta(days=rng.randint(-400, 90))
+    billed = sum(1 for due_date, _ in schedule if due_date <= as_of)
+    return schedule, collections, monthly_fee, as_of, billed
+
+@pytest.mark.parametrize('seed', range(40))
+def test_allocate_collections_matches_baseline_loop(seed):
+    schedule, collections, monthly_fee, as_of, billed = _random_case(random.Random(seed))
+    df = build_schedule_dataframe(schedule)
+
+    expected = _baseline_allocate(df, collections, monthly_fee, as_of, billed)
+    actual = allocate_collections(df, collections, monthly_fee, as_of, billed)
+
+    for column in SCHEDULE_COLUMNS:
+        if column in ('결제일', '최종납부일'):
+            np.testing.assert_array_equal(
+                actual[column].to_numpy(dtype='datetime64[us]'), expected[column].to_numpy(dtype='datetime64[us]'), err_msg=column
+            )
+        else:
+            np.testing.assert_array_equal(
+                actual[column].to_numpy(dtype=np.float64), expected[column].to_numpy(dtype=np.float64), err_msg=column
+            )
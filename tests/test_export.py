@@ -0,0 +1,27 @@
+"""
+계약마다 시트를 나누는 xlsx 내보내기에서 시트 이름이 겹쳐도 중단되지 않는지 확인합니다.
+"""
+import pandas as pd
+import pytest
+
+from adjustment_export import BackgroundScheduleWriter, ScheduleWriter
+
+pytest.importorskip('xlsxwriter')
+
+@pytest.mark.parametrize('writer_class', [ScheduleWriter, BackgroundScheduleWriter])
+def test_sheet_per_contract_makes_truncated_names_unique(tmp_path, writer_class):
+    contract_ids = ['A' * 31 + '1', 'A' * 31 + '2', 'A' * 31 + '3', 'x/y', 'x:y', 'ab', 'AB']
+    df = pd.DataFrame({
+        'contract_id': contract_ids,
+        '회차': 1,
+        '결제일': pd.Timestamp('2025-01-25'),
+        '월요금': 500000,
+    })
+    path = tmp_path / 'schedules.xlsx'
+    with writer_class(str(path), df.columns, sheet_per_contract=True) as writer:
+        writer.write(df)
+
+    sheets = pd.read_excel(path, sheet_name=None)
+    assert list(sheets) == ['A' * 31, 'A' * 29 + '_2', 'A' * 29 + '_3', 'x_y', 'x_y_2', 'ab', 'AB_2']
+    assert all(len(name) <= 31 for name in sheets)
+    assert [len(sheet) for sheet in sheets.values()] == [1] * len(contract_ids)
@@ -0,0 +1,37 @@
+"""
+원 단위 변환(to_won)의 반올림과 금액 계산 방식 환경 변수 처리를 확인합니다.
+"""
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from adjustment import MONEY_MODE_ENV_VAR, money_mode_from_environment
+from adjustment_batch import main as batch_main
+from adjustment_money import to_won
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_float_rounding_matches_decimal_path():
+    values = [-2.5, -1.5, -0.5, -0.4, 0.0, 0.4, 0.5, 1.5, 2.5, -1000.5, 1000.5, -123456.49]
+    floats = to_won(np.array(values))
+    strings = to_won(np.array([repr(value) for value in values]))
+    assert floats.tolist() == strings.tolist()
+    assert to_won(np.array([-2.5])).tolist() == [-3]
+
+def test_invalid_money_mode_environment_does_not_break_import():
+    env = {**os.environ, MONEY_MODE_ENV_VAR: 'Bogus'}
+    code = 'import adjustment; print(adjustment.money_mode())'
+    result = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0
+    assert result.stdout.strip() == 'decimal'
+
+def test_money_mode_environment_is_read_by_entry_points(monkeypatch):
+    monkeypatch.setenv(MONEY_MODE_ENV_VAR, ' Exact ')
+    assert money_mode_from_environment() == 'exact'
+    monkeypatch.setenv(MONEY_MODE_ENV_VAR, 'Bogus')
+    with pytest.raises(SystemExit) as excinfo:
+        batch_main(['--contracts', 'contracts.csv', '--collections', 'collections.csv'])
+    assert excinfo.value.code == 2
@@ -0,0 +1,50 @@
+"""
+calculate_overdue_batch()가 단일 회차 함수 calculate_overdue_for_installment()와 비트 단위로 일치하는지 확인합니다.
+"""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+
+from adjustment import calculate_overdue_batch, calculate_overdue_for_installment
+
+def _random_fee(rng):
+    kind = rng.random()
+    if kind < 0.2:
+        return float(rng.randint(10000, 3000000)) # 원 단위 정수 금액
+    if kind < 0.4:
+        return round(rng.uniform(10000, 3000000), rng.randint(1, 4)) # 짧은 소수 금액
+    if kind < 0.9:
+        return rng.uniform(10000, 3000000) # 유효숫자 15~17자리의 float
+    return rng.uniform(1e9, 1e15) # 큰 금액
+
+def _batch_and_scalar(scheduled_dates, fees, check_points):
+    batch = calculate_overdue_batch(
+        np.array(scheduled_dates, dtype='datetime64[us]'), np.array(fees), np.array(check_points, dtype='datetime64[us]')
+    )
+    scalar = [
+        calculate_overdue_for_installment(scheduled, fee, check)
+        for scheduled, fee, check in zip(scheduled_dates, fees, check_points)
+    ]
+    return batch.tolist(), scalar
+
+@pytest.mark.parametrize('seed', range(20))
+def test_batch_matches_scalar_on_random_float_fees(seed):
+    rng = random.Random(seed)
+    scheduled_dates, fees, check_points = [], [], []
+    for _ in range(500):
+        scheduled = datetime(2020, 1, 1) + timedelta(days=rng.randint(0, 2000))
+        scheduled_dates.append(scheduled)
+        fees.append(_random_fee(rng))
+        check_points.append(scheduled + timedelta(seconds=rng.randint(-5 * 86400, 4000 * 86400)))
+
+    batch, scalar = _batch_and_scalar(scheduled_dates, fees, check_points)
+    assert batch == scalar
+
+@pytest.mark.parametrize('fee', [333333.3333333333, 123456.78901234567, 449491.06478873815, 500000.0, 987654321012.3457, 4.5e17])
+def test_batch_matches_scalar_on_long_mantissa_fees(fee):
+    scheduled = datetime(2024, 1, 1)
+    check_points = [scheduled + timedelta(days=days, hours=13) for days in (0, 4, 5, 30, 365, 3650)]
+    batch, scalar = _batch_and_scalar([scheduled] * len(check_points), [fee] * len(check_points), check_points)
+    assert batch == scalar
@@ -0,0 +1,37 @@
+"""
+단계별 최대 메모리가 프로세스 전체 최대값이 아니라 그 단계 호출 중의 최대값인지 확인합니다.
+"""
+import numpy as np
+
+import adjustment
+import adjustment_profile
+from adjustment_bench import synthetic_contracts
+
+def test_stage_peak_memory_is_measured_per_stage():
+    contracts = synthetic_contracts(20000)
+    adjustment_profile.reset()
+    adjustment_profile.enable(memory=True)
+    try:
+        adjustment.generate_schedule_arrays(contracts) # 큰 단계
+        adjustment.calculate_overdue_batch(
+            np.array(['2024-01-25'], dtype='datetime64[us]'), np.array([500000]), np.array(['2024-03-01'], dtype='datetime64[us]')
+        ) # 큰 단계 뒤에 실행되는 작은 단계
+        stages = adjustment_profile.collect()
+    finally:
+        adjustment_profile.disable()
+
+    large = stages['generate_schedule_arrays']['peak_memory_mb']
+    small = stages['calculate_overdue_batch']['peak_memory_mb']
+    assert large > 1
+    assert small < large / 2
+
+def test_stage_peak_memory_is_not_reported_without_memory_tracking():
+    adjustment_profile.reset()
+    adjustment_profile.enable()
+    try:
+        adjustment.generate_schedule_arrays(synthetic_contracts(10))
+        stages = adjustment_profile.collect()
+    finally:
+        adjustment_profile.disable()
+    assert stages['generate_schedule_arrays']['peak_memory_mb'] is None
+    assert adjustment_profile.report()['peak_memory_mb'] is not None
@@ -0,0 +1,23 @@
+"""
+시나리오 요약의 일할 회차가 금액이 아니라 스케줄 생성 시의 회차 종류로 정해지는지 확인합니다.
+"""
+from adjustment import generate_schedule_arrays
+from adjustment_scenario import scenario_grid, summarize_schedules
+from adjustment_schedule import Schedule
+
+def test_prorated_rows_do_not_depend_on_amounts():
+    scenarios = scenario_grid(
+        {'monthly_fee': 100000, 'payment_period_months': 12, 'fixed_payment_day': 25,
+         'delivery_date': '2024-03-15', 'payment_type': '후납'},
+        {'monthly_fee': [0, 100000]},
+    )
+    schedule = generate_schedule_arrays(scenarios)
+    summary = summarize_schedules(schedule, scenarios)
+
+    # 후납은 출고월과 종료월이 일할 회차이며, 월요금이 0이어서 금액이 같아도 일할 회차로 셈
+    assert summary['일할회차수'].tolist() == [2, 2, 2]
+    assert summary['일할금액합계'].tolist()[1] == 0
+
+    # take/concat 후에도 일할 회차 여부가 유지됨
+    rebuilt = Schedule.concat([schedule.take([group]) for group in range(schedule.contract_count)])
+    assert rebuilt.prorated.tolist() == schedule.prorated.tolist()
@@ -0,0 +1,69 @@
+"""
+/collections 요청의 결제금액 검증과 계약별 오류 격리를 확인합니다.
+"""
+import pandas as pd
+
+from adjustment_bench import synthetic_contracts
+from adjustment_service import SettlementService
+
+AS_OF = '2025-06-01T00:00:00'
+
+def _service(cache_size=100):
+    return SettlementService(synthetic_contracts(3), cache_size=cache_size)
+
+def _quote(service, contract_id):
+    status, body = service.execute([('quote', {'contract_id': contract_id, 'as_of': AS_OF})])[0]
+    assert status == 200
+    return body
+
+def test_invalid_amount_leaves_state_unchanged():
+    service = _service()
+    contract_id = service.contracts['contract_id'].iloc[0]
+    before = _quote(service, contract_id)
+
+    status, _ = service.execute([('collections', {
+        'contract_id': contract_id, 'collections': [{'결제일': '2024-01-10', '결제금액': 'abc'}],
+    })])[0]
+    assert status == 400
+    assert contract_id not in service._posted
+    assert _quote(service, contract_id) == before
+
+def test_numeric_string_amount_matches_number():
+    expected, actual = _service(), _service()
+    contract_id = expected.contracts['contract_id'].iloc[0]
+    for service, amount in ((expected, 100000), (actual, '100000')):
+        _quote(service, contract_id)
+        status, _ = service.execute([('collections', {
+            'contract_id': contract_id, 'collections': [{'결제일': '2024-01-10', '결제금액': amount}],
+        })])[0]
+        assert status == 200
+    assert _quote(actual, contract_id) == _quote(expected, contract_id)
+
+    # 캐시에서 밀려난 뒤 다시 만든 상태도 같음
+    actual._states.clear()
+    assert _quote(actual, contract_id) == _quote(expected, contract_id)
+
+def test_failing_contract_does_not_fail_batch():
+    service = _service()
+    good, bad = service.contracts['contract_id'].iloc[:2].tolist()
+    service._posted[bad] = (pd.to_datetime(['2024-01-10']).to_numpy(), [None])
+
+    responses = service.execute([
+        ('quote', {'contract_id': good, 'as_of': AS_OF}),
+        ('quote', {'contract_id': bad, 'as_of': AS_OF}),
+    ])
+    assert responses[0][0] == 200
+    assert responses[1][0] == 422
+
+def test_invalid_contract_id_does_not_fail_batch():
+    service = _service()
+    contract_id = service.contracts['contract_id'].iloc[0]
+
+    responses = service.execute([
+        ('quote', {'contract_id': contract_id, 'as_of': AS_OF}),
+        ('quote', {'contract_id': [1], 'as_of': AS_OF}),
+        ('settle', {'contract_id': {'a': 1}, 'as_of': AS_OF}),
+        ('collections', {'contract_id': [1], 'collections': []}),
+    ])
+    assert responses[0][0] == 200
+    assert [status for status, _ in responses[1:]] == [400, 400, 400]
@@ -0,0 +1,38 @@
+"""
+정산 상태 저장소(SQLite)에 저장했다가 다시 읽은 상태가 값과 형식(int/float)까지 같은지 확인합니다.
+"""
+from datetime import datetime
+
+import numpy as np
+
+from adjustment import STATE_COLUMNS, generate_prepayment_schedule
+from adjustment_state import (
+    advance_settlement_state,
+    load_settlement_state,
+    new_settlement_state,
+    open_settlement_store,
+    save_settlement_state,
+)
+
+def test_state_round_trip_preserves_amount_types(tmp_path):
+    schedule = generate_prepayment_schedule(500000.0, 12, 25, datetime(2024, 3, 15))
+    state = new_settlement_state(7, schedule, 500000.0)
+    advance_settlement_state(
+        state, np.array(['2024-03-14', '2024-05-01'], dtype='datetime64[us]'), [500000, 250000]
+    )
+
+    connection = open_settlement_store(str(tmp_path / 'state.db'))
+    try:
+        save_settlement_state(connection, state)
+        loaded = load_settlement_state(connection, 7)
+    finally:
+        connection.close()
+
+    assert loaded['amounts'] == state['amounts']
+    assert [type(amount) for amount in loaded['amounts']] == [type(amount) for amount in state['amounts']]
+    for column in STATE_COLUMNS[:-1]:
+        assert loaded['allocation'][column] == state['allocation'][column], column
+        assert [type(value) for value in loaded['allocation'][column]] == \
+            [type(value) for value in state['allocation'][column]], column
+    np.testing.assert_array_equal(loaded['allocation']['최종납부일'], state['allocation']['최종납부일'])
+    assert loaded['collection_amounts'] == state['collection_amounts']